@@ -1,3 +1,97 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from .exceptions import LeaveRequestError
+from .models import (Department, Employee, KYCApplication, KYCDocument, LeaveBalanceSnapshot, LeaveLedgerEntry,
+                     LeaveRequest, LeaveType, SupabaseUser)
+from .services.leave_service import LeaveService
 
-# Register your models here.
+@admin.register(SupabaseUser)
+class SupabaseUserAdmin(admin.ModelAdmin):
+    list_display = ('email', 'first_name', 'last_name', 'is_admin', 'email_confirmed', 'updated_at', 'synced_at')
+    list_filter = ('is_admin', 'email_confirmed')
+    search_fields = ('email', 'first_name', 'last_name')
+    # The table mirrors Supabase; edits belong upstream.
+    readonly_fields = [field.name for field in SupabaseUser._meta.fields]
+
+
+@admin.register(Department)
+class DepartmentAdmin(admin.ModelAdmin):
+    search_fields = ('name',)
+
+@admin.register(Employee)
+class EmployeeAdmin(admin.ModelAdmin):
+    list_display = ('employee_code', 'first_name', 'last_name', 'department', 'manager', 'status', 'join_date')
+    list_filter = ('status', 'department')
+    search_fields = ('employee_code', 'email', 'first_name', 'last_name')
+    list_select_related = ('department', 'manager')
+    # A select listing every employee would not scale.
+    raw_id_fields = ('manager',)
+
+
+@admin.register(LeaveType)
+class LeaveTypeAdmin(admin.ModelAdmin):
+    list_display = ('code', 'name')
+
+@admin.register(LeaveRequest)
+class LeaveRequestAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'leave_type', 'start_date', 'end_date', 'days', 'status', 'decided_by')
+    list_filter = ('status', 'leave_type')
+    list_select_related = ('employee', 'leave_type')
+    raw_id_fields = ('employee',)
+    readonly_fields = ('status', 'decided_at', 'decided_by')
+    # Once decided, the ledger and report rollups hold these values; change them by cancelling.
+    decided_readonly_fields = ('employee', 'leave_type', 'start_date', 'end_date', 'days')
+    actions = ['cancel_requests']
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None and obj.status != LeaveRequest.STATUS_PENDING:
+            return self.readonly_fields + self.decided_readonly_fields
+        return self.readonly_fields
+
+    @admin.action(description='Cancel selected leave requests')
+    def cancel_requests(self, request, queryset):
+        # Through LeaveService, so approved leave is credited back and the report rollups follow.
+        leave_service = LeaveService()
+        for leave_request in queryset.only('id'):
+            try:
+                leave_service.cancel(leave_request.id, request.user.get_username())
+            except LeaveRequestError as e:
+                self.message_user(request, str(e), messages.WARNING)
+
+@admin.register(LeaveLedgerEntry)
+class LeaveLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'leave_type', 'kind', 'days', 'entry_date', 'created_at')
+    list_filter = ('kind', 'leave_type')
+    list_select_related = ('employee', 'leave_type')
+    raw_id_fields = ('employee', 'leave_request')
+
+    # Append-only: accruals and adjustments are added, never edited or removed.
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(LeaveBalanceSnapshot)
+class LeaveBalanceSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'leave_type', 'balance', 'last_entry_id', 'taken_at')
+    list_select_related = ('employee', 'leave_type')
+    readonly_fields = [field.name for field in LeaveBalanceSnapshot._meta.fields]
+
+
+@admin.register(KYCApplication)
+class KYCApplicationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'employee', 'document_type', 'status', 'submitted_at', 'lease_owner', 'lease_expires_at')
+    list_filter = ('status', 'document_type')
+    list_select_related = ('employee',)
+    raw_id_fields = ('employee',)
+    # Review and leasing go through the KYC queue.
+    readonly_fields = ('status', 'reviewed_at', 'reviewed_by', 'review_notes', 'lease_owner', 'lease_expires_at',
+                       'version')
+
+
+@admin.register(KYCDocument)
+class KYCDocumentAdmin(admin.ModelAdmin):
+    list_display = ('original_name', 'application', 'status', 'detected_format', 'size', 'created_at')
+    list_filter = ('status', 'detected_format')
+    # Written by the chunked upload endpoints and the document processor.
+    readonly_fields = [field.name for field in KYCDocument._meta.fields]
@@ -0,0 +1,4 @@
+"""
+Performance tooling: a local stand-in for the Supabase auth API and the
+benchmarks run by ``manage.py run_benchmarks``.
+"""
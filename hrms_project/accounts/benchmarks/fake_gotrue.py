@@ -0,0 +1,230 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FAKE_PASSWORD = 'password123'
+_USER_PATH = re.compile(r'^/auth/v1/admin/users/([^/]+)$')
+
+
+def fake_user(index: int, is_admin: bool = False) -> Dict[str, Any]:
+    """
+    Build the ``index``-th synthetic auth user, shaped like a GoTrue admin API user.
+    """
+    return {
+        'id': str(uuid.UUID(int=index + 1)),
+        'aud': 'authenticated',
+        'role': 'authenticated',
+        'email': f'user{index}@example.com',
+        'email_confirmed_at': '2024-01-01T00:00:00Z',
+        'created_at': '2024-01-01T00:00:00Z',
+        'updated_at': '2024-01-01T00:00:00Z',
+        'last_sign_in_at': None,
+        'app_metadata': {'provider': 'email', 'providers': ['email']},
+        'user_metadata': {'first_name': f'First{index}', 'last_name': f'Last{index}', 'is_admin': is_admin},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: '_Server'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, payload: Any = None) -> None:
+        body = b'' if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+    def _route(self, method: str) -> None:
+        url = urlparse(self.path)
+        self.server.fake.delay()
+        if not self.headers.get('apikey'):
+            return self._reply(401, {'msg': 'No API key found in request'})
+        status, payload = self.server.fake.handle(method, url.path, parse_qs(url.query),
+                                                  self._body() if method in ('POST', 'PUT') else {})
+        self._reply(status, payload)
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+    def do_PUT(self):
+        self._route('PUT')
+
+    def do_DELETE(self):
+        self._route('DELETE')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+    fake: 'FakeGoTrue'
+
+
+class FakeGoTrue:
+    """
+    In-process HTTP stand-in for the Supabase auth (GoTrue) endpoints this app calls.
+
+    Serves the admin user listing, get/put/delete by id, password sign-in,
+    sign-up, logout and health from an in-memory user table on a daemon
+    thread, adding ``latency_ms`` (+/- ``jitter_ms``) to every response so
+    runs can approximate a real network hop. Every user's password is
+    :data:`FAKE_PASSWORD`; user 0 is an admin.
+
+    Example:
+        with FakeGoTrue(users=10000, latency_ms=20) as fake:
+            os.environ['SUPABASE_URL'] = fake.url
+    """
+
+    def __init__(self, users: int = 100, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._emails: Dict[str, str] = {}
+        self._next_index = 0
+        self._server: Optional[_Server] = None
+        self.reset(users)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def reset(self, users: int) -> None:
+        """
+        Replace the user table with ``users`` synthetic users.
+        """
+        with self._lock:
+            self._users = {}
+            self._emails = {}
+            for index in range(users):
+                self._insert(fake_user(index, is_admin=index == 0))
+            self._next_index = users
+
+    def _insert(self, user: Dict[str, Any]) -> None:
+        self._users[user['id']] = user
+        self._emails[user['email']] = user['id']
+
+    def delay(self) -> None:
+        with self._lock:
+            self.requests += 1
+        latency = self.latency_ms + (random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def start(self) -> 'FakeGoTrue':
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='fake-gotrue', daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FakeGoTrue':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def handle(self, method: str, path: str, query: Dict[str, list],
+               body: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        Answer one API call; returns ``(status, JSON payload)``.
+        """
+        if path == '/auth/v1/health':
+            return 200, {'name': 'GoTrue', 'description': 'fake'}
+        if path == '/auth/v1/admin/users':
+            if method == 'GET':
+                page = max(1, int(query.get('page', ['1'])[0]))
+                per_page = max(1, int(query.get('per_page', ['50'])[0]))
+                with self._lock:
+                    users = list(self._users.values())[(page - 1) * per_page:page * per_page]
+                return 200, {'users': users, 'aud': 'authenticated'}
+            if method == 'POST':
+                return self._create(body, body.get('user_metadata'))
+        if path == '/auth/v1/signup' and method == 'POST':
+            return self._create(body, body.get('data'))
+        if path == '/auth/v1/token' and method == 'POST':
+            return self._token(query.get('grant_type', [''])[0], body)
+        if path == '/auth/v1/logout' and method == 'POST':
+            return 204, None
+
+        match = _USER_PATH.match(path)
+        if match:
+            user_id = match.group(1)
+            with self._lock:
+                user = self._users.get(user_id)
+                if user is None:
+                    return 404, {'code': 404, 'error_code': 'user_not_found', 'msg': 'User not found'}
+                if method == 'GET':
+                    return 200, user
+                if method == 'PUT':
+                    user = dict(user, **{key: value for key, value in body.items() if key != 'user_metadata'})
+                    user['user_metadata'] = {**user['user_metadata'], **(body.get('user_metadata') or {})}
+                    user['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                    self._users[user_id] = user
+                    return 200, user
+                if method == 'DELETE':
+                    del self._users[user_id]
+                    self._emails.pop(user['email'], None)
+                    return 200, {}
+        return 404, {'code': 404, 'msg': 'Not found'}
+
+    def _create(self, body: Dict[str, Any], metadata: Optional[Dict[str, Any]]) -> Tuple[int, Any]:
+        email = (body.get('email') or '').lower()
+        if not email or not body.get('password'):
+            return 422, {'code': 422, 'error_code': 'validation_failed', 'msg': 'Email and password are required'}
+        with self._lock:
+            if email in self._emails:
+                return 422, {'code': 422, 'error_code': 'email_exists',
+                             'msg': 'A user with this email address has already been registered'}
+            user = fake_user(self._next_index)
+            self._next_index += 1
+            user.update(email=email, user_metadata=metadata or {})
+            self._insert(user)
+        return 200, user
+
+    def _token(self, grant_type: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            if grant_type == 'password':
+                user = self._users.get(self._emails.get((body.get('email') or '').lower(), ''))
+                if user is None or body.get('password') != FAKE_PASSWORD:
+                    user = None
+            elif grant_type == 'refresh_token':
+                user = self._users.get((body.get('refresh_token') or '').removeprefix('refresh-'))
+            else:
+                user = None
+        if user is None:
+            return 400, {'error': 'invalid_grant', 'error_description': 'Invalid login credentials'}
+        return 200, {
+            'access_token': f"fake-{uuid.uuid4().hex}",
+            'token_type': 'bearer',
+            'expires_in': 3600,
+            'refresh_token': f"refresh-{user['id']}",
+            'user': user,
+        }
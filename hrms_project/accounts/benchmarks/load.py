@@ -0,0 +1,248 @@
+import asyncio
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import httpx
+from django.conf import settings
+from django.urls import reverse
+
+from .fake_gotrue import FAKE_PASSWORD
+from .scenarios import SCENARIOS, Step
+
+ADMIN_EMAIL = 'user0@example.com'
+SEARCH_TERMS = ('user1', 'first2', 'last3', 'user4 last4', 'example', 'xyz')
+# CSRF_USE_SESSIONS keeps the token out of cookies, so it is read from the rendered form.
+CSRF_FIELD = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+@contextmanager
+def local_server(supabase_url: str, port: int = 0, rate_limits: bool = False,
+                 timeout: float = 30.0) -> Iterator[str]:
+    """
+    Run this project under ``manage.py runserver`` against ``supabase_url`` and yield its base URL.
+
+    The server gets a throwaway SQLite database in a temporary directory,
+    migrated before it starts and removed afterwards, so the configured
+    database is never written to. It also uses a per-process cache and no
+    health probe; rate limits are disabled unless ``rate_limits`` is set,
+    since every virtual user shares one address.
+    """
+    port = port or free_port()
+    workdir = tempfile.TemporaryDirectory(prefix='hrms-load-')
+    env = dict(os.environ, SUPABASE_URL=supabase_url, SUPABASE_KEY='load-test-service-role-key',
+               CACHE_BACKEND='locmem', SUPABASE_HEALTH_PROBE_INTERVAL='0',
+               SQLITE_PATH=os.path.join(workdir.name, 'load_test.sqlite3'))
+    if not rate_limits:
+        env.update({f'RATE_LIMIT_{name.upper()}': '' for name in settings.RATE_LIMITS})
+    try:
+        migrate = subprocess.run([sys.executable, 'manage.py', 'migrate', '--noinput'], cwd=str(settings.BASE_DIR),
+                                 env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        if migrate.returncode:
+            raise RuntimeError(f"migrating the load test database failed:\n{migrate.stdout}")
+    except BaseException:
+        workdir.cleanup()
+        raise
+    process = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}'],
+        cwd=str(settings.BASE_DIR), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"runserver exited with status {process.returncode}")
+            try:
+                httpx.get(base_url + reverse('accounts:login'), timeout=1.0)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"runserver did not answer within {timeout:.0f}s")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        workdir.cleanup()
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    def record(self, latency: float, status: str, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'error_rate': round(self.errors / count, 4) if count else 0.0,
+            'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+            **{f'p{int(q * 100)}_ms': round(percentile(ordered, q) * 1000, 2) for q in (0.5, 0.9, 0.95, 0.99)},
+            'max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+            'statuses': dict(self.statuses),
+        }
+
+
+class LoadTest:
+    """
+    Open-model load generator: starts virtual users at a fixed arrival rate.
+
+    Every ``1 / rate`` seconds for ``duration`` seconds a virtual user is
+    started on one of the weighted ``scenarios`` and runs its steps with its
+    own cookie jar, regardless of how earlier users are doing, so a slow
+    server shows up as latency rather than as fewer requests. At most
+    ``max_active`` users run at once; arrivals beyond that are counted as
+    dropped instead of queued. A step answered with an unexpected status,
+    or not at all, is an error and ends that user's scenario.
+    """
+
+    def __init__(self, base_url: str, mix: Dict[str, float], rate: float, duration: float, users: int,
+                 max_active: int = 200, think_ms: float = 0.0, timeout: float = 30.0, seed: Optional[int] = None):
+        unknown = set(mix) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        if rate <= 0 or duration <= 0:
+            raise ValueError("rate and duration must be positive")
+        self.base_url = base_url
+        self.mix = [(name, weight) for name, weight in mix.items() if weight > 0]
+        self.rate = rate
+        self.duration = duration
+        self.users = max(2, users)
+        self.max_active = max_active
+        self.think = think_ms / 1000
+        self.timeout = timeout
+        self.random = random.Random(seed)
+        self.routes: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self.outcomes: Counter = Counter()
+        self.active = 0
+        self.peak_active = 0
+        self.paths = {step.route: reverse(f'accounts:{step.route}')
+                      for steps in SCENARIOS.values() for step in steps}
+
+    def run(self) -> Dict[str, Any]:
+        return asyncio.run(self._run())
+
+    async def _run(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        names, weights = zip(*self.mix)
+        tasks = set()
+        started = loop.time()
+        arrivals = int(self.rate * self.duration)
+        for index in range(arrivals):
+            delay = started + index / self.rate - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.active >= self.max_active:
+                self.outcomes['dropped'] += 1
+                continue
+            scenario = self.random.choices(names, weights)[0]
+            task = asyncio.create_task(self._virtual_user(index, scenario))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        arrival_window = loop.time() - started
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = loop.time() - started
+        return self.report(elapsed, arrival_window, arrivals)
+
+    def _values(self, index: int, scenario: str) -> Dict[str, str]:
+        email = ADMIN_EMAIL if scenario == 'admin' else f'user{1 + index % (self.users - 1)}@example.com'
+        return {
+            'email': email,
+            'password': FAKE_PASSWORD,
+            'term': self.random.choice(SEARCH_TERMS),
+            'page': str(self.random.randint(1, max(1, self.users // 10))),
+        }
+
+    async def _virtual_user(self, index: int, scenario: str) -> None:
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        values = self._values(index, scenario)
+        try:
+            async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout) as client:
+                for position, step in enumerate(SCENARIOS[scenario]):
+                    if position and self.think:
+                        await asyncio.sleep(self.random.uniform(0.5, 1.5) * self.think)
+                    if not await self._request(client, step, values):
+                        self.outcomes[f'{scenario}:failed'] += 1
+                        return
+            self.outcomes[f'{scenario}:completed'] += 1
+        finally:
+            self.active -= 1
+
+    async def _request(self, client: httpx.AsyncClient, step: Step, values: Dict[str, str]) -> bool:
+        query = {key: value.format(**values) for key, value in step.query.items()}
+        form = None
+        if step.form is not None:
+            form = {key: value.format(**values) for key, value in step.form.items()}
+            form['csrfmiddlewaretoken'] = values.get('csrf') or client.cookies.get(settings.CSRF_COOKIE_NAME, '')
+        begin = time.perf_counter()
+        try:
+            response = await client.request(step.method, self.paths[step.route], params=query or None, data=form)
+            status, ok = str(response.status_code), response.status_code in step.expect
+            token = CSRF_FIELD.search(response.text) if 'html' in response.headers.get('content-type', '') else None
+            if token:
+                values['csrf'] = token.group(1)
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+        self.routes[step.label].record(time.perf_counter() - begin, status, ok)
+        return ok
+
+    def report(self, elapsed: float, arrival_window: float, arrivals: int) -> Dict[str, Any]:
+        total = RouteStats()
+        for stats in self.routes.values():
+            total.latencies.extend(stats.latencies)
+            total.statuses.update(stats.statuses)
+            total.errors += stats.errors
+        return {
+            'config': {
+                'base_url': self.base_url,
+                'mix': dict(self.mix),
+                'rate': self.rate,
+                'duration_s': self.duration,
+                'users': self.users,
+                'max_active': self.max_active,
+                'think_ms': self.think * 1000,
+            },
+            'elapsed_s': round(elapsed, 2),
+            'arrivals': arrivals,
+            'achieved_arrival_rate': round(arrivals / arrival_window, 2) if arrival_window else None,
+            'peak_active': self.peak_active,
+            'outcomes': dict(self.outcomes),
+            'total': total.summary(elapsed),
+            'routes': {label: stats.summary(elapsed) for label, stats in sorted(self.routes.items())},
+        }
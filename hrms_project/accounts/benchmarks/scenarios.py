@@ -0,0 +1,47 @@
+"""
+Scenario scripts for ``manage.py load_test``.
+
+A scenario is the ordered list of requests one virtual user makes. Routes
+are ``accounts`` URL names, resolved with ``reverse`` so the load follows
+``accounts/urls.py``. Query and form values may use ``{email}``,
+``{password}``, ``{term}`` and ``{page}``, filled in per virtual user.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Step:
+    route: str
+    method: str = 'GET'
+    query: Dict[str, str] = field(default_factory=dict)
+    form: Optional[Dict[str, str]] = None
+    expect: Tuple[int, ...] = (200,)
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+LOGIN = (
+    Step('login'),
+    Step('login', 'POST', form={'email': '{email}', 'password': '{password}'}, expect=(302,)),
+)
+
+SCENARIOS = {
+    # An administrator signs in, opens the dashboard, searches and pages through the user list.
+    'admin': LOGIN + (
+        Step('home', expect=(302,)),
+        Step('admin_dashboard'),
+        Step('list_users', query={'q': '{term}'}),
+        Step('list_users', query={'page': '{page}'}),
+        Step('users_api', query={'q': '{term}', 'limit': '50'}),
+        Step('logout', expect=(302,)),
+    ),
+    # An employee signs in, lands on their dashboard and signs out.
+    'employee': LOGIN + (
+        Step('home', expect=(302,)),
+        Step('user_dashboard'),
+        Step('logout', expect=(302,)),
+    ),
+}
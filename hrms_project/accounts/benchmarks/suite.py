@@ -0,0 +1,227 @@
+import gc
+import logging
+import os
+import platform
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import django
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from .. import supabase_client
+from ..services.user_cache import user_list_cache
+from ..services.user_service_v1 import UserService
+from .fake_gotrue import FAKE_PASSWORD, FakeGoTrue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (100, 10000, 100000)
+ADMIN_EMAIL = 'user0@example.com'
+# Settings for the duration of a run: a private in-memory cache, no rate limits (the
+# login benchmark would trip them), no background health probe, and Supabase-backed
+# views rather than the local mirror.
+BENCHMARK_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                           'LOCATION': 'hrms-benchmarks', 'OPTIONS': {'MAX_ENTRIES': 1000000}}},
+    'RATE_LIMITS': {},
+    'SUPABASE_HEALTH_PROBE_INTERVAL': 0,
+    'SUPABASE_JWT_SECRET': '',
+    'USERS_LOCAL_MIRROR': False,
+}
+
+
+def summarise(samples: Sequence[float], ops: int = 1) -> Dict[str, Any]:
+    """
+    Reduce per-sample timings (seconds) to millisecond statistics and a median-based throughput.
+    """
+    ordered = sorted(samples)
+    median = statistics.median(ordered)
+    return {
+        'samples': len(ordered),
+        'ops_per_sample': ops,
+        'min_ms': round(ordered[0] * 1000, 3),
+        'median_ms': round(median * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'stdev_ms': round(statistics.stdev(ordered) * 1000, 3) if len(ordered) > 1 else 0.0,
+        'ops_per_sec': round(ops / median, 1) if median else None,
+    }
+
+
+@contextmanager
+def benchmark_environment(fake: FakeGoTrue) -> Iterator[None]:
+    """
+    Point the app at ``fake`` and a throwaway test database for the duration of the block.
+    """
+    saved_env = {key: os.environ.get(key) for key in ('SUPABASE_URL', 'SUPABASE_KEY')}
+    os.environ['SUPABASE_URL'] = fake.url
+    os.environ['SUPABASE_KEY'] = 'benchmark-service-role-key'
+    supabase_client._clients.clear()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(**BENCHMARK_SETTINGS):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        supabase_client._clients.clear()
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+class BenchmarkSuite:
+    """
+    Times the user-facing hot paths against a :class:`FakeGoTrue` at several user counts.
+
+    Each benchmark runs ``warmup`` untimed and ``repeat`` timed samples; the
+    results are plain dictionaries so runs can be saved as JSON and compared
+    with :func:`compare`.
+    """
+
+    def __init__(self, sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = 5, warmup: int = 1,
+                 latency_ms: float = 0.0, only: Optional[Sequence[str]] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.sizes = list(sizes)
+        self.repeat = max(1, repeat)
+        self.warmup = max(0, warmup)
+        self.latency_ms = latency_ms
+        self.only = set(only) if only else None
+        self.progress = progress
+        self.results: List[Dict[str, Any]] = []
+
+    @property
+    def benchmarks(self) -> Dict[str, Callable[[int], None]]:
+        return {
+            'get_all_users.cold': self.bench_get_all_users_cold,
+            'get_all_users.warm': self.bench_get_all_users_warm,
+            'format_user': self.bench_format_user,
+            'list_users.page': self.bench_list_users_page,
+            'list_users.search': self.bench_list_users_search,
+            'proxy_supabase': self.bench_proxy_supabase,
+            'login_view': self.bench_login_view,
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every selected benchmark at every size and return the report.
+        """
+        started = time.time()
+        with FakeGoTrue(users=0, latency_ms=self.latency_ms) as fake:
+            with benchmark_environment(fake):
+                for size in self.sizes:
+                    fake.reset(size)
+                    user_list_cache.invalidate()
+                    self.admin = self._login(ADMIN_EMAIL)
+                    for name, bench in self.benchmarks.items():
+                        if self.only is None or name in self.only:
+                            bench(size)
+        return {
+            'meta': {
+                'started_at': started,
+                'duration_s': round(time.time() - started, 1),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'sizes': self.sizes,
+                'repeat': self.repeat,
+                'warmup': self.warmup,
+                'latency_ms': self.latency_ms,
+            },
+            'results': self.results,
+        }
+
+    def measure(self, name: str, size: int, sample: Callable[[], Any], ops: int = 1,
+                setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+        """
+        Time ``sample`` (after ``setup``, which is not timed) and record the summary.
+        """
+        timings = []
+        for iteration in range(self.warmup + self.repeat):
+            if setup is not None:
+                setup()
+            gc.collect()
+            begin = time.perf_counter()
+            sample()
+            elapsed = time.perf_counter() - begin
+            if iteration >= self.warmup:
+                timings.append(elapsed)
+        result = {'name': name, 'users': size, **summarise(timings, ops)}
+        self.results.append(result)
+        if self.progress is not None:
+            self.progress(result)
+        return result
+
+    def _login(self, email: str) -> Client:
+        client = Client()
+        response = client.post('/accounts/login/', {'email': email, 'password': FAKE_PASSWORD})
+        if response.status_code != 302:
+            raise RuntimeError(f"Benchmark login as {email} failed with status {response.status_code}")
+        return client
+
+    def _get(self, path: str) -> None:
+        response = self.admin.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+    def bench_get_all_users_cold(self, size: int) -> None:
+        self.measure('get_all_users.cold', size, lambda: UserService().get_all_users(), ops=size,
+                     setup=user_list_cache.invalidate)
+
+    def bench_get_all_users_warm(self, size: int) -> None:
+        service = UserService()
+        service.get_all_users()
+        self.measure('get_all_users.warm', size, service.get_all_users, ops=size)
+
+    def bench_format_user(self, size: int) -> None:
+        service = UserService()
+        users = service.get_all_users()
+        format_user = service.format_user
+        self.measure('format_user', size, lambda: [format_user(user) for user in users], ops=len(users))
+
+    def bench_list_users_page(self, size: int) -> None:
+        last_page = max(1, size // 10)
+        self.measure('list_users.page', size, lambda: self._get(f'/accounts/users/list/?page={last_page}'))
+
+    def bench_list_users_search(self, size: int) -> None:
+        self.measure('list_users.search', size, lambda: self._get('/accounts/users/list/?q=user1+last1&page=2'))
+
+    def bench_proxy_supabase(self, size: int) -> None:
+        def sample():
+            response = self.admin.post('/accounts/users/api/proxy-supabase/')
+            for _ in response.streaming_content:
+                pass
+        UserService().get_all_users()
+        self.measure('proxy_supabase', size, sample, ops=size)
+
+    def bench_login_view(self, size: int) -> None:
+        email = f'user{size - 1}@example.com'
+        self.measure('login_view', size, lambda: self._login(email))
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Pair each result with the same benchmark and size in ``baseline`` and report the median change.
+    """
+    previous = {(result['name'], result['users']): result for result in baseline.get('results', [])}
+    rows = []
+    for result in current['results']:
+        before = previous.get((result['name'], result['users']))
+        if before is None or not before['median_ms']:
+            continue
+        rows.append({
+            'name': result['name'],
+            'users': result['users'],
+            'baseline_ms': before['median_ms'],
+            'median_ms': result['median_ms'],
+            'change_pct': round((result['median_ms'] / before['median_ms'] - 1) * 100, 1),
+        })
+    return rows
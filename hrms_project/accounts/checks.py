@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    # The user list refill lock and shared rate-limit windows rely on atomic, never-culled cache keys.
+    backend = settings.CACHES['default']['BACKEND']
+    if backend.endswith('RedisCache'):
+        return []
+    if backend.endswith('LocMemCache'):
+        scope = "only hold within a single process"
+    else:
+        scope = "are best-effort between workers, since its add/incr are not atomic across processes"
+    return [Warning(
+        f"The default cache is {backend}, so the user list refill lock and shared rate limits {scope}.",
+        hint="Set REDIS_URL (CACHE_BACKEND=redis) for deployments with more than one worker.",
+        id='accounts.W001',
+    )]
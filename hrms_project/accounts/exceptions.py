@@ -4,10 +4,37 @@ class AuthenticationError(Exception):
 class UserCreationError(Exception):
     pass
 
+class UserAlreadyExistsError(UserCreationError):
+    pass
+
 class UserUpdateError(Exception):
     pass
 
 class UserDeletionError(Exception):
     pass
 class UserNotFoundException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class InvalidTokenError(Exception):
+    pass
+
+class TokenExpiredError(InvalidTokenError):
+    pass
+
+class LeaveRequestError(Exception):
+    pass
+
+class InsufficientLeaveBalanceError(LeaveRequestError):
+    pass
+
+class KYCError(Exception):
+    pass
+
+class KYCLeaseError(KYCError):
+    pass
+
+class KYCUploadError(KYCError):
+    pass
+
+class KYCUploadConflictError(KYCUploadError):
+    pass
@@ -0,0 +1,31 @@
+from django import forms
+from ..models import Employee
+
+class EmployeeForm(forms.ModelForm):
+    # Entered as an employee code and resolved with one unique-index lookup, instead of a
+    # <select> listing every employee.
+    manager = forms.ModelChoiceField(
+        queryset=Employee.objects.only('id', 'employee_code'), to_field_name='employee_code', required=False,
+        widget=forms.TextInput(attrs={'placeholder': 'Manager employee code'}),
+        error_messages={'invalid_choice': 'No employee has this code.'})
+
+    class Meta:
+        model = Employee
+        fields = ['employee_code', 'first_name', 'last_name', 'email', 'job_title', 'department', 'manager',
+                  'status', 'join_date', 'user_id']
+        widgets = {
+            'join_date': forms.DateInput(attrs={'type': 'date'}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.manager_id and not self.is_bound:
+            self.initial['manager'] = self.instance.manager.employee_code
+        for field in self.fields.values():
+            field.widget.attrs.setdefault('class', 'form-control')
+
+    def clean_manager(self):
+        manager = self.cleaned_data.get('manager')
+        if manager is not None and self.instance.pk and manager.pk == self.instance.pk:
+            raise forms.ValidationError("An employee cannot be their own manager.")
+        return manager
@@ -0,0 +1,35 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand
+from accounts.services.user_export import EXPORT_FORMATS, export_rows
+
+class Command(BaseCommand):
+    help = 'Stream the user directory as CSV or XLSX, optionally gzip-compressed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv', help='Output format')
+        parser.add_argument('--query', default='', help='Only export users matching this search, as in the user list')
+        parser.add_argument('--output', default='-', help='File to write, or - for stdout')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output (implied by a .gz output path)')
+
+    def handle(self, *args, **options):
+        writer, _ = EXPORT_FORMATS[options['format']]
+        path = options['output']
+        compress = options['gzip'] or path.endswith('.gz')
+        raw = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        handle = gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+        written = 0
+        try:
+            for chunk in writer(export_rows(options['query'])):
+                handle.write(chunk)
+                written += len(chunk)
+        finally:
+            if compress:
+                handle.close()
+            if raw is not sys.stdout.buffer:
+                raw.close()
+            else:
+                raw.flush()
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(f"Exported {written} bytes of {options['format']} to {path}"))
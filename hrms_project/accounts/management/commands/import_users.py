@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.services.user_import import ImportCheckpoint, UserImporter, read_user_rows
+
+class Command(BaseCommand):
+    help = 'Create Supabase users in bulk from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (email,password,first_name,last_name,is_admin) or JSONL file')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent create requests')
+        parser.add_argument('--rate', type=float, default=10.0, help='Max create requests per second (0 = unlimited)')
+        parser.add_argument('--checkpoint', help='Progress file; defaults to <path>.checkpoint')
+        parser.add_argument('--confirm-email', action='store_true', help='Mark imported emails as confirmed')
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['checkpoint'] or f"{options['path']}.checkpoint"
+        try:
+            # The input is opened first, so a bad path leaves no checkpoint file behind.
+            rows = read_user_rows(options['path'], options['format'])
+            checkpoint = ImportCheckpoint(checkpoint_path)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        importer = UserImporter(checkpoint, workers=options['workers'], rate=options['rate'],
+                                confirm_email=options['confirm_email'])
+        try:
+            stats = importer.run(rows)
+        finally:
+            checkpoint.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported users: {stats['created']} created, {stats['existing']} already existed, "
+            f"{stats['skipped']} skipped (checkpoint), {stats['failed']} failed"
+        ))
+        if stats['failed']:
+            self.stdout.write(self.style.WARNING(f"Re-run to retry failed rows; progress is kept in {checkpoint_path}"))
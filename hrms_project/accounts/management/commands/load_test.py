@@ -0,0 +1,61 @@
+import json
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from accounts.benchmarks.fake_gotrue import FakeGoTrue
+from accounts.benchmarks.load import LoadTest, local_server
+
+class Command(BaseCommand):
+    help = ('Drive the accounts routes with simulated admin and employee traffic at a fixed arrival rate. '
+            'Unless --url is given, the server is started on a throwaway, freshly migrated SQLite database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', type=float, default=20.0, help='Virtual users started per second')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to keep starting users')
+        parser.add_argument('--max-active', type=int, default=200, help='Most virtual users running at once')
+        parser.add_argument('--mix', default='admin=1,employee=4',
+                            help='Weighted scenarios, e.g. admin=1,employee=4')
+        parser.add_argument('--think-ms', type=float, default=0.0, help='Mean pause between a user\'s requests')
+        parser.add_argument('--users', type=int, default=1000, help='Users in the fake Supabase auth server')
+        parser.add_argument('--latency-ms', type=float, default=0.0,
+                            help='Latency the fake auth server adds to every response')
+        parser.add_argument('--fake-port', type=int, default=0, help='Port for the fake auth server (0: any)')
+        parser.add_argument('--url', help='Load an already running server instead of starting runserver; it '
+                                          'must use the fake auth server (see --fake-port) as SUPABASE_URL, and '
+                                          'the load writes to whatever database it uses')
+        parser.add_argument('--rate-limits', action='store_true',
+                            help='Keep the configured rate limits on the started server')
+        parser.add_argument('--seed', type=int, help='Seed for scenario choice and request values')
+        parser.add_argument('--output', help='Also write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        try:
+            mix = {name.strip(): float(weight) for name, _, weight in
+                   (part.partition('=') for part in options['mix'].split(',') if part.strip())}
+        except ValueError:
+            raise CommandError("--mix must look like admin=1,employee=4")
+
+        with FakeGoTrue(users=options['users'], latency_ms=options['latency_ms'], port=options['fake_port']) as fake:
+            self.stdout.write(f"Fake Supabase auth at {fake.url} with {options['users']} users")
+            server = nullcontext(options['url']) if options['url'] else local_server(fake.url,
+                                                                                    rate_limits=options['rate_limits'])
+            with server as base_url:
+                try:
+                    test = LoadTest(base_url, mix, options['rate'], options['duration'], options['users'],
+                                    options['max_active'], options['think_ms'], seed=options['seed'])
+                except ValueError as e:
+                    raise CommandError(str(e))
+                self.stdout.write(f"Loading {base_url}: {options['rate']}/s for {options['duration']}s")
+                report = test.run()
+
+        self.stdout.write(f"{'route':<24} {'reqs':>7} {'err%':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for label, stats in list(report['routes'].items()) + [('TOTAL', report['total'])]:
+            self.stdout.write(f"{label:<24} {stats['requests']:>7} {stats['error_rate'] * 100:>6.1f} "
+                              f"{stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+                              f"{stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+        self.stdout.write(f"Outcomes: {report['outcomes']}; peak active {report['peak_active']}, "
+                          f"achieved arrival rate {report['achieved_arrival_rate']}/s")
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote report to {options['output']}"))
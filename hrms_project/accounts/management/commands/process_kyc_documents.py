@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from accounts.services.kyc_documents import KYCDocumentProcessor
+
+class Command(BaseCommand):
+    help = 'Checksum, validate and thumbnail KYC documents still waiting for processing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='Maximum documents to process')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default KYC_PROCESS_WORKERS)')
+        parser.add_argument('--include-processing', action='store_true',
+                            help='Also retry documents a restart left marked as processing')
+
+    def handle(self, *args, **options):
+        processor = KYCDocumentProcessor(workers=options['workers'])
+        stats = processor.process_queued(limit=options['limit'], include_processing=options['include_processing'])
+        summary = ', '.join(f"{count} {status}" for status, count in sorted(stats.items())) or 'nothing to do'
+        self.stdout.write(self.style.SUCCESS(f"Processed KYC documents: {summary}"))
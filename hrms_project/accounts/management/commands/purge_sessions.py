@@ -0,0 +1,21 @@
+from importlib import import_module
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from accounts.session_store import SessionStore
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in batches (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Rows deleted per statement (default: SESSION_PURGE_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if issubclass(store, SessionStore):
+            deleted = store.clear_expired(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired sessions'))
+        else:
+            # Other engines purge in one statement, or have nothing to purge (signed cookies).
+            store.clear_expired()
+            self.stdout.write(self.style.SUCCESS(f'Purged expired sessions using {settings.SESSION_ENGINE}'))
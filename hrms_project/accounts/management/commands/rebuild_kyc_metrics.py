@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from accounts.services.kyc_metrics import KYCMetrics
+
+class Command(BaseCommand):
+    help = 'Recompute the KYC report metrics from all KYC applications'
+
+    def handle(self, *args, **options):
+        written = KYCMetrics().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt KYC metrics: {written} day rows"))
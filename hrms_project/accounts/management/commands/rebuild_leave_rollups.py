@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from accounts.services.leave_rollup import LeaveRollups
+
+class Command(BaseCommand):
+    help = 'Recompute the daily leave report rollups from approved leave requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows read and written per batch')
+
+    def handle(self, *args, **options):
+        written = LeaveRollups().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} leave rollup rows"))
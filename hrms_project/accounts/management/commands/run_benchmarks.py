@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from accounts.benchmarks.suite import DEFAULT_SIZES, BenchmarkSuite, compare
+
+class Command(BaseCommand):
+    help = 'Benchmark the user hot paths against a local fake Supabase auth server and write the results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                            help='Comma-separated user counts to benchmark at')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed samples per benchmark')
+        parser.add_argument('--warmup', type=int, default=1, help='Untimed samples before timing')
+        parser.add_argument('--latency-ms', type=float, default=0.0,
+                            help='Latency the fake auth server adds to every response')
+        parser.add_argument('--only', action='append', help='Run only this benchmark (repeatable)')
+        parser.add_argument('--output', default='benchmarks.json', help='JSON file to write the results to')
+        parser.add_argument('--baseline', help='Earlier results file to compare medians against')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+        suite = BenchmarkSuite(sizes, options['repeat'], options['warmup'], options['latency_ms'], options['only'],
+                               progress=lambda r: self.stdout.write(
+                                   f"{r['name']:<20} {r['users']:>7} users  median {r['median_ms']:>10.3f} ms  "
+                                   f"p95 {r['p95_ms']:>10.3f} ms  {r['ops_per_sec']} ops/s"))
+        unknown = set(options['only'] or ()) - set(suite.benchmarks)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+        report = suite.run()
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as handle:
+                report['comparison'] = compare(report, json.load(handle))
+            for row in report['comparison']:
+                self.stdout.write(f"{row['name']:<20} {row['users']:>7} users  {row['baseline_ms']:>10.3f} -> "
+                                  f"{row['median_ms']:>10.3f} ms  ({row['change_pct']:+.1f}%)")
+        with open(options['output'], 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(report['results'])} results to {options['output']}"))
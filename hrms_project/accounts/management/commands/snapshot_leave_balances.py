@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from accounts.services.leave_balance import LeaveBalanceEngine
+
+class Command(BaseCommand):
+    help = 'Fold the leave ledger into per-employee balance snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=int, default=300,
+                            help='Leave ledger entries younger than this many seconds as deltas')
+
+    def handle(self, *args, **options):
+        written = LeaveBalanceEngine().snapshot(lag_seconds=options['lag'])
+        self.stdout.write(self.style.SUCCESS(f"Snapshotted {written} leave balances"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from accounts.services.user_mirror import UserMirror
+
+class Command(BaseCommand):
+    help = 'Mirror Supabase auth users into the local SupabaseUser table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only write users updated since the last sync; keep rows deleted upstream')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk_create/bulk_update')
+        parser.add_argument('--per-page', type=int, default=None, help='Users requested per upstream page')
+
+    def handle(self, *args, **options):
+        mirror = UserMirror(batch_size=options['batch_size'])
+        stats = mirror.sync(full=not options['incremental'], per_page=options['per_page'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced users: {stats['seen']} seen, {stats['created']} created, "
+            f"{stats['updated']} updated, {stats['deleted']} deleted"
+        ))
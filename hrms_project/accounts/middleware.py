@@ -0,0 +1,93 @@
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from .exceptions import AuthenticationError, InvalidTokenError, TokenExpiredError
+from .services.auth_service import AuthService
+from .services.jwt_verifier import get_token_verifier
+from .utils.session import SESSION_REFRESH_KEY, SESSION_TOKEN_KEY, store_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class SupabaseJWTMiddleware:
+    """
+    Verify the caller's Supabase access token locally and expose its claims.
+
+    The token comes from an ``Authorization: Bearer`` header or, for browser
+    sessions, from ``session['access_token']``. Verified claims are attached
+    as ``request.supabase_claims`` (None if there is no valid token).
+    Session tokens that are expired or within ``SUPABASE_JWT_REFRESH_MARGIN``
+    seconds of expiry are refreshed with the stored refresh token.
+
+    Not used unless ``SUPABASE_JWT_SECRET`` is set. Must come after
+    ``SessionMiddleware``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SUPABASE_JWT_SECRET:
+            raise MiddlewareNotUsed("SUPABASE_JWT_SECRET is not set")
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self.authenticate(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Session access and token refresh are synchronous; one thread hop covers both.
+        await sync_to_async(self.authenticate)(request)
+        return await self.get_response(request)
+
+    def authenticate(self, request):
+        request.supabase_claims = None
+        verifier = get_token_verifier()
+
+        header = request.headers.get('Authorization', '')
+        if header.startswith('Bearer '):
+            try:
+                request.supabase_claims = verifier.verify(header[7:].strip())
+            except InvalidTokenError as e:
+                logger.info(f"Rejected bearer token: {str(e)}")
+            return
+
+        token = request.session.get(SESSION_TOKEN_KEY)
+        if not token:
+            return
+        try:
+            claims = verifier.verify(token)
+        except TokenExpiredError:
+            claims = None
+        except InvalidTokenError as e:
+            logger.warning(f"Invalid session token: {str(e)}")
+            return
+
+        if claims is None or claims['exp'] - time.time() < settings.SUPABASE_JWT_REFRESH_MARGIN:
+            claims = self._refresh(request, verifier) or claims
+        request.supabase_claims = claims
+
+    def _refresh(self, request, verifier):
+        refresh_token = request.session.get(SESSION_REFRESH_KEY)
+        if not refresh_token:
+            return None
+        # GoTrue rotates refresh tokens, so only one concurrent request per session spends it;
+        # the others carry on with the current token while it is still valid.
+        if not cache.add(f"auth:v1:refreshing:{request.session.session_key}", 1, 10):
+            return None
+        try:
+            tokens = AuthService.refresh(refresh_token)
+            claims = verifier.verify(tokens['access_token'])
+        except (AuthenticationError, InvalidTokenError) as e:
+            logger.warning(f"Could not refresh session token: {str(e)}")
+            return None
+        store_tokens(request.session, tokens)
+        return claims
@@ -0,0 +1,44 @@
+# Generated by Django 5.1 on 2026-10-18 16:48
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupabaseUser',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('is_admin', models.BooleanField(default=False)),
+                ('email_confirmed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+                ('last_sign_in_at', models.DateTimeField(blank=True, null=True)),
+                ('user_metadata', models.JSONField(blank=True, default=dict)),
+                ('app_metadata', models.JSONField(blank=True, default=dict)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['email'],
+                'indexes': [models.Index(fields=['email'], name='supabase_user_email_idx'), models.Index(django.db.models.functions.text.Lower('email'), name='supabase_user_email_lower_idx'), models.Index(django.db.models.functions.text.Lower('first_name'), name='supabase_user_first_lower_idx'), models.Index(django.db.models.functions.text.Lower('last_name'), name='supabase_user_last_lower_idx'), models.Index(fields=['last_name', 'first_name'], name='supabase_user_name_idx'), models.Index(fields=['is_admin', 'email'], name='supabase_user_admin_idx'), models.Index(fields=['updated_at'], name='supabase_user_updated_idx'), models.Index(fields=['created_at'], name='supabase_user_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('high_water', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1 on 2026-10-18 16:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Department',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Employee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.UUIDField(blank=True, null=True, unique=True)),
+                ('employee_code', models.CharField(max_length=32, unique=True)),
+                ('first_name', models.CharField(max_length=150)),
+                ('last_name', models.CharField(max_length=150)),
+                ('email', models.EmailField(max_length=254)),
+                ('job_title', models.CharField(blank=True, max_length=150)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('on_leave', 'On leave'), ('terminated', 'Terminated')], default='active', max_length=16)),
+                ('join_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='employees', to='accounts.department')),
+                ('manager', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='accounts.employee')),
+            ],
+            options={
+                'ordering': ['-join_date', '-id'],
+                'indexes': [models.Index(fields=['-join_date', '-id'], name='employee_join_idx'), models.Index(fields=['department', '-join_date', '-id'], name='employee_dept_join_idx'), models.Index(fields=['status', '-join_date', '-id'], name='employee_status_join_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.1 on 2026-10-18 17:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_employee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=16, unique=True)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaveRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('days', models.DecimalField(blank=True, decimal_places=1, max_digits=5)),
+                ('reason', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=16)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('decided_at', models.DateTimeField(blank=True, null=True)),
+                ('decided_by', models.CharField(blank=True, max_length=254)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_requests', to='accounts.employee')),
+                ('leave_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='requests', to='accounts.leavetype')),
+            ],
+            options={
+                'ordering': ['start_date', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaveLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('accrual', 'Accrual'), ('usage', 'Usage'), ('adjustment', 'Adjustment')], max_length=16)),
+                ('days', models.DecimalField(decimal_places=1, max_digits=6)),
+                ('entry_date', models.DateField()),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_entries', to='accounts.employee')),
+                ('leave_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='ledger_entries', to='accounts.leaverequest')),
+                ('leave_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='accounts.leavetype')),
+            ],
+            options={
+                'verbose_name_plural': 'leave ledger entries',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaveBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=1, max_digits=7)),
+                ('last_entry_id', models.BigIntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_snapshots', to='accounts.employee')),
+                ('leave_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='snapshots', to='accounts.leavetype')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'start_date', 'id'], name='leave_request_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['employee', 'status'], name='leave_request_employee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveledgerentry',
+            index=models.Index(fields=['employee', 'leave_type', 'id'], name='leave_ledger_pair_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveledgerentry',
+            index=models.Index(fields=['entry_date'], name='leave_ledger_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leavebalancesnapshot',
+            constraint=models.UniqueConstraint(fields=('employee', 'leave_type'), name='leave_snapshot_pair_unique'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1 on 2026-10-18 17:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_leave_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaverequest',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled')], default='pending', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='leaverequest',
+            name='rollup_department_key',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='LeaveDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('department_key', models.IntegerField(default=0)),
+                ('days', models.DecimalField(decimal_places=2, default=0, max_digits=9)),
+                ('employees', models.IntegerField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leave_rollups', to='accounts.department')),
+                ('leave_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='accounts.leavetype')),
+            ],
+            options={
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'department_key', 'leave_type'), name='leave_rollup_key_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-18 17:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_leave_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KYCApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_type', models.CharField(choices=[('passport', 'Passport'), ('national_id', 'National ID'), ('driving_licence', 'Driving licence'), ('other', 'Other')], max_length=32)),
+                ('document_number', models.CharField(blank=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=16)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('reviewed_by', models.CharField(blank=True, max_length=254)),
+                ('review_notes', models.TextField(blank=True)),
+                ('lease_owner', models.CharField(blank=True, max_length=254)),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kyc_applications', to='accounts.employee')),
+            ],
+            options={
+                'ordering': ['submitted_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'submitted_at', 'id'], name='kyc_queue_idx'), models.Index(fields=['lease_owner', 'lease_expires_at'], name='kyc_lease_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_kyc_application'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KYCDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upload_id', models.UUIDField(unique=True)),
+                ('original_name', models.CharField(max_length=255)),
+                ('content_type', models.CharField(max_length=100)),
+                ('size', models.BigIntegerField()),
+                ('received_bytes', models.BigIntegerField(default=0)),
+                ('file_path', models.CharField(max_length=255)),
+                ('storage_path', models.CharField(blank=True, max_length=255)),
+                ('thumbnail_path', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('queued', 'Queued'), ('processing', 'Processing'), ('ready', 'Ready'), ('invalid', 'Invalid'), ('failed', 'Failed')], default='uploading', max_length=16)),
+                ('sha256', models.CharField(blank=True, max_length=64)),
+                ('detected_format', models.CharField(blank=True, max_length=16)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('processing_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='accounts.kycapplication')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='kyc_document_status_idx')],
+            },
+        ),
+    ]
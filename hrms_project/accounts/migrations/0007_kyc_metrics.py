@@ -0,0 +1,42 @@
+# Generated by Django 5.1 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_kyc_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KYCBacklogBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(unique=True)),
+                ('pending', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['hour'],
+            },
+        ),
+        migrations.CreateModel(
+            name='KYCMetricsDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('reviewer', models.CharField(blank=True, max_length=254)),
+                ('submitted', models.PositiveIntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('turnaround_seconds', models.FloatField(default=0)),
+                ('turnaround_sketch', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'KYC metrics days',
+                'ordering': ['day', 'reviewer'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'reviewer'), name='kyc_metrics_day_unique')],
+            },
+        ),
+    ]
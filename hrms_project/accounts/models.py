@@ -1,3 +1,484 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
 
-# Create your models here.
+
+# Sorts after any character in real text: [term, term + PREFIX_END) is every string starting with term.
+PREFIX_END = '\U0010ffff'
+
+
+class SupabaseUserQuerySet(models.QuerySet):
+    def search(self, query: str) -> 'SupabaseUserQuerySet':
+        """
+        Filter to users whose email, first or last name starts with every term of ``query``, ignoring case.
+
+        Each term is a range on ``LOWER(column)``, which the lowercase
+        expression indexes serve, narrowed to exact prefix matches.
+        """
+        queryset = self.alias(email_key=Lower('email'), first_name_key=Lower('first_name'),
+                              last_name_key=Lower('last_name'))
+        for term in query.lower().split():
+            matches = Q()
+            for key in ('email_key', 'first_name_key', 'last_name_key'):
+                matches |= Q(**{f'{key}__gte': term, f'{key}__lt': term + PREFIX_END, f'{key}__startswith': term})
+            queryset = queryset.filter(matches)
+        return queryset
+
+    def formatted(self) -> 'SupabaseUserQuerySet':
+        """
+        Return rows as dictionaries shaped like ``UserService.format_user`` output.
+        """
+        return self.values(*SupabaseUser.FORMATTED_FIELDS)
+
+
+class SupabaseUser(models.Model):
+    """
+    Local mirror of a Supabase auth user, kept up to date by ``sync_users``.
+    """
+
+    FORMATTED_FIELDS = ('id', 'email', 'is_admin', 'first_name', 'last_name', 'created_at',
+                        'last_sign_in_at', 'email_confirmed')
+
+    id = models.UUIDField(primary_key=True)
+    email = models.CharField(max_length=254, blank=True)
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    is_admin = models.BooleanField(default=False)
+    email_confirmed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(null=True, blank=True)
+    last_sign_in_at = models.DateTimeField(null=True, blank=True)
+    user_metadata = models.JSONField(default=dict, blank=True)
+    app_metadata = models.JSONField(default=dict, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    objects = SupabaseUserQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['email']
+        indexes = [
+            models.Index(fields=['email'], name='supabase_user_email_idx'),
+            models.Index(Lower('email'), name='supabase_user_email_lower_idx'),
+            models.Index(Lower('first_name'), name='supabase_user_first_lower_idx'),
+            models.Index(Lower('last_name'), name='supabase_user_last_lower_idx'),
+            models.Index(fields=['last_name', 'first_name'], name='supabase_user_name_idx'),
+            models.Index(fields=['is_admin', 'email'], name='supabase_user_admin_idx'),
+            models.Index(fields=['updated_at'], name='supabase_user_updated_idx'),
+            models.Index(fields=['created_at'], name='supabase_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.email
+
+
+class SyncCheckpoint(models.Model):
+    """
+    Progress of a named sync job, e.g. the upstream ``updated_at`` high-water mark of the user mirror.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    high_water = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.high_water}"
+
+
+class Department(models.Model):
+    name = models.CharField(max_length=150, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class EmployeeQuerySet(models.QuerySet):
+    # Columns the employee list renders; everything else stays unloaded.
+    LISTING_FIELDS = ('id', 'employee_code', 'first_name', 'last_name', 'email', 'job_title', 'status',
+                      'join_date', 'department', 'department__name', 'manager', 'manager__first_name',
+                      'manager__last_name')
+
+    def listing(self) -> 'EmployeeQuerySet':
+        """
+        Rows for the employee list: department and manager joined in, only the listed columns loaded,
+        newest joiners first.
+        """
+        return (self.select_related('department', 'manager').only(*self.LISTING_FIELDS)
+                .order_by('-join_date', '-id'))
+
+    def after(self, join_date, pk: int) -> 'EmployeeQuerySet':
+        """
+        Keyset filter: rows that come after ``(join_date, pk)`` in ``listing()`` order.
+        """
+        return self.filter(Q(join_date__lt=join_date) | Q(join_date=join_date, id__lt=pk))
+
+
+class Employee(models.Model):
+    """
+    An employee record, optionally linked to the Supabase auth user who signs in as them.
+    """
+
+    STATUS_ACTIVE = 'active'
+    STATUS_ON_LEAVE = 'on_leave'
+    STATUS_TERMINATED = 'terminated'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_ON_LEAVE, 'On leave'),
+        (STATUS_TERMINATED, 'Terminated'),
+    ]
+
+    # Supabase auth user id; not a foreign key because the local mirror is optional.
+    user_id = models.UUIDField(unique=True, null=True, blank=True)
+    employee_code = models.CharField(max_length=32, unique=True)
+    first_name = models.CharField(max_length=150)
+    last_name = models.CharField(max_length=150)
+    email = models.EmailField(max_length=254)
+    job_title = models.CharField(max_length=150, blank=True)
+    department = models.ForeignKey(Department, on_delete=models.PROTECT, null=True, blank=True,
+                                   related_name='employees')
+    manager = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='reports')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    join_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EmployeeQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-join_date', '-id']
+        # department and manager are indexed as foreign keys; these serve the keyset listing,
+        # alone and filtered by department or status.
+        indexes = [
+            models.Index(fields=['-join_date', '-id'], name='employee_join_idx'),
+            models.Index(fields=['department', '-join_date', '-id'], name='employee_dept_join_idx'),
+            models.Index(fields=['status', '-join_date', '-id'], name='employee_status_join_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.first_name} {self.last_name} ({self.employee_code})"
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
+class LeaveType(models.Model):
+    code = models.CharField(max_length=16, unique=True)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class LeaveRequest(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_APPROVED = 'approved'
+    STATUS_REJECTED = 'rejected'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_APPROVED, 'Approved'),
+        (STATUS_REJECTED, 'Rejected'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_requests')
+    leave_type = models.ForeignKey(LeaveType, on_delete=models.PROTECT, related_name='requests')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    # Defaults to the calendar days in the range; may be set lower (e.g. half days, weekends).
+    days = models.DecimalField(max_digits=5, decimal_places=1, blank=True)
+    reason = models.TextField(blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    decided_at = models.DateTimeField(null=True, blank=True)
+    decided_by = models.CharField(max_length=254, blank=True)
+    # LeaveDailyRollup.department_key the approval was counted under, so a cancellation
+    # reverses it there even if the employee has moved department since.
+    rollup_department_key = models.IntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['start_date', 'id']
+        indexes = [
+            models.Index(fields=['status', 'start_date', 'id'], name='leave_request_status_idx'),
+            models.Index(fields=['employee', 'status'], name='leave_request_employee_idx'),
+        ]
+
+    def clean(self):
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValidationError({'end_date': "End date cannot be before the start date."})
+
+    def save(self, *args, **kwargs):
+        if self.days is None:
+            self.days = (self.end_date - self.start_date).days + 1
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.employee_id} {self.leave_type_id} {self.start_date}..{self.end_date} ({self.status})"
+
+
+class LeaveLedgerEntry(models.Model):
+    """
+    One signed movement of an employee's leave balance: positive for accruals, negative for usage.
+
+    The ledger is append-only; corrections are new ``adjustment`` entries. A
+    balance is its latest ``LeaveBalanceSnapshot`` plus the entries after the
+    snapshot's ``last_entry_id``.
+    """
+
+    KIND_ACCRUAL = 'accrual'
+    KIND_USAGE = 'usage'
+    KIND_ADJUSTMENT = 'adjustment'
+    KIND_CHOICES = [
+        (KIND_ACCRUAL, 'Accrual'),
+        (KIND_USAGE, 'Usage'),
+        (KIND_ADJUSTMENT, 'Adjustment'),
+    ]
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_entries')
+    leave_type = models.ForeignKey(LeaveType, on_delete=models.PROTECT, related_name='ledger_entries')
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    days = models.DecimalField(max_digits=6, decimal_places=1)
+    entry_date = models.DateField()
+    # RESTRICT rather than PROTECT: a request can't be deleted out from under its ledger
+    # entries, but both go when their employee is deleted.
+    leave_request = models.ForeignKey(LeaveRequest, on_delete=models.RESTRICT, null=True, blank=True,
+                                      related_name='ledger_entries')
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name_plural = 'leave ledger entries'
+        indexes = [
+            models.Index(fields=['employee', 'leave_type', 'id'], name='leave_ledger_pair_idx'),
+            models.Index(fields=['entry_date'], name='leave_ledger_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Leave ledger entries are append-only; add an adjustment instead")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Leave ledger entries are append-only; add an adjustment instead")
+
+
+class LeaveBalanceSnapshot(models.Model):
+    """
+    An employee's balance for one leave type, folded over every ledger entry up to ``last_entry_id``.
+
+    Written by ``manage.py snapshot_leave_balances``, for every pair at the same watermark.
+    """
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_snapshots')
+    leave_type = models.ForeignKey(LeaveType, on_delete=models.PROTECT, related_name='snapshots')
+    balance = models.DecimalField(max_digits=7, decimal_places=1)
+    last_entry_id = models.BigIntegerField()
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'leave_type'], name='leave_snapshot_pair_unique'),
+        ]
+
+
+class LeaveDailyRollup(models.Model):
+    """
+    Approved leave per day, department and leave type, maintained as leaves are approved or cancelled.
+
+    ``days`` is the leave taken that day (a request's days spread over its
+    date range) and ``employees`` the number of people on leave. Cells are
+    keyed by ``department_key`` (the department id, 0 for none) rather than
+    the nullable ``department``, so the unique key holds on every database.
+    """
+
+    NO_DEPARTMENT = 0
+
+    day = models.DateField()
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True,
+                                   related_name='leave_rollups')
+    department_key = models.IntegerField(default=NO_DEPARTMENT)
+    leave_type = models.ForeignKey(LeaveType, on_delete=models.CASCADE, related_name='rollups')
+    days = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+    employees = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            # Leads with day, so it also serves the date range scans of reports.
+            models.UniqueConstraint(fields=['day', 'department_key', 'leave_type'], name='leave_rollup_key_unique'),
+        ]
+
+
+class KYCApplicationQuerySet(models.QuerySet):
+    def available(self, now) -> 'KYCApplicationQuerySet':
+        """
+        Pending applications nobody holds a live lease on.
+        """
+        return self.filter(Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now),
+                           status=KYCApplication.STATUS_PENDING)
+
+    def leased_by(self, reviewer: str, now) -> 'KYCApplicationQuerySet':
+        return self.under_lease(now).filter(lease_owner=reviewer)
+
+    def under_lease(self, now) -> 'KYCApplicationQuerySet':
+        """
+        Pending applications under a live lease.
+        """
+        return self.filter(status=KYCApplication.STATUS_PENDING, lease_expires_at__gt=now)
+
+
+class KYCApplication(models.Model):
+    """
+    An employee's KYC submission awaiting or past review.
+
+    Reviewers take pending applications from ``KYCQueue`` under a lease
+    (``lease_owner`` until ``lease_expires_at``); ``version`` increases on
+    every claim and decision so concurrent writers can detect each other.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_APPROVED = 'approved'
+    STATUS_REJECTED = 'rejected'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_APPROVED, 'Approved'),
+        (STATUS_REJECTED, 'Rejected'),
+    ]
+    DOCUMENT_TYPE_CHOICES = [
+        ('passport', 'Passport'),
+        ('national_id', 'National ID'),
+        ('driving_licence', 'Driving licence'),
+        ('other', 'Other'),
+    ]
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='kyc_applications')
+    document_type = models.CharField(max_length=32, choices=DOCUMENT_TYPE_CHOICES)
+    document_number = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    reviewed_by = models.CharField(max_length=254, blank=True)
+    review_notes = models.TextField(blank=True)
+    lease_owner = models.CharField(max_length=254, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=0)
+
+    objects = KYCApplicationQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['submitted_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'submitted_at', 'id'], name='kyc_queue_idx'),
+            models.Index(fields=['lease_owner', 'lease_expires_at'], name='kyc_lease_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        # Imported here: the metrics service imports this module.
+        from .services.kyc_metrics import KYCMetrics
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            KYCMetrics().record_submission(self)
+
+    def __str__(self):
+        return f"KYC {self.pk} ({self.get_document_type_display()}, {self.status})"
+
+
+class KYCMetricsDay(models.Model):
+    """
+    KYC activity for one day and reviewer, maintained on every submission and decision.
+
+    Submissions are counted on the row with an empty ``reviewer``.
+    ``turnaround_sketch`` holds a ``QuantileSketch`` of submission-to-decision
+    seconds, so percentiles for any set of rows come from merging sketches.
+    """
+
+    day = models.DateField()
+    reviewer = models.CharField(max_length=254, blank=True)
+    submitted = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    turnaround_seconds = models.FloatField(default=0)
+    turnaround_sketch = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['day', 'reviewer']
+        verbose_name_plural = 'KYC metrics days'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'reviewer'], name='kyc_metrics_day_unique'),
+        ]
+
+
+class KYCBacklogBucket(models.Model):
+    """
+    Pending KYC applications by the hour they were submitted; the backlog's age distribution.
+    """
+
+    hour = models.DateTimeField(unique=True)
+    pending = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['hour']
+
+
+class KYCDocument(models.Model):
+    """
+    A document uploaded for a KYC application, in chunks, then inspected off the request path.
+
+    ``received_bytes`` is the resume offset while ``status`` is ``uploading``;
+    the checksum, detected format, dimensions and thumbnail are filled in by
+    ``KYCDocumentProcessor``.
+    """
+
+    STATUS_UPLOADING = 'uploading'
+    STATUS_QUEUED = 'queued'
+    STATUS_PROCESSING = 'processing'
+    STATUS_READY = 'ready'
+    STATUS_INVALID = 'invalid'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, 'Uploading'),
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_INVALID, 'Invalid'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    application = models.ForeignKey(KYCApplication, on_delete=models.CASCADE, related_name='documents')
+    upload_id = models.UUIDField(unique=True)
+    original_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.BigIntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+    # Relative to KYC_UPLOAD_ROOT; storage_path is the Supabase Storage key once pushed there.
+    file_path = models.CharField(max_length=255)
+    storage_path = models.CharField(max_length=255, blank=True)
+    thumbnail_path = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_UPLOADING)
+    sha256 = models.CharField(max_length=64, blank=True)
+    detected_format = models.CharField(max_length=16, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    processing_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='kyc_document_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.original_name} ({self.status})"
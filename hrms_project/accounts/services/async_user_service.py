@@ -0,0 +1,146 @@
+import os
+import httpx
+from asgiref.sync import sync_to_async
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from dotenv import load_dotenv
+from ..exceptions import UserUpdateError, UserDeletionError, UserNotFoundException
+from .http_client import get_async_http_client
+from .pagination import aiter_pages
+from .user_cache import user_entity_cache, user_list_cache
+from .user_directory import get_directory
+from .user_service_v1 import UserService
+
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+class AsyncUserService:
+    """
+    Non-blocking counterpart of ``user_service_v1.UserService`` for async views.
+
+    It shares the ``user_list_cache`` entries and the formatted user shape with
+    the sync service, so both can serve the same deployment side by side.
+    """
+
+    def __init__(self):
+        self.supabase_url = os.getenv('SUPABASE_URL')
+        self.service_role_key = os.getenv('SUPABASE_KEY')
+        if not self.supabase_url or not self.service_role_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
+        self.headers = {
+            'apikey': self.service_role_key,
+            'Authorization': f'Bearer {self.service_role_key}'
+        }
+        self.http = get_async_http_client()
+
+    async def get_all_users(self):
+        try:
+            # Misses are fetched here with concurrent async page requests; stale
+            # lists are refreshed by the cache's background thread with the sync loader.
+            return await user_list_cache.aget(UserService()._load_all_users, self._load_all_users)
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching all users: {str(e)}")
+            raise
+
+    async def _load_all_users(self):
+        return [user async for user in self.iter_users()]
+
+    async def get_directory(self):
+        version = await cache.aget(user_list_cache.VERSION_KEY)
+        users = None
+        if version is None:
+            users = await self.get_all_users()
+            version = await cache.aget(user_list_cache.VERSION_KEY)
+
+        def load_users():
+            return (users if users is not None else user_list_cache.peek() or []), version
+
+        # Syncing the index is CPU-bound and reads the cache synchronously, so it runs in a thread.
+        return await sync_to_async(get_directory)(version, load_users, self.format_user,
+                                                  user_list_cache.changes_since)
+
+    async def stream_users(self):
+        cached_users = await cache.aget(user_list_cache.USERS_KEY)
+        if cached_users is not None:
+            for user in cached_users:
+                yield user
+            return
+        async for user in self.iter_users():
+            yield user
+
+    async def iter_users(self, per_page=None, prefetch=None):
+        pages = aiter_pages(
+            self._fetch_users_page,
+            per_page or settings.SUPABASE_USERS_PER_PAGE,
+            settings.SUPABASE_USERS_PREFETCH if prefetch is None else prefetch,
+        )
+        async for rows in pages:
+            for user in rows:
+                yield user
+
+    async def _fetch_users_page(self, page, per_page):
+        response = await self.http.get(f"{self.supabase_url}/auth/v1/admin/users", headers=self.headers,
+                                       params={'page': page, 'per_page': per_page})
+        response.raise_for_status()
+        users = response.json()
+        if not isinstance(users, list):
+            users = users.get('users', [])
+        return users
+
+    async def get_user_by_id(self, user_id):
+        user = await sync_to_async(user_entity_cache.get)(user_id)
+        if user is not None:
+            return user
+        try:
+            response = await self.http.get(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", headers=self.headers)
+            if response.status_code == 404:
+                raise UserNotFoundException(f"User with ID {user_id} not found.")
+            response.raise_for_status()
+            user = self.format_user(response.json())
+            await sync_to_async(user_entity_cache.put)(user)
+            return user
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching user {user_id}: {str(e)}")
+            raise
+
+    async def update_user(self, user_id, updated_data):
+        try:
+            response = await self.http.put(f"{self.supabase_url}/auth/v1/admin/users/{user_id}",
+                                           headers=self.headers, json=updated_data)
+            if response.status_code == 404:
+                raise UserUpdateError(f"User with ID {user_id} not found.")
+            response.raise_for_status()
+            user_data = response.json()
+            await sync_to_async(user_list_cache.apply)(upserts=[user_data])
+            user = self.format_user(user_data)
+            await sync_to_async(user_entity_cache.put)(user)
+            await sync_to_async(UserService().mirror_write)(upserts=[user_data])
+            return user
+        except httpx.HTTPError as e:
+            raise UserUpdateError(f"Error updating user {user_id}: {str(e)}")
+
+    async def delete_user(self, user_id):
+        try:
+            response = await self.http.delete(
+                f"{self.supabase_url}/auth/v1/admin/users/{user_id}",
+                headers=self.headers
+            )
+            if response.status_code == 404:
+                raise UserDeletionError(f"User with ID {user_id} not found.")
+            response.raise_for_status()
+            await sync_to_async(user_list_cache.apply)(removals=[user_id])
+            await sync_to_async(user_entity_cache.discard)(user_id)
+            await sync_to_async(UserService().mirror_write)(removals=[user_id])
+            return True
+        except httpx.HTTPError as e:
+            raise UserDeletionError(f"Error deleting user {user_id}: {str(e)}")
+
+    def format_user(self, user_data):
+        return UserService.format_user_data(user_data)
+
+    async def invalidate_user_cache(self):
+        await user_list_cache.ainvalidate()
+        logger.info("User cache invalidated")
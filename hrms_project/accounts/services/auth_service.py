@@ -1,27 +1,98 @@
-from ..supabase_client import supabase
+import os
+from typing import Any, Dict, Optional
+import httpx
+from dotenv import load_dotenv
+from .http_client import get_http_client
 from ..exceptions import AuthenticationError
 
+load_dotenv()
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        payload = response.json()
+    except ValueError:
+        return response.text or f"HTTP {response.status_code}"
+    return (payload.get('error_description') or payload.get('msg')
+            or payload.get('message') or payload.get('error') or f"HTTP {response.status_code}")
+
 class AuthService:
     @staticmethod
-    def login(email, password):
+    def _auth_url(path: str) -> str:
+        supabase_url = os.getenv('SUPABASE_URL', '')
+        if not supabase_url:
+            raise AuthenticationError("SUPABASE_URL must be set in environment variables")
+        return f"{supabase_url}/auth/v1/{path}"
+
+    @staticmethod
+    def _headers(access_token: Optional[str] = None) -> Dict[str, str]:
+        api_key = os.getenv('SUPABASE_KEY', '')
+        return {
+            'apikey': api_key,
+            'Authorization': f'Bearer {access_token or api_key}'
+        }
+
+    @staticmethod
+    def login(email: str, password: str) -> Dict[str, Any]:
         try:
-            response = supabase.auth.sign_in_with_password({"email": email, "password": password})
-            if response.user is None:
+            response = get_http_client().post(
+                AuthService._auth_url('token'),
+                params={'grant_type': 'password'},
+                headers=AuthService._headers(),
+                json={'email': email, 'password': password}
+            )
+            if response.status_code in (400, 401, 422):
+                raise AuthenticationError(_error_message(response))
+            response.raise_for_status()
+            session = response.json()
+            user = session.get('user')
+            if not user:
                 raise AuthenticationError("Invalid login credentials")
             return {
-                'id': response.user.id,
-                'email': response.user.email,
-                'role': response.user.role,
-                'app_metadata': response.user.app_metadata,
-                'user_metadata': response.user.user_metadata,
-                'access_token': response.session.access_token
+                'id': user.get('id'),
+                'email': user.get('email'),
+                'role': user.get('role'),
+                'app_metadata': user.get('app_metadata', {}),
+                'user_metadata': user.get('user_metadata', {}),
+                'access_token': session['access_token'],
+                'refresh_token': session.get('refresh_token')
             }
         except Exception as e:
             raise AuthenticationError(f"Login failed: {str(e)}")
 
     @staticmethod
-    def logout():
+    def refresh(refresh_token: str) -> Dict[str, Any]:
+        """
+        Exchange a refresh token for a new access/refresh token pair.
+        """
+        try:
+            response = get_http_client().post(
+                AuthService._auth_url('token'),
+                params={'grant_type': 'refresh_token'},
+                headers=AuthService._headers(),
+                json={'refresh_token': refresh_token}
+            )
+            if response.status_code in (400, 401, 422):
+                raise AuthenticationError(_error_message(response))
+            response.raise_for_status()
+            session = response.json()
+            return {
+                'access_token': session['access_token'],
+                'refresh_token': session.get('refresh_token', refresh_token)
+            }
+        except Exception as e:
+            raise AuthenticationError(f"Token refresh failed: {str(e)}")
+
+    @staticmethod
+    def logout(access_token: Optional[str] = None):
+        if not access_token:
+            return
         try:
-            supabase.auth.sign_out()
+            response = get_http_client().post(
+                AuthService._auth_url('logout'),
+                headers=AuthService._headers(access_token)
+            )
+            # An expired or already revoked token means there is nothing left to sign out.
+            if response.status_code not in (401, 403, 404):
+                response.raise_for_status()
         except Exception as e:
-            raise AuthenticationError(f"Logout failed: {str(e)}")
\ No newline at end of file
+            raise AuthenticationError(f"Logout failed: {str(e)}")
@@ -0,0 +1,122 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import weakref
+from typing import Dict
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[int, httpx.Client] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+# The task that closes each loop's client when the loop shuts down (see _close_with_loop).
+_async_closers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    if not settings.SUPABASE_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("SUPABASE_HTTP2 is enabled but the 'h2' package is missing; falling back to HTTP/1.1")
+        return False
+    return True
+
+
+def build_timeout() -> httpx.Timeout:
+    """
+    Build the connect/read/write/pool timeouts used for Supabase calls.
+    """
+    return httpx.Timeout(
+        connect=settings.SUPABASE_HTTP_CONNECT_TIMEOUT,
+        read=settings.SUPABASE_HTTP_READ_TIMEOUT,
+        write=settings.SUPABASE_HTTP_READ_TIMEOUT,
+        pool=settings.SUPABASE_HTTP_POOL_TIMEOUT,
+    )
+
+
+def build_limits() -> httpx.Limits:
+    """
+    Build the connection pool limits used for Supabase calls.
+    """
+    return httpx.Limits(
+        max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the process-wide pooled HTTP client for Supabase calls.
+
+    The client is created on first use and keyed by PID, so workers forked
+    from a preloaded master never share sockets with their parent.
+
+    Returns:
+        httpx.Client: A keep-alive client with bounded pool and timeouts.
+    """
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(pid)
+        if client is None:
+            client = httpx.Client(http2=_http2_enabled(), timeout=build_timeout(), limits=build_limits())
+            _clients[pid] = client
+            logger.info(f"Created pooled Supabase HTTP client for process {pid}")
+    return client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the pooled async HTTP client bound to the running event loop.
+
+    An ``httpx.AsyncClient`` cannot be shared across event loops, so one is
+    kept per loop: a single client for the lifetime of an ASGI worker, and a
+    short-lived one when async views run under WSGI. Each client is closed
+    when its loop shuts down.
+
+    Returns:
+        httpx.AsyncClient: A keep-alive async client with bounded pool and timeouts.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        # Clients keep their loop alive through pooled transports, so entries
+        # for loops that have since closed must be dropped explicitly.
+        for stale_loop in [other for other in list(_async_clients) if other.is_closed()]:
+            _async_clients.pop(stale_loop, None)
+            _async_closers.pop(stale_loop, None)
+        client = httpx.AsyncClient(http2=_http2_enabled(), timeout=build_timeout(), limits=build_limits())
+        _async_clients[loop] = client
+        _async_closers[loop] = loop.create_task(_close_with_loop(client), name='supabase-http-client-closer')
+    return client
+
+
+async def _close_with_loop(client: httpx.AsyncClient) -> None:
+    # Parked until the loop shuts down: asyncio.run, asgiref's async_to_sync and
+    # ASGI servers cancel leftover tasks and run them to completion before
+    # closing the loop, which is when the pooled connections can still be closed.
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        await client.aclose()
+
+
+@atexit.register
+def close_http_clients() -> None:
+    """
+    Close the pooled sync client owned by the current process; async clients close with their loops.
+    """
+    client = _clients.pop(os.getpid(), None)
+    if client is not None:
+        client.close()
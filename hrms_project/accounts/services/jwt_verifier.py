@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+from ..exceptions import InvalidTokenError, TokenExpiredError
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens locally, without a call to GoTrue.
+
+    Tokens are HS256 JWTs signed with the project's JWT secret; the signature
+    is checked with ``hmac`` and the ``exp``/``nbf``/``aud`` claims are
+    enforced. Verified claims are kept in a bounded LRU until the token
+    expires, so repeat requests only pay a dictionary lookup.
+    """
+
+    def __init__(self, secret: str, audience: Optional[str] = None, leeway: float = 0, cache_size: int = 4096):
+        self._key = secret.encode('utf-8')
+        self.audience = audience
+        self.leeway = leeway
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._verified: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Return the token's claims.
+
+        Raises:
+            TokenExpiredError: If the token is past its ``exp`` (plus leeway).
+            InvalidTokenError: If the token is malformed, badly signed, not yet valid or for another audience.
+        """
+        with self._lock:
+            claims = self._verified.get(token)
+            if claims is not None:
+                self._verified.move_to_end(token)
+        if claims is not None:
+            if claims['exp'] + self.leeway < time.time():
+                self._forget(token)
+                raise TokenExpiredError("Token has expired")
+            return claims
+
+        claims = self._decode(token)
+        with self._lock:
+            self._verified[token] = claims
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return claims
+
+    def _forget(self, token: str) -> None:
+        with self._lock:
+            self._verified.pop(token, None)
+
+    def _decode(self, token: str) -> Dict[str, Any]:
+        try:
+            header_segment, payload_segment, signature_segment = token.split('.')
+            header = json.loads(_b64decode(header_segment))
+            signature = _b64decode(signature_segment)
+        except (ValueError, TypeError) as e:
+            raise InvalidTokenError(f"Malformed token: {str(e)}")
+
+        if header.get('alg') != 'HS256':
+            raise InvalidTokenError(f"Unsupported token algorithm {header.get('alg')!r}")
+        signing_input = f"{header_segment}.{payload_segment}".encode('ascii')
+        expected = hmac.new(self._key, signing_input, hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, signature):
+            raise InvalidTokenError("Invalid token signature")
+
+        try:
+            claims = json.loads(_b64decode(payload_segment))
+        except ValueError as e:
+            raise InvalidTokenError(f"Malformed token payload: {str(e)}")
+        now = time.time()
+        if not isinstance(claims.get('exp'), (int, float)):
+            raise InvalidTokenError("Token has no expiry")
+        if claims['exp'] + self.leeway < now:
+            raise TokenExpiredError("Token has expired")
+        if claims.get('nbf', 0) - self.leeway > now:
+            raise InvalidTokenError("Token is not yet valid")
+        if self.audience:
+            audience = claims.get('aud')
+            audiences = audience if isinstance(audience, list) else [audience]
+            if self.audience not in audiences:
+                raise InvalidTokenError(f"Token audience {audience!r} is not accepted")
+        return claims
+
+
+_verifiers: Dict[str, TokenVerifier] = {}
+
+
+def get_token_verifier() -> Optional[TokenVerifier]:
+    """
+    Return the process-wide verifier, or None when ``SUPABASE_JWT_SECRET`` is not configured.
+    """
+    secret = settings.SUPABASE_JWT_SECRET
+    if not secret:
+        return None
+    verifier = _verifiers.get(secret)
+    if verifier is None:
+        verifier = _verifiers.setdefault(secret, TokenVerifier(
+            secret,
+            audience=settings.SUPABASE_JWT_AUDIENCE,
+            leeway=settings.SUPABASE_JWT_LEEWAY,
+            cache_size=settings.SUPABASE_JWT_CACHE_SIZE,
+        ))
+    return verifier
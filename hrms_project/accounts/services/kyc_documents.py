@@ -0,0 +1,283 @@
+import fcntl
+import io
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from ..exceptions import KYCUploadConflictError, KYCUploadError
+from ..models import KYCApplication, KYCDocument
+from ..utils.document_inspection import FORMAT_CONTENT_TYPES, inspect_document
+
+logger = logging.getLogger(__name__)
+
+COPY_BLOCK = 256 * 1024
+ACCEPTED_CONTENT_TYPES = {content_type for types in FORMAT_CONTENT_TYPES.values() for content_type in types}
+
+
+def upload_root() -> str:
+    return settings.KYC_UPLOAD_ROOT
+
+
+def absolute_path(relative_path: str) -> str:
+    return os.path.join(upload_root(), relative_path)
+
+
+def thumbnail_storage_path(document: KYCDocument) -> str:
+    return f"{document.storage_path}.thumbnail.jpg"
+
+
+def open_thumbnail(document: KYCDocument) -> Optional[BinaryIO]:
+    """
+    Open a document's thumbnail: the local file, or from Supabase Storage once the document was pushed there.
+
+    Returns None if there is no thumbnail or it cannot be read.
+    """
+    if not document.thumbnail_path:
+        return None
+    if document.storage_path:
+        # Imported here: the Supabase client is only needed when a bucket is configured.
+        from ..supabase_client import get_supabase
+
+        try:
+            content = get_supabase().storage.from_(settings.KYC_STORAGE_BUCKET).download(
+                thumbnail_storage_path(document))
+        except Exception as e:
+            logger.error(f"Failed to fetch thumbnail for KYC document {document.pk} from Supabase Storage: {str(e)}")
+            return None
+        return io.BytesIO(content)
+    path = absolute_path(document.thumbnail_path)
+    if not os.path.exists(path):
+        return None
+    return open(path, 'rb')
+
+
+class KYCUploads:
+    """
+    Chunked, resumable document uploads written straight to disk.
+
+    ``start`` reserves the document and an empty file; ``append`` streams one
+    chunk from the request to a temporary file, then, holding a lock on the
+    upload's file, appends it only if it starts at the current offset and
+    advances the offset after the write, so a retried, duplicated or
+    out-of-order chunk never corrupts the upload. The client resumes from
+    ``received_bytes``. The final chunk hands the document to
+    ``KYCDocumentProcessor``.
+    """
+
+    def start(self, application: KYCApplication, name: str, content_type: str, size: int) -> KYCDocument:
+        """
+        Raises:
+            KYCUploadError: If the type or size is not accepted.
+        """
+        if content_type not in ACCEPTED_CONTENT_TYPES:
+            raise KYCUploadError(f"Unsupported document type {content_type}; upload a JPEG, PNG or PDF.")
+        if not 0 < size <= settings.KYC_UPLOAD_MAX_BYTES:
+            raise KYCUploadError(f"Documents must be between 1 byte and {settings.KYC_UPLOAD_MAX_BYTES} bytes.")
+        upload_id = uuid.uuid4()
+        relative_path = os.path.join(str(application.pk), upload_id.hex)
+        os.makedirs(os.path.dirname(absolute_path(relative_path)), exist_ok=True)
+        open(absolute_path(relative_path), 'wb').close()
+        return KYCDocument.objects.create(
+            application=application, upload_id=upload_id, original_name=os.path.basename(name)[:255],
+            content_type=content_type, size=size, file_path=relative_path)
+
+    def append(self, document: KYCDocument, offset: int, stream: BinaryIO, length: int) -> KYCDocument:
+        """
+        Append ``length`` bytes read from ``stream`` at ``offset`` and return the updated document.
+
+        Raises:
+            KYCUploadConflictError: If the upload is finished or ``offset`` is not the current offset.
+            KYCUploadError: If the chunk is empty, too big or cut short.
+        """
+        if document.status != KYCDocument.STATUS_UPLOADING:
+            raise KYCUploadConflictError("This upload is already complete.")
+        if offset != document.received_bytes:
+            raise KYCUploadConflictError(f"Expected offset {document.received_bytes}, got {offset}.")
+        if not 0 < length <= min(settings.KYC_UPLOAD_CHUNK_BYTES, document.size - offset):
+            raise KYCUploadError(
+                f"Chunks must be 1 to {settings.KYC_UPLOAD_CHUNK_BYTES} bytes and end within the file.")
+
+        path = absolute_path(document.file_path)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.part') as part:
+            received = 0
+            while received < length:
+                block = stream.read(min(COPY_BLOCK, length - received))
+                if not block:
+                    break
+                part.write(block)
+                received += len(block)
+            if received != length:
+                raise KYCUploadError(f"Chunk ended after {received} of {length} bytes; resend it.")
+            part.flush()
+            part.seek(0)
+
+            end = offset + length
+            complete = end == document.size
+            with open(path, 'r+b') as target:
+                # Held from the offset check to the offset update, so chunks for one upload take turns
+                # writing; the database only sees the short conditional update at the end.
+                fcntl.flock(target.fileno(), fcntl.LOCK_EX)
+                current = (KYCDocument.objects.filter(pk=document.pk)
+                           .values_list('status', 'received_bytes').first())
+                if current != (KYCDocument.STATUS_UPLOADING, offset):
+                    raise KYCUploadConflictError(
+                        "Another request already wrote this chunk; check the offset and resume.")
+                target.seek(offset)
+                shutil.copyfileobj(part, target, COPY_BLOCK)
+                target.truncate()
+                target.flush()
+                os.fsync(target.fileno())
+                # Advanced only once the bytes are on disk; a crash before this leaves the offset
+                # where it was and the client resends the chunk over the partial write.
+                next_status = KYCDocument.STATUS_QUEUED if complete else KYCDocument.STATUS_UPLOADING
+                KYCDocument.objects.filter(pk=document.pk, received_bytes=offset).update(
+                    received_bytes=end, status=next_status)
+
+        document.refresh_from_db()
+        if complete:
+            document_processor.submit(document)
+        return document
+
+
+class KYCDocumentProcessor:
+    """
+    Runs ``inspect_document`` for finished uploads on a bounded process pool.
+
+    At most ``workers * 2`` documents are in flight; past that, documents
+    stay ``queued`` for ``manage.py process_kyc_documents``, the same path
+    that recovers documents left queued by a restart. Results are written
+    back on a separate thread so the pool's result handling never waits on
+    the database or Supabase Storage.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or settings.KYC_PROCESS_WORKERS
+        self._lock = threading.Lock()
+        self._pid = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._recorder: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+
+    def _executors(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Spawned, not forked: the web process is multi-threaded.
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                    self._recorder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kyc-documents')
+                    self._pid = os.getpid()
+        return self._pool, self._recorder
+
+    def submit(self, document: KYCDocument) -> bool:
+        """
+        Start processing ``document`` unless the pool is saturated; return whether it was started.
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.info(f"KYC processing busy; document {document.pk} left queued")
+            return False
+        started = KYCDocument.objects.filter(pk=document.pk, status=KYCDocument.STATUS_QUEUED).update(
+            status=KYCDocument.STATUS_PROCESSING)
+        if not started:
+            self._slots.release()
+            return False
+        try:
+            pool, recorder = self._executors()
+            future = pool.submit(inspect_document, absolute_path(document.file_path), document.content_type,
+                                 self.thumbnail_path(document))
+        except Exception as e:
+            logger.error(f"Could not start processing KYC document {document.pk}: {str(e)}")
+            KYCDocument.objects.filter(pk=document.pk).update(status=KYCDocument.STATUS_QUEUED)
+            self._slots.release()
+            return False
+        future.add_done_callback(lambda done: recorder.submit(self._finish, document.pk, done))
+        return True
+
+    def process_queued(self, limit: int = 1000, include_processing: bool = False) -> Dict[str, int]:
+        """
+        Process up to ``limit`` queued documents, waiting for them; returns counts by resulting status.
+
+        ``include_processing`` also retries documents marked as processing,
+        for use after a restart interrupted them.
+        """
+        statuses = [KYCDocument.STATUS_QUEUED]
+        if include_processing:
+            statuses.append(KYCDocument.STATUS_PROCESSING)
+        documents = list(KYCDocument.objects.filter(status__in=statuses).order_by('created_at')[:limit])
+        pool, _ = self._executors()
+        futures = []
+        for document in documents:
+            KYCDocument.objects.filter(pk=document.pk).update(status=KYCDocument.STATUS_PROCESSING)
+            futures.append((document.pk, pool.submit(inspect_document, absolute_path(document.file_path),
+                                                     document.content_type, self.thumbnail_path(document))))
+        stats: Dict[str, int] = {}
+        for document_id, future in futures:
+            status = self._record(document_id, future)
+            stats[status] = stats.get(status, 0) + 1
+        return stats
+
+    @staticmethod
+    def thumbnail_path(document: KYCDocument) -> str:
+        os.makedirs(os.path.join(upload_root(), 'thumbnails'), exist_ok=True)
+        return os.path.join(upload_root(), 'thumbnails', f"{document.upload_id.hex}.jpg")
+
+    def _finish(self, document_id: int, future: Future) -> None:
+        try:
+            self._record(document_id, future)
+        finally:
+            self._slots.release()
+            close_old_connections()
+
+    def _record(self, document_id: int, future: Future) -> str:
+        changes = {'processed_at': timezone.now()}
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"KYC document {document_id} processing failed: {str(e)}")
+            changes.update(status=KYCDocument.STATUS_FAILED, processing_error=str(e))
+        else:
+            changes.update(
+                status=KYCDocument.STATUS_INVALID if result['error'] else KYCDocument.STATUS_READY,
+                sha256=result['sha256'], detected_format=result['format'] or '', width=result['width'],
+                height=result['height'], processing_error=result['error'] or '',
+                thumbnail_path=os.path.relpath(result['thumbnail'], upload_root()) if result['thumbnail'] else '')
+            if changes['status'] == KYCDocument.STATUS_READY and settings.KYC_STORAGE_BUCKET:
+                changes.update(self._push_to_storage(document_id, changes['thumbnail_path']))
+        KYCDocument.objects.filter(pk=document_id).update(**changes)
+        return changes['status']
+
+    @staticmethod
+    def _push_to_storage(document_id: int, thumbnail_path: str) -> Dict[str, str]:
+        # Imported here: the Supabase client is only needed when a bucket is configured.
+        from ..supabase_client import get_supabase
+
+        document = KYCDocument.objects.get(pk=document_id)
+        document.storage_path = f"kyc/{document.application_id}/{document.upload_id.hex}"
+        local_paths = [absolute_path(document.file_path)]
+        bucket = get_supabase().storage.from_(settings.KYC_STORAGE_BUCKET)
+        try:
+            bucket.upload(document.storage_path, local_paths[0], {'content-type': document.content_type})
+            if thumbnail_path:
+                # Alongside the document, so any web process can serve it once the local copy is gone.
+                local_paths.append(absolute_path(thumbnail_path))
+                bucket.upload(thumbnail_storage_path(document), local_paths[1], {'content-type': 'image/jpeg'})
+        except Exception as e:
+            # The local copies are kept; the document stays usable and can be pushed again later.
+            logger.error(f"Failed to store KYC document {document_id} in Supabase Storage: {str(e)}")
+            return {}
+        for path in local_paths:
+            os.remove(path)
+        return {'storage_path': document.storage_path}
+
+
+document_processor = KYCDocumentProcessor()
@@ -0,0 +1,202 @@
+import datetime
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from ..models import KYCApplication, KYCBacklogBucket, KYCMetricsDay
+from ..utils.sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))
+
+
+def _hour(moment: datetime.datetime) -> datetime.datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _hours(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds / 3600, 1)
+
+
+def _rate(approved: int, decided: int) -> Optional[float]:
+    return round(100 * approved / decided, 1) if decided else None
+
+
+class KYCMetrics:
+    """
+    Incrementally maintained KYC turnaround, approval and backlog metrics.
+
+    Each submission, decision and deletion updates its day/reviewer row and
+    the backlog histogram in the same transaction as the change itself, so a
+    report only reads the rows for its window: its cost depends on the
+    window and the number of reviewers, not on how many applications exist.
+    ``rebuild`` recomputes everything from the applications table.
+    """
+
+    def record_submission(self, application: KYCApplication) -> None:
+        with transaction.atomic():
+            day_row, _ = KYCMetricsDay.objects.get_or_create(day=timezone.localdate(application.submitted_at),
+                                                              reviewer='')
+            KYCMetricsDay.objects.filter(pk=day_row.pk).update(submitted=F('submitted') + 1)
+            self._add_backlog(application.submitted_at, 1)
+
+    def record_decision(self, submitted_at: datetime.datetime, reviewer: str, status: str,
+                        decided_at: datetime.datetime) -> None:
+        """
+        Count a decision and its turnaround; call inside the transaction that records the decision.
+        """
+        turnaround = max(0.0, (decided_at - submitted_at).total_seconds())
+        day_row, _ = KYCMetricsDay.objects.select_for_update().get_or_create(
+            day=timezone.localdate(decided_at), reviewer=reviewer)
+        sketch = QuantileSketch.from_json(day_row.turnaround_sketch)
+        sketch.add(turnaround)
+        day_row.turnaround_sketch = sketch.to_json()
+        day_row.turnaround_seconds += turnaround
+        if status == KYCApplication.STATUS_APPROVED:
+            day_row.approved += 1
+        else:
+            day_row.rejected += 1
+        day_row.save(update_fields=['turnaround_sketch', 'turnaround_seconds', 'approved', 'rejected'])
+        self._add_backlog(submitted_at, -1)
+
+    def record_deletion(self, application: KYCApplication) -> None:
+        """
+        Take a deleted application back out of the metrics: its submission, and its decision or backlog slot.
+        """
+        with transaction.atomic():
+            KYCMetricsDay.objects.filter(day=timezone.localdate(application.submitted_at), reviewer='').update(
+                submitted=F('submitted') - 1)
+            if application.status == KYCApplication.STATUS_PENDING or application.reviewed_at is None:
+                self._add_backlog(application.submitted_at, -1)
+                return
+            day_row = KYCMetricsDay.objects.select_for_update().filter(
+                day=timezone.localdate(application.reviewed_at), reviewer=application.reviewed_by).first()
+            if day_row is None:
+                return
+            turnaround = max(0.0, (application.reviewed_at - application.submitted_at).total_seconds())
+            sketch = QuantileSketch.from_json(day_row.turnaround_sketch)
+            sketch.add(turnaround, -1)
+            day_row.turnaround_sketch = sketch.to_json()
+            day_row.turnaround_seconds = max(0.0, day_row.turnaround_seconds - turnaround)
+            if application.status == KYCApplication.STATUS_APPROVED:
+                day_row.approved -= 1
+            else:
+                day_row.rejected -= 1
+            day_row.save(update_fields=['turnaround_sketch', 'turnaround_seconds', 'approved', 'rejected'])
+
+    @staticmethod
+    def _add_backlog(submitted_at: datetime.datetime, delta: int) -> None:
+        bucket, _ = KYCBacklogBucket.objects.get_or_create(hour=_hour(submitted_at))
+        KYCBacklogBucket.objects.filter(pk=bucket.pk).update(pending=F('pending') + delta)
+
+    def rebuild(self) -> int:
+        """
+        Recompute all metrics rows from KYC applications; returns the number of day rows written.
+        """
+        days: Dict[tuple, Dict[str, Any]] = defaultdict(
+            lambda: {'submitted': 0, 'approved': 0, 'rejected': 0, 'seconds': 0.0, 'sketch': QuantileSketch()})
+        backlog: Dict[datetime.datetime, int] = defaultdict(int)
+        applications = KYCApplication.objects.only('status', 'submitted_at', 'reviewed_at', 'reviewed_by')
+        for application in applications.iterator(chunk_size=2000):
+            days[(timezone.localdate(application.submitted_at), '')]['submitted'] += 1
+            if application.status == KYCApplication.STATUS_PENDING or application.reviewed_at is None:
+                backlog[_hour(application.submitted_at)] += 1
+                continue
+            row = days[(timezone.localdate(application.reviewed_at), application.reviewed_by)]
+            turnaround = max(0.0, (application.reviewed_at - application.submitted_at).total_seconds())
+            row['approved' if application.status == KYCApplication.STATUS_APPROVED else 'rejected'] += 1
+            row['seconds'] += turnaround
+            row['sketch'].add(turnaround)
+
+        with transaction.atomic():
+            KYCMetricsDay.objects.all().delete()
+            KYCBacklogBucket.objects.all().delete()
+            KYCMetricsDay.objects.bulk_create([
+                KYCMetricsDay(day=day, reviewer=reviewer, submitted=row['submitted'], approved=row['approved'],
+                              rejected=row['rejected'], turnaround_seconds=row['seconds'],
+                              turnaround_sketch=row['sketch'].to_json())
+                for (day, reviewer), row in days.items()
+            ], batch_size=1000)
+            KYCBacklogBucket.objects.bulk_create(
+                [KYCBacklogBucket(hour=hour, pending=pending) for hour, pending in backlog.items()], batch_size=1000)
+        logger.info(f"Rebuilt KYC metrics: {len(days)} day rows, {len(backlog)} backlog buckets")
+        return len(days)
+
+    def report(self, days: int = 30) -> Dict[str, Any]:
+        """
+        Per-day and per-reviewer metrics for the last ``days`` days, plus the current backlog.
+        """
+        now = timezone.now()
+        start = timezone.localdate(now) - datetime.timedelta(days=days - 1)
+        rows = list(KYCMetricsDay.objects.filter(day__gte=start))
+        backlog = self._backlog(now)
+
+        by_day = defaultdict(list)
+        by_reviewer = defaultdict(list)
+        for row in rows:
+            by_day[row.day].append(row)
+            if row.reviewer:
+                by_reviewer[row.reviewer].append(row)
+
+        # Walk back from today's backlog to each day's closing backlog.
+        daily = []
+        closing = backlog['pending']
+        for offset in range(days):
+            day = timezone.localdate(now) - datetime.timedelta(days=offset)
+            summary = self._summarise(by_day.get(day, []))
+            summary.update(day=day, backlog=closing)
+            daily.append(summary)
+            closing -= summary['submitted'] - summary['decided']
+
+        leases = {lease['lease_owner']: lease for lease in (
+            KYCApplication.objects.under_lease(now).values('lease_owner')
+            .annotate(leased=Count('id'), oldest=Min('submitted_at')))}
+        reviewers = []
+        for reviewer in sorted(set(by_reviewer) | set(leases)):
+            summary = self._summarise(by_reviewer.get(reviewer, []))
+            lease = leases.get(reviewer)
+            summary.update(reviewer=reviewer, leased=lease['leased'] if lease else 0,
+                           oldest_leased_hours=_hours((now - lease['oldest']).total_seconds()) if lease else None)
+            reviewers.append(summary)
+
+        return {'days': days, 'daily': daily, 'reviewers': reviewers, 'backlog': backlog,
+                'totals': self._summarise(rows)}
+
+    @staticmethod
+    def _summarise(rows: Iterable[KYCMetricsDay]) -> Dict[str, Any]:
+        rows = list(rows)
+        approved = sum(row.approved for row in rows)
+        decided = approved + sum(row.rejected for row in rows)
+        sketch = QuantileSketch.merged(QuantileSketch.from_json(row.turnaround_sketch) for row in rows)
+        summary = {
+            'submitted': sum(row.submitted for row in rows),
+            'decided': decided,
+            'approved': approved,
+            'approval_rate': _rate(approved, decided),
+            'mean_hours': _hours(sum(row.turnaround_seconds for row in rows) / decided) if decided else None,
+        }
+        for name, q in QUANTILES:
+            summary[f'{name}_hours'] = _hours(sketch.quantile(q))
+        return summary
+
+    @staticmethod
+    def _backlog(now: datetime.datetime) -> Dict[str, Any]:
+        buckets: List[KYCBacklogBucket] = list(KYCBacklogBucket.objects.filter(pending__gt=0).order_by('hour'))
+        pending = sum(bucket.pending for bucket in buckets)
+        backlog = {'pending': pending,
+                   'oldest_hours': _hours((now - buckets[0].hour).total_seconds()) if buckets else None}
+        # Buckets run oldest first, so age quantile q is reached at the (1 - q) share of the count.
+        for name, q in QUANTILES:
+            backlog[f'{name}_hours'] = None
+            seen = 0
+            for bucket in buckets:
+                seen += bucket.pending
+                if pending and seen > (1 - q) * (pending - 1):
+                    backlog[f'{name}_hours'] = _hours((now - bucket.hour).total_seconds())
+                    break
+        return backlog
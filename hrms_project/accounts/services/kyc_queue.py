@@ -0,0 +1,119 @@
+import datetime
+import logging
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..exceptions import KYCError, KYCLeaseError
+from ..models import KYCApplication
+from .kyc_metrics import KYCMetrics
+
+logger = logging.getLogger(__name__)
+
+# With optimistic claiming, candidates looked at per wanted application, to make up for races lost.
+OPTIMISTIC_OVERFETCH = 3
+
+
+class KYCQueue:
+    """
+    Work queue of pending KYC applications shared by many reviewers.
+
+    ``claim`` leases the oldest available applications to a reviewer. Where
+    the database supports it, candidates are locked with ``SKIP LOCKED`` so
+    concurrent claims pass over each other's rows instead of waiting;
+    elsewhere (SQLite) each candidate is taken with a conditional UPDATE on
+    its ``version`` and lost races are skipped. A lease that runs out makes
+    the application available again without any cleanup job.
+    """
+
+    def __init__(self, lease_seconds: Optional[int] = None):
+        self.lease_seconds = lease_seconds or settings.KYC_LEASE_SECONDS
+
+    def claim(self, reviewer: str, limit: Optional[int] = None) -> List[KYCApplication]:
+        """
+        Lease up to ``limit`` of the oldest available applications to ``reviewer``.
+
+        Returns:
+            List[KYCApplication]: The applications now leased, oldest first.
+        """
+        limit = limit or settings.KYC_CLAIM_BATCH
+        now = timezone.now()
+        expires = now + datetime.timedelta(seconds=self.lease_seconds)
+        if connection.features.has_select_for_update_skip_locked:
+            claimed = self._claim_skip_locked(reviewer, limit, now, expires)
+        else:
+            claimed = self._claim_optimistic(reviewer, limit, now, expires)
+        logger.info(f"KYC reviewer {reviewer} claimed {len(claimed)} applications")
+        return list(KYCApplication.objects.filter(pk__in=claimed).select_related('employee'))
+
+    def _claim_skip_locked(self, reviewer, limit, now, expires) -> List[int]:
+        with transaction.atomic():
+            ids = list(KYCApplication.objects.available(now).order_by('submitted_at', 'id')
+                       .select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            KYCApplication.objects.filter(pk__in=ids).update(
+                lease_owner=reviewer, lease_expires_at=expires, version=F('version') + 1)
+        return ids
+
+    def _claim_optimistic(self, reviewer, limit, now, expires) -> List[int]:
+        claimed = []
+        candidates = (KYCApplication.objects.available(now).order_by('submitted_at', 'id')
+                      .values_list('id', 'version')[:limit * OPTIMISTIC_OVERFETCH])
+        for application_id, version in candidates:
+            # Matches only if nobody claimed or decided it since it was read.
+            won = KYCApplication.objects.available(now).filter(pk=application_id, version=version).update(
+                lease_owner=reviewer, lease_expires_at=expires, version=version + 1)
+            if won:
+                claimed.append(application_id)
+                if len(claimed) == limit:
+                    break
+        return claimed
+
+    def leased(self, reviewer: str) -> List[KYCApplication]:
+        """
+        Applications ``reviewer`` currently holds a live lease on.
+        """
+        return list(KYCApplication.objects.leased_by(reviewer, timezone.now()).select_related('employee'))
+
+    def renew(self, application_id: int, reviewer: str) -> None:
+        """
+        Extend ``reviewer``'s lease on an application.
+
+        Raises:
+            KYCLeaseError: If the reviewer no longer holds the lease.
+        """
+        now = timezone.now()
+        renewed = KYCApplication.objects.leased_by(reviewer, now).filter(pk=application_id).update(
+            lease_expires_at=now + datetime.timedelta(seconds=self.lease_seconds))
+        if not renewed:
+            raise KYCLeaseError(f"Your lease on KYC application {application_id} has expired.")
+
+    def release(self, application_id: int, reviewer: str) -> None:
+        """
+        Give an application back to the queue before its lease runs out.
+        """
+        KYCApplication.objects.leased_by(reviewer, timezone.now()).filter(pk=application_id).update(
+            lease_owner='', lease_expires_at=None, version=F('version') + 1)
+
+    def decide(self, application_id: int, reviewer: str, status: str, notes: str = '') -> None:
+        """
+        Record ``reviewer``'s decision on an application they hold the lease on.
+
+        Raises:
+            KYCError: If ``status`` is not a decision.
+            KYCLeaseError: If the lease expired (the application may be with another reviewer).
+        """
+        if status not in (KYCApplication.STATUS_APPROVED, KYCApplication.STATUS_REJECTED):
+            raise KYCError(f"Unknown KYC decision {status!r}")
+        now = timezone.now()
+        with transaction.atomic():
+            decided = KYCApplication.objects.leased_by(reviewer, now).filter(pk=application_id).update(
+                status=status, reviewed_at=now, reviewed_by=reviewer, review_notes=notes,
+                lease_owner='', lease_expires_at=None, version=F('version') + 1)
+            if not decided:
+                raise KYCLeaseError(f"Your lease on KYC application {application_id} has expired.")
+            submitted_at = KYCApplication.objects.values_list('submitted_at', flat=True).get(pk=application_id)
+            KYCMetrics().record_decision(submitted_at, reviewer, status, now)
+        logger.info(f"KYC application {application_id} {status} by {reviewer}")
@@ -0,0 +1,139 @@
+import datetime
+import logging
+from collections import defaultdict
+from decimal import ROUND_DOWN, Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from ..models import Department, Employee, LeaveDailyRollup, LeaveRequest
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+
+
+def daily_shares(leave_request: LeaveRequest) -> List[Tuple[datetime.date, Decimal]]:
+    """
+    Spread a request's days over its date range; the last day takes the rounding remainder.
+
+    Raises:
+        ValueError: If the request ends before it starts.
+    """
+    if leave_request.end_date < leave_request.start_date:
+        raise ValueError(f"Leave request {leave_request.pk} ends before it starts")
+    span = (leave_request.end_date - leave_request.start_date).days + 1
+    days = Decimal(leave_request.days)
+    share = (days / span).quantize(CENT, rounding=ROUND_DOWN)
+    shares = [(leave_request.start_date + datetime.timedelta(days=offset), share) for offset in range(span)]
+    shares[-1] = (shares[-1][0], days - share * (span - 1))
+    return shares
+
+
+class LeaveRollups:
+    """
+    Maintains and reads ``LeaveDailyRollup``, the day x department x leave type report table.
+
+    Approvals add a request's daily shares and cancellations subtract them,
+    in the same transaction as the status change, so reports never scan
+    leave requests. Leave counts against the employee's department at
+    approval, recorded as the request's ``rollup_department_key``;
+    cancellation and ``rebuild`` both use that recorded department.
+    """
+
+    @staticmethod
+    def department_key(department_id: Optional[int]) -> int:
+        return department_id or LeaveDailyRollup.NO_DEPARTMENT
+
+    def apply(self, leave_request: LeaveRequest, department_id: Optional[int], sign: int = 1) -> None:
+        """
+        Add (``sign=1``) or remove (``sign=-1``) an approved request's days.
+        """
+        shares = daily_shares(leave_request)
+        cells = LeaveDailyRollup.objects.filter(department_key=self.department_key(department_id),
+                                                leave_type_id=leave_request.leave_type_id)
+        existing = set(cells.filter(day__in=[day for day, _ in shares]).values_list('day', flat=True))
+        for day, _ in shares:
+            if day not in existing:
+                self._create_cell(day, department_id, leave_request.leave_type_id)
+
+        by_share = defaultdict(list)
+        for day, share in shares:
+            by_share[share].append(day)
+        for share, days in by_share.items():
+            cells.filter(day__in=days).update(days=F('days') + sign * share, employees=F('employees') + sign)
+
+    def reverse(self, leave_request: LeaveRequest) -> None:
+        """
+        Remove an approved request's days, from the department the approval was counted under.
+        """
+        key = leave_request.rollup_department_key
+        if key is None:
+            # Approved before the department was recorded: fall back to the current one.
+            department_id = (Employee.objects.filter(pk=leave_request.employee_id)
+                             .values_list('department_id', flat=True).first())
+            key = self.department_key(department_id)
+        if key and not Department.objects.filter(pk=key).exists():
+            return  # the department was deleted and its rollup cells with it
+        self.apply(leave_request, key or None, sign=-1)
+
+    def _create_cell(self, day: datetime.date, department_id: Optional[int], leave_type_id: int) -> None:
+        try:
+            # A savepoint, so losing a race to another approval doesn't abort the outer transaction.
+            with transaction.atomic():
+                LeaveDailyRollup.objects.create(day=day, department_id=department_id,
+                                                department_key=self.department_key(department_id),
+                                                leave_type_id=leave_type_id)
+        except IntegrityError:
+            pass
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """
+        Recompute every rollup row from approved requests and return the number of rows written.
+        """
+        cells: Dict[Tuple[datetime.date, int, int], List] = defaultdict(lambda: [Decimal(0), 0])
+        approved = (LeaveRequest.objects.filter(status=LeaveRequest.STATUS_APPROVED)
+                    .only('start_date', 'end_date', 'days', 'leave_type_id', 'rollup_department_key',
+                          'employee__department_id')
+                    .select_related('employee'))
+        for leave_request in approved.iterator(chunk_size=batch_size):
+            key = leave_request.rollup_department_key
+            if key is None:
+                key = self.department_key(leave_request.employee.department_id)
+            for day, share in daily_shares(leave_request):
+                cell = cells[(day, key, leave_request.leave_type_id)]
+                cell[0] += share
+                cell[1] += 1
+        rows = [LeaveDailyRollup(day=day, department_id=key or None, department_key=key,
+                                 leave_type_id=leave_type_id, days=days, employees=employees)
+                for (day, key, leave_type_id), (days, employees) in cells.items()]
+        with transaction.atomic():
+            LeaveDailyRollup.objects.all().delete()
+            LeaveDailyRollup.objects.bulk_create(rows, batch_size=batch_size)
+        logger.info(f"Rebuilt leave rollups: {len(rows)} rows")
+        return len(rows)
+
+    @staticmethod
+    def rows(start: datetime.date, end: datetime.date):
+        return LeaveDailyRollup.objects.filter(day__gte=start, day__lte=end)
+
+    def summary(self, start: datetime.date, end: datetime.date) -> List[Dict]:
+        """
+        Totals per department and leave type over ``start``..``end``: ``days`` taken and ``employee_days`` on leave.
+        """
+        return list(
+            self.rows(start, end)
+            .values('department__name', 'leave_type__name')
+            .annotate(days=Sum('days'), employee_days=Sum('employees'))
+            .order_by('department__name', 'leave_type__name')
+        )
+
+    def iter_daily(self, start: datetime.date, end: datetime.date) -> Iterator[Tuple]:
+        """
+        Stream ``(day, department, leave type, days, employees)`` rows for export.
+        """
+        return (self.rows(start, end)
+                .order_by('day', 'department__name', 'leave_type__name')
+                .values_list('day', 'department__name', 'leave_type__name', 'days', 'employees')
+                .iterator(chunk_size=2000))
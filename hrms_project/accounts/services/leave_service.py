@@ -0,0 +1,125 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..exceptions import InsufficientLeaveBalanceError, LeaveRequestError
+from ..models import Employee, LeaveLedgerEntry, LeaveRequest
+from .leave_balance import LeaveBalanceEngine
+from .leave_rollup import LeaveRollups
+
+logger = logging.getLogger(__name__)
+
+
+class LeaveService:
+    """
+    Reviews leave requests. An approval appends a usage entry to the leave
+    ledger and adds the leave to the report rollups; cancelling an approved
+    request reverses both.
+    """
+
+    def __init__(self, engine: Optional[LeaveBalanceEngine] = None, rollups: Optional[LeaveRollups] = None):
+        self.engine = engine or LeaveBalanceEngine()
+        self.rollups = rollups or LeaveRollups()
+
+    def pending_requests(self, limit: int = 200) -> List[LeaveRequest]:
+        return list(
+            LeaveRequest.objects.filter(status=LeaveRequest.STATUS_PENDING)
+            .select_related('employee', 'leave_type')
+            .only('id', 'start_date', 'end_date', 'days', 'reason', 'status', 'leave_type__name',
+                  'employee__first_name', 'employee__last_name', 'employee__employee_code')
+            .order_by('start_date', 'id')[:limit]
+        )
+
+    def balances_for(self, leave_requests: List[LeaveRequest]) -> Dict[Tuple[int, int], float]:
+        """
+        Current balances of every (employee, leave type) pair in ``leave_requests``, in one batch.
+        """
+        if not leave_requests:
+            return {}
+        balances = self.engine.balances({request.employee_id for request in leave_requests})
+        return {key: float(value) for key, value in balances.items()}
+
+    def approve(self, request_id: int, decided_by: str) -> LeaveRequest:
+        """
+        Approve a pending request and record its usage in the ledger.
+
+        Raises:
+            LeaveRequestError: If the request does not exist, was already decided or ends before it starts.
+            InsufficientLeaveBalanceError: If the employee's balance does not cover the request.
+        """
+        with transaction.atomic():
+            leave_request = self._lock_pending(request_id)
+            if leave_request.end_date < leave_request.start_date:
+                raise LeaveRequestError(f"Leave request {request_id} ends before it starts.")
+            # Serialise approvals per employee so two cannot spend the same balance.
+            employee = Employee.objects.select_for_update().only('id', 'department').get(
+                pk=leave_request.employee_id)
+            balance = self.engine.balance(leave_request.employee_id, leave_request.leave_type_id)
+            if balance < float(leave_request.days):
+                raise InsufficientLeaveBalanceError(
+                    f"Balance of {balance:g} days does not cover {leave_request.days:g} requested days.")
+            leave_request.rollup_department_key = self.rollups.department_key(employee.department_id)
+            self._decide(leave_request, LeaveRequest.STATUS_APPROVED, decided_by)
+            LeaveLedgerEntry.objects.create(
+                employee_id=leave_request.employee_id, leave_type_id=leave_request.leave_type_id,
+                kind=LeaveLedgerEntry.KIND_USAGE, days=-leave_request.days, entry_date=leave_request.start_date,
+                leave_request=leave_request)
+            self.rollups.apply(leave_request, employee.department_id)
+        logger.info(f"Leave request {request_id} approved by {decided_by}")
+        return leave_request
+
+    def reject(self, request_id: int, decided_by: str) -> LeaveRequest:
+        """
+        Reject a pending request.
+
+        Raises:
+            LeaveRequestError: If the request does not exist or was already decided.
+        """
+        with transaction.atomic():
+            leave_request = self._lock_pending(request_id)
+            self._decide(leave_request, LeaveRequest.STATUS_REJECTED, decided_by)
+        logger.info(f"Leave request {request_id} rejected by {decided_by}")
+        return leave_request
+
+    def cancel(self, request_id: int, decided_by: str) -> LeaveRequest:
+        """
+        Cancel a pending or approved request; an approved one has its days credited back.
+
+        Raises:
+            LeaveRequestError: If the request does not exist or was rejected or cancelled.
+        """
+        with transaction.atomic():
+            leave_request = self._lock(request_id, (LeaveRequest.STATUS_PENDING, LeaveRequest.STATUS_APPROVED))
+            was_approved = leave_request.status == LeaveRequest.STATUS_APPROVED
+            self._decide(leave_request, LeaveRequest.STATUS_CANCELLED, decided_by)
+            if was_approved:
+                LeaveLedgerEntry.objects.create(
+                    employee_id=leave_request.employee_id, leave_type_id=leave_request.leave_type_id,
+                    kind=LeaveLedgerEntry.KIND_ADJUSTMENT, days=leave_request.days,
+                    entry_date=timezone.localdate(), leave_request=leave_request,
+                    note=f"Cancelled leave request {request_id}")
+                self.rollups.reverse(leave_request)
+        logger.info(f"Leave request {request_id} cancelled by {decided_by}")
+        return leave_request
+
+    def _lock_pending(self, request_id: int) -> LeaveRequest:
+        return self._lock(request_id, (LeaveRequest.STATUS_PENDING,))
+
+    @staticmethod
+    def _lock(request_id: int, statuses: Tuple[str, ...]) -> LeaveRequest:
+        try:
+            leave_request = LeaveRequest.objects.select_for_update().get(pk=request_id)
+        except LeaveRequest.DoesNotExist:
+            raise LeaveRequestError(f"Leave request {request_id} not found.")
+        if leave_request.status not in statuses:
+            raise LeaveRequestError(f"Leave request {request_id} is already {leave_request.status}.")
+        return leave_request
+
+    @staticmethod
+    def _decide(leave_request: LeaveRequest, status: str, decided_by: str) -> None:
+        leave_request.status = status
+        leave_request.decided_at = timezone.now()
+        leave_request.decided_by = decided_by
+        leave_request.save(update_fields=['status', 'decided_at', 'decided_by', 'rollup_department_key'])
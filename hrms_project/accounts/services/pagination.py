@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PageFetcher = Callable[[int, int], List[Dict[str, Any]]]
+AsyncPageFetcher = Callable[[int, int], Awaitable[List[Dict[str, Any]]]]
+
+
+def iter_pages(fetch_page: PageFetcher, per_page: int, prefetch: int = 0) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Walk a page-numbered listing endpoint until a short page is returned.
+
+    Up to ``prefetch`` pages after the one being consumed are requested
+    concurrently, so the consumer rarely waits on the network while the
+    number of pages held in memory stays bounded. Once a short page has
+    arrived no later page is requested; at most ``prefetch`` requests
+    already in flight can end up past the end.
+
+    Args:
+        fetch_page (PageFetcher): Callable taking ``(page, per_page)`` and returning the rows of that page.
+        per_page (int): Number of rows requested per page.
+        prefetch (int): Maximum number of pages fetched ahead of the consumer.
+
+    Yields:
+        List[Dict[str, Any]]: The rows of each page, in page order.
+    """
+    if per_page < 1:
+        raise ValueError("per_page must be at least 1")
+
+    if prefetch < 1:
+        page = 1
+        while True:
+            rows = fetch_page(page, per_page)
+            if rows:
+                yield rows
+            if len(rows) < per_page:
+                return
+            page += 1
+
+    executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix='user-pages')
+    pending: Deque[Tuple[int, Future]] = deque()
+    next_page = 1
+    last_page = None
+    try:
+        while True:
+            # Top up after each consumed page, never past a page already known to be the last.
+            last_page = _known_last_page(pending, per_page, last_page)
+            while len(pending) <= prefetch and (last_page is None or next_page <= last_page):
+                pending.append((next_page, executor.submit(fetch_page, next_page, per_page)))
+                next_page += 1
+
+            _, future = pending.popleft()
+            rows = future.result()
+            if rows:
+                yield rows
+            if len(rows) < per_page:
+                return
+    finally:
+        # Pages requested past the end (or left behind by a consumer that
+        # stopped early) are simply discarded.
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _known_last_page(pending: Deque, per_page: int, last_page: Optional[int]) -> Optional[int]:
+    # A finished short page marks the end of the listing, so no page after it is requested.
+    for page, future in pending:
+        if last_page is not None and page >= last_page:
+            break
+        if future.done() and not future.cancelled() and future.exception() is None \
+                and len(future.result()) < per_page:
+            return page
+    return last_page
+
+
+def iter_rows(pages: Iterator[List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    """
+    Flatten an iterator of pages into an iterator of rows.
+    """
+    for rows in pages:
+        yield from rows
+
+
+async def aiter_pages(fetch_page: AsyncPageFetcher, per_page: int, prefetch: int = 0) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Async counterpart of :func:`iter_pages`; prefetched pages run as tasks on the current loop.
+    """
+    if per_page < 1:
+        raise ValueError("per_page must be at least 1")
+
+    pending: Deque[Tuple[int, asyncio.Future]] = deque()
+    next_page = 1
+    last_page = None
+    try:
+        while True:
+            last_page = _known_last_page(pending, per_page, last_page)
+            while len(pending) <= max(prefetch, 0) and (last_page is None or next_page <= last_page):
+                pending.append((next_page, asyncio.ensure_future(fetch_page(next_page, per_page))))
+                next_page += 1
+
+            _, task = pending.popleft()
+            rows = await task
+            if rows:
+                yield rows
+            if len(rows) < per_page:
+                return
+    finally:
+        # Cancelled tasks are awaited so none is left running (or logging an
+        # unretrieved exception) after the consumer has moved on.
+        tasks = [task for _, task in pending]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
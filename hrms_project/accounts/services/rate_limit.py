@@ -0,0 +1,248 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Spaces out calls to at most ``rate`` per second across threads.
+
+    Each caller reserves the next free slot under a lock and sleeps outside
+    it, so workers queue up evenly instead of bursting. A rate of 0 or less
+    disables limiting.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+PERIOD_UNITS = {'s': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_rate(value: str) -> Tuple[int, float]:
+    """
+    Parse ``"<count>/<seconds>"`` (e.g. ``"10/60"``); the period may also be ``s``, ``m`` or ``h``.
+    """
+    count, _, period = value.partition('/')
+    period = period.strip() or '1'
+    seconds = PERIOD_UNITS[period] if period in PERIOD_UNITS else float(period)
+    return int(count), seconds
+
+
+class TokenBucket:
+    """
+    In-process token buckets, one per key, holding up to ``capacity`` tokens
+    and refilling at ``capacity / period`` tokens per second.
+
+    Idle buckets are evicted oldest-first beyond ``max_keys``; an evicted
+    bucket simply starts full again.
+    """
+
+    def __init__(self, capacity: int, period: float, max_keys: int = 10000):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """
+        Take one token; return 0 if admitted, else the seconds until one is available.
+        """
+        return self._update(key, take=True)
+
+    def peek(self, key: str) -> float:
+        """
+        Like :meth:`take`, but leave the token in the bucket.
+        """
+        return self._update(key, take=False)
+
+    def refund(self, key: str) -> None:
+        """
+        Put back a token taken for a call that was turned away by another limit.
+        """
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(self.capacity, tokens + 1), updated)
+
+    def _update(self, key: str, take: bool) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                retry_after = 0.0
+                if take:
+                    tokens -= 1
+            else:
+                retry_after = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class SharedWindow:
+    """
+    Cross-worker counterpart of :class:`TokenBucket` on the shared cache.
+
+    Admits ``capacity`` calls per key per ``period`` using an atomic counter
+    per window (``cache.add`` + ``cache.incr``), i.e. a bucket that refills
+    in one step at each window boundary. The limit only holds across workers
+    on Redis; other backends are per process or not atomic.
+    """
+
+    def __init__(self, name: str, capacity: int, period: float):
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+
+    def _window(self, key: str) -> Tuple[float, int, str]:
+        now = time.time()
+        window = int(now // self.period)
+        return now, window, f"ratelimit:v1:{self.name}:{key}:{window}"
+
+    def peek(self, key: str) -> float:
+        """
+        Return 0 if the current window has room for ``key``, without counting a call.
+        """
+        now, window, cache_key = self._window(key)
+        if (cache.get(cache_key) or 0) < self.capacity:
+            return 0.0
+        return (window + 1) * self.period - now
+
+    def refund(self, key: str) -> None:
+        """
+        Uncount a call that was turned away by another limit.
+        """
+        try:
+            cache.decr(self._window(key)[2])
+        except ValueError:
+            pass  # the window has already rolled over
+
+    def take(self, key: str) -> float:
+        now, window, cache_key = self._window(key)
+        timeout = int(self.period) + 1
+        cache.add(cache_key, 0, timeout)
+        try:
+            count = cache.incr(cache_key)
+        except ValueError:
+            # The window expired between add and incr; start it again.
+            cache.add(cache_key, 1, timeout)
+            count = 1
+        if count <= self.capacity:
+            return 0.0
+        return (window + 1) * self.period - now
+
+
+class AdmissionLimiter:
+    """
+    A named limit checked in process first, then across workers.
+
+    The in-process bucket rejects bursts without any I/O; requests it admits
+    are also counted against the shared window so the limit holds however
+    many workers there are. Admitted and rejected counts are kept per
+    process for :func:`rate_limit_stats`.
+    """
+
+    def __init__(self, name: str, rate: str):
+        capacity, period = parse_rate(rate)
+        self.name = name
+        self.local = TokenBucket(capacity, period)
+        self.shared = SharedWindow(name, capacity, period)
+        self._lock = threading.Lock()
+        self.counters = {'admitted': 0, 'rejected_local': 0, 'rejected_shared': 0}
+
+    def check(self, key: str) -> float:
+        """
+        Return 0 if a call for ``key`` would be admitted now, else the seconds to wait; spends nothing.
+        """
+        retry_after = self.local.peek(key)
+        if retry_after:
+            self._count('rejected_local')
+            return retry_after
+        retry_after = self._shared(self.shared.peek, key)
+        if retry_after:
+            self._count('rejected_shared')
+        return retry_after
+
+    def admit(self, key: str) -> float:
+        """
+        Return 0 if the call for ``key`` is admitted, else the seconds to wait before retrying.
+        """
+        retry_after = self.local.take(key)
+        if retry_after:
+            self._count('rejected_local')
+            return retry_after
+        retry_after = self._shared(self.shared.take, key)
+        if retry_after:
+            self.local.refund(key)
+            self._count('rejected_shared')
+        else:
+            self._count('admitted')
+        return retry_after
+
+    def refund(self, key: str) -> None:
+        """
+        Undo an :meth:`admit` for a call that a later limit turned away.
+        """
+        self.local.refund(key)
+        self._shared(self.shared.refund, key)
+        self._count('admitted', -1)
+
+    def _shared(self, operation, key: str) -> float:
+        try:
+            return operation(key) or 0.0
+        except Exception as e:
+            # A cache outage must not lock everyone out; the local bucket still applies.
+            logger.warning(f"Shared rate limit {self.name} unavailable: {str(e)}")
+            return 0.0
+
+    def _count(self, outcome: str, delta: int = 1) -> None:
+        with self._lock:
+            self.counters[outcome] += delta
+
+
+_limiters: Dict[str, AdmissionLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> Optional[AdmissionLimiter]:
+    """
+    Return the limiter configured as ``RATE_LIMITS[name]``, or None if that limit is unset.
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        rate = settings.RATE_LIMITS.get(name)
+        if not rate:
+            return None
+        with _limiters_lock:
+            limiter = _limiters.setdefault(name, AdmissionLimiter(name, rate))
+    return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Return this process's admitted/rejected counters for every limiter used so far.
+    """
+    return {name: dict(limiter.counters) for name, limiter in list(_limiters.items())}
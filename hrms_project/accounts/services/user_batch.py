@@ -0,0 +1,101 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import httpx
+from django.conf import settings
+
+from ..exceptions import UserDeletionError
+from .user_cache import user_entity_cache, user_list_cache
+from .user_service_v1 import UserService
+
+logger = logging.getLogger(__name__)
+
+BATCH_OPERATIONS = ('delete', 'set_admin', 'unset_admin', 'toggle_admin', 'update_metadata')
+# user_metadata keys a batch may change.
+BATCH_METADATA_FIELDS = ('first_name', 'last_name', 'is_admin')
+
+
+class UserBatch:
+    """
+    Applies one operation to many users concurrently.
+
+    Each user is a separate Supabase call on a bounded thread pool; a failure
+    only affects its own item. The user list cache, per-user cache and local
+    mirror are patched once with every successful result.
+    """
+
+    def __init__(self, user_service: Optional[UserService] = None, workers: Optional[int] = None):
+        self.user_service = user_service or UserService()
+        self.workers = workers or settings.USER_BATCH_WORKERS
+
+    def run(self, operation: str, user_ids: List[str],
+            metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Run ``operation`` for every id and return one ``{'id', 'success', 'message'}`` report per id.
+
+        Args:
+            operation (str): One of ``BATCH_OPERATIONS``.
+            user_ids (List[str]): Users to change; duplicates are dropped.
+            metadata (Optional[Dict[str, Any]]): ``user_metadata`` changes for ``update_metadata``.
+
+        Raises:
+            ValueError: If the operation or metadata is not allowed.
+        """
+        if operation not in BATCH_OPERATIONS:
+            raise ValueError(f"Unknown batch operation {operation!r}")
+        if operation == 'update_metadata':
+            metadata = {key: value for key, value in (metadata or {}).items() if key in BATCH_METADATA_FIELDS}
+            if not metadata:
+                raise ValueError(f"update_metadata needs at least one of {', '.join(BATCH_METADATA_FIELDS)}")
+
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(user_ids)),
+                                thread_name_prefix='user-batch') as pool:
+            outcomes = list(pool.map(lambda user_id: self._run_one(operation, user_id, metadata), user_ids))
+
+        upserts = [outcome['raw'] for outcome in outcomes if outcome.get('raw')]
+        removals = [outcome['id'] for outcome in outcomes if outcome['success'] and operation == 'delete']
+        self._patch_caches(upserts, removals)
+        logger.info(f"Batch {operation}: {sum(o['success'] for o in outcomes)}/{len(outcomes)} succeeded")
+        return [{key: outcome[key] for key in ('id', 'success', 'message')} for outcome in outcomes]
+
+    def _run_one(self, operation: str, user_id: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            if operation == 'delete':
+                self.user_service.delete_user(user_id, update_cache=False)
+                return {'id': user_id, 'success': True, 'message': 'Deleted'}
+
+            if operation == 'update_metadata':
+                changes = metadata
+            elif operation == 'toggle_admin':
+                changes = {'is_admin': not self.user_service.get_user_by_id(user_id)['is_admin']}
+            else:
+                changes = {'is_admin': operation == 'set_admin'}
+            response = self.user_service.http.put(
+                f"{self.user_service.supabase_url}/auth/v1/admin/users/{user_id}",
+                headers=self.user_service.headers, json={'user_metadata': changes})
+            response.raise_for_status()
+            return {'id': user_id, 'success': True, 'message': 'Updated', 'raw': response.json()}
+        except UserDeletionError as e:
+            return {'id': user_id, 'success': False, 'message': str(e)}
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return {'id': user_id, 'success': False, 'message': f"User with ID {user_id} not found."}
+            logger.error(f"Batch {operation} failed for user {user_id}: {str(e)}")
+            return {'id': user_id, 'success': False, 'message': f"Error: {str(e)}"}
+        except Exception as e:
+            logger.error(f"Batch {operation} failed for user {user_id}: {str(e)}")
+            return {'id': user_id, 'success': False, 'message': f"Error: {str(e)}"}
+
+    def _patch_caches(self, upserts: List[Dict[str, Any]], removals: List[str]) -> None:
+        if not upserts and not removals:
+            return
+        user_list_cache.apply(upserts=upserts, removals=removals)
+        for user in upserts:
+            user_entity_cache.put(self.user_service.format_user(user))
+        for user_id in removals:
+            user_entity_cache.discard(user_id)
+        self.user_service.mirror_write(upserts=upserts, removals=removals)
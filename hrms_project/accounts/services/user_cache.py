@@ -0,0 +1,460 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .user_directory import find_user
+
+logger = logging.getLogger(__name__)
+
+UsersLoader = Callable[[], List[Dict[str, Any]]]
+AsyncUsersLoader = Callable[[], Awaitable[List[Dict[str, Any]]]]
+# (from_version, to_version, upserted users, removed ids)
+Change = Tuple[Optional[str], str, List[Dict[str, Any]], List[str]]
+
+
+def content_version(value: Any) -> str:
+    """
+    Derive a version stamp from ``value`` itself.
+
+    Workers that fill or patch the list from the same upstream data arrive
+    at the same stamp, so ETags and directory syncs agree across processes
+    even when each keeps its own cache.
+    """
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def namespaced_key(namespace: str, schema: int, name: str) -> str:
+    """
+    Build a ``<namespace>:v<schema>:<name>`` cache key.
+
+    Bump ``schema`` whenever the shape of the cached value changes, so workers
+    running old and new code never read each other's entries. The backend
+    adds ``CACHE_KEY_PREFIX`` and ``CACHE_VERSION`` on top (see settings).
+    """
+    return f"{namespace}:v{schema}:{name}"
+
+
+class UserListCache:
+    """
+    Cache for the full user list with single-flight refill and stale-while-revalidate.
+
+    The list is stored with a soft expiry (``fresh_until``) and a longer hard
+    TTL. Between the two, readers get the stale list immediately while one
+    background thread refreshes it. When the list is missing, only one
+    caller (per process via a lock, across workers via ``cache.add``) goes
+    upstream; the rest wait for it or, failing that, fetch themselves. The
+    cross-worker half needs an atomic ``add`` that is never culled, i.e. the
+    Redis backend.
+
+    Writes patch the cached list in place (:meth:`apply`) instead of
+    dropping it, and record the delta in a short change log so other
+    processes can bring their directory index forward without a resync.
+    Every write also moves a generation marker; a refill that started
+    before the marker moved discards its (possibly pre-write) result
+    instead of storing it.
+    """
+
+    POLL_INTERVAL = 0.05
+    MAX_CHANGES = 256
+
+    def __init__(self, namespace: str = 'users', schema: int = 1):
+        self.USERS_KEY = namespaced_key(namespace, schema, 'all')
+        self.VERSION_KEY = namespaced_key(namespace, schema, 'version')
+        self.FRESH_KEY = namespaced_key(namespace, schema, 'fresh_until')
+        self.CHANGES_KEY = namespaced_key(namespace, schema, 'changes')
+        self.LOCK_KEY = namespaced_key(namespace, schema, 'refill_lock')
+        self.GENERATION_KEY = namespaced_key(namespace, schema, 'write_generation')
+        self._fill_lock = threading.Lock()
+        self._refreshing = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'waits': 0, 'refreshes': 0, 'refresh_failures': 0}
+
+    # Counters
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return this process's hit/miss/refresh counters.
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    # Storage
+
+    def _ttls(self):
+        jitter = settings.USER_CACHE_TTL_JITTER
+        fresh = settings.USER_CACHE_TTL * random.uniform(1 - jitter, 1 + jitter)
+        return fresh, fresh + settings.USER_CACHE_STALE_TTL
+
+    def store(self, users: List[Dict[str, Any]]) -> str:
+        """
+        Store a freshly fetched list under its content version and return that version.
+        """
+        fresh, timeout = self._ttls()
+        version = content_version(users)
+        cache.set_many({
+            self.USERS_KEY: users,
+            self.VERSION_KEY: version,
+            self.FRESH_KEY: time.time() + fresh,
+            self.CHANGES_KEY: [],
+        }, timeout)
+        return version
+
+    def version(self) -> Optional[str]:
+        return cache.get(self.VERSION_KEY)
+
+    def peek(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the cached list, fresh or stale, without triggering a fetch.
+        """
+        return cache.get(self.USERS_KEY)
+
+    def invalidate(self) -> None:
+        cache.delete_many([self.USERS_KEY, self.VERSION_KEY, self.FRESH_KEY, self.CHANGES_KEY])
+
+    async def ainvalidate(self) -> None:
+        await cache.adelete_many([self.USERS_KEY, self.VERSION_KEY, self.FRESH_KEY, self.CHANGES_KEY])
+
+    # Write-through
+
+    def apply(self, upserts: Iterable[Dict[str, Any]] = (), removals: Iterable[str] = ()) -> Optional[str]:
+        """
+        Patch the cached list with the result of upstream writes and bump its version.
+
+        Upserted users replace the entry with the same id (or are appended);
+        removed ids are dropped. Runs under the refill lock, and moves the
+        write generation first so a refill already in flight (or one that
+        outlived the lock) does not store a list fetched before this write.
+        If the list is not cached there is nothing to patch; if the lock
+        cannot be taken the list is invalidated.
+
+        Args:
+            upserts (Iterable[Dict[str, Any]]): Users as returned by the write, in the cached shape.
+            removals (Iterable[str]): Ids of deleted users.
+
+        Returns:
+            Optional[str]: The new version, or None if nothing was patched.
+        """
+        upserts, removals = list(upserts), list(removals)
+        if not upserts and not removals:
+            return None
+
+        self._bump_generation()
+        token = self._acquire_lock()
+        if token is None:
+            logger.warning("Could not lock the user cache for a write-through update; invalidating it")
+            self.invalidate()
+            return None
+        try:
+            entries = cache.get_many([self.USERS_KEY, self.VERSION_KEY, self.FRESH_KEY, self.CHANGES_KEY])
+            users = entries.get(self.USERS_KEY)
+            if users is None:
+                return None
+
+            positions = {user.get('id'): index for index, user in enumerate(users)}
+            for user in upserts:
+                index = positions.get(user['id'])
+                if index is None:
+                    positions[user['id']] = len(users)
+                    users.append(user)
+                else:
+                    users[index] = user
+            removed = set(removals)
+            if removed:
+                users = [user for user in users if user.get('id') not in removed]
+
+            version = content_version([entries.get(self.VERSION_KEY), upserts, removals])
+            changes = (entries.get(self.CHANGES_KEY) or [])[-(self.MAX_CHANGES - 1):]
+            changes.append((entries.get(self.VERSION_KEY), version, upserts, removals))
+            fresh_until = entries.get(self.FRESH_KEY, 0)
+            timeout = max(fresh_until - time.time(), 0) + settings.USER_CACHE_STALE_TTL
+            cache.set_many({
+                self.USERS_KEY: users,
+                self.VERSION_KEY: version,
+                self.FRESH_KEY: fresh_until,
+                self.CHANGES_KEY: changes,
+            }, timeout)
+            logger.info(f"Patched user cache: {len(upserts)} upserted, {len(removals)} removed")
+            return version
+        finally:
+            self._release_lock(token)
+
+    def changes_since(self, from_version: str, to_version: str) -> Optional[List[Change]]:
+        """
+        Return the chain of changes leading from ``from_version`` to ``to_version``.
+
+        Returns None if the log does not cover that range (e.g. after a full refill).
+        """
+        by_origin = {change[0]: change for change in cache.get(self.CHANGES_KEY) or []}
+        chain: List[Change] = []
+        version = from_version
+        while version != to_version:
+            change = by_origin.get(version)
+            if change is None or len(chain) >= self.MAX_CHANGES:
+                return None
+            chain.append(change)
+            version = change[1]
+        return chain
+
+    def _bump_generation(self) -> None:
+        cache.set(self.GENERATION_KEY, uuid.uuid4().hex, None)
+
+    def _store_unless_written(self, users: List[Dict[str, Any]], generation: Optional[str]) -> None:
+        # ``generation`` was read before the fetch started; if a write has moved it since,
+        # the fetched list may predate that write and must not replace the cached one.
+        if cache.get(self.GENERATION_KEY) != generation:
+            logger.info("User list was written during the refill; not caching the fetched list")
+            return
+        self.store(users)
+        if cache.get(self.GENERATION_KEY) != generation:
+            self.invalidate()
+
+    def _acquire_lock(self) -> Optional[str]:
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + settings.USER_CACHE_WAIT_TIMEOUT
+        while not cache.add(self.LOCK_KEY, token, settings.USER_CACHE_LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.POLL_INTERVAL)
+        return token
+
+    def _release_lock(self, token: str) -> None:
+        if cache.get(self.LOCK_KEY) == token:
+            cache.delete(self.LOCK_KEY)
+
+    # Reads
+
+    def get(self, loader: UsersLoader) -> List[Dict[str, Any]]:
+        """
+        Return the user list, calling ``loader`` at most once across concurrent misses.
+
+        Args:
+            loader (UsersLoader): Fetches the full user list from upstream.
+
+        Returns:
+            List[Dict[str, Any]]: The cached or freshly loaded users.
+        """
+        entries = cache.get_many([self.USERS_KEY, self.FRESH_KEY])
+        users = entries.get(self.USERS_KEY)
+        if users is not None:
+            if time.time() < entries.get(self.FRESH_KEY, 0):
+                self._count('hits')
+            else:
+                self._count('stale_hits')
+                self._refresh_in_background(loader)
+            return users
+
+        self._count('misses')
+        return self._fill(loader)
+
+    async def aget(self, loader: UsersLoader, aloader: Optional[AsyncUsersLoader] = None) -> List[Dict[str, Any]]:
+        """
+        Async :meth:`get`.
+
+        Hits are served on the event loop; a stale hit is refreshed by the
+        background thread with ``loader``. A miss is filled by awaiting
+        ``aloader`` under the same cross-worker refill lock, or in a thread
+        with ``loader`` if no async loader is given.
+        """
+        entries = await cache.aget_many([self.USERS_KEY, self.FRESH_KEY])
+        users = entries.get(self.USERS_KEY)
+        if users is not None:
+            if time.time() < entries.get(self.FRESH_KEY, 0):
+                self._count('hits')
+            else:
+                self._count('stale_hits')
+                self._refresh_in_background(loader)
+            return users
+
+        if aloader is None:
+            return await sync_to_async(self.get, thread_sensitive=False)(loader)
+        self._count('misses')
+        return await self._afill(aloader)
+
+    # Refill
+
+    def _fill(self, loader: UsersLoader) -> List[Dict[str, Any]]:
+        with self._fill_lock:
+            # Another thread in this process may have filled it while we waited.
+            users = self.peek()
+            if users is not None:
+                return users
+
+            token = uuid.uuid4().hex
+            if cache.add(self.LOCK_KEY, token, settings.USER_CACHE_LOCK_TIMEOUT):
+                try:
+                    return self._load(loader)
+                finally:
+                    self._release_lock(token)
+
+            # Another worker holds the refill lock: wait for its result.
+            self._count('waits')
+            deadline = time.monotonic() + settings.USER_CACHE_WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(self.POLL_INTERVAL)
+                users = self.peek()
+                if users is not None:
+                    return users
+            logger.warning("Timed out waiting for another worker to refill the user cache")
+            return self._load(loader)
+
+    async def _afill(self, aloader: AsyncUsersLoader) -> List[Dict[str, Any]]:
+        # The refill lock key is shared by every caller, so it also single-flights within this process.
+        token = uuid.uuid4().hex
+        if await cache.aadd(self.LOCK_KEY, token, settings.USER_CACHE_LOCK_TIMEOUT):
+            try:
+                return await self._aload(aloader)
+            finally:
+                await sync_to_async(self._release_lock, thread_sensitive=False)(token)
+
+        self._count('waits')
+        deadline = time.monotonic() + settings.USER_CACHE_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            users = await cache.aget(self.USERS_KEY)
+            if users is not None:
+                return users
+        logger.warning("Timed out waiting for another worker to refill the user cache")
+        return await self._aload(aloader)
+
+    async def _aload(self, aloader: AsyncUsersLoader) -> List[Dict[str, Any]]:
+        generation = await cache.aget(self.GENERATION_KEY)
+        users = await aloader()
+        await sync_to_async(self._store_unless_written, thread_sensitive=False)(users, generation)
+        logger.info(f"Fetched {len(users)} users from Supabase and cached")
+        return users
+
+    def _load(self, loader: UsersLoader) -> List[Dict[str, Any]]:
+        generation = cache.get(self.GENERATION_KEY)
+        users = loader()
+        self._store_unless_written(users, generation)
+        logger.info(f"Fetched {len(users)} users from Supabase and cached")
+        return users
+
+    def _refresh_in_background(self, loader: UsersLoader) -> None:
+        with self._stats_lock:
+            if self._refreshing.is_set():
+                return
+            self._refreshing.set()
+        threading.Thread(target=self._refresh, args=(loader,), name='user-cache-refresh', daemon=True).start()
+
+    def _refresh(self, loader: UsersLoader) -> None:
+        token = uuid.uuid4().hex
+        try:
+            if not cache.add(self.LOCK_KEY, token, settings.USER_CACHE_LOCK_TIMEOUT):
+                return  # another worker is already refreshing
+            try:
+                self._load(loader)
+                self._count('refreshes')
+            finally:
+                self._release_lock(token)
+        except Exception as e:
+            self._count('refresh_failures')
+            logger.error(f"Background user cache refresh failed: {str(e)}")
+        finally:
+            self._refreshing.clear()
+
+
+# Raw Supabase users, shared by every user service; formatting happens on read.
+user_list_cache = UserListCache()
+
+
+class UserEntityCache:
+    """
+    Per-user cache for single-user lookups, bounded by TTL and LRU size.
+
+    Entries live in a process-local LRU and under ``users:v1:user:<id>`` in
+    the shared cache; on a miss, a directory that is current with the user
+    list answers without an upstream call. Each entry is tagged with the user list version
+    it was current at; once the list has moved on, the entry is kept only if
+    the list's change log shows the user was not touched in between.
+    """
+
+    KEY_PREFIX = namespaced_key('users', 1, 'user:')
+
+    def __init__(self, list_cache: UserListCache):
+        self._list_cache = list_cache
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, Optional[str]]]" = OrderedDict()
+
+    def _still_valid(self, user_id: str, tag: Optional[str], version: Optional[str]) -> bool:
+        if tag == version:
+            return True
+        if tag is None or version is None:
+            # The list was refilled or dropped in between; nothing to check against.
+            return False
+        changes = self._list_cache.changes_since(tag, version)
+        if changes is None:
+            return False
+        return not any(user_id in removals or any(user.get('id') == user_id for user in upserts)
+                       for _, _, upserts, removals in changes)
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached user, or None if absent, expired or possibly changed since.
+        """
+        version = self._list_cache.version()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None:
+            user, expires, tag = entry
+            if time.time() < expires and self._still_valid(user_id, tag, version):
+                with self._lock:
+                    if user_id in self._entries:
+                        self._entries[user_id] = (user, expires, version)
+                        self._entries.move_to_end(user_id)
+                return user
+            self._forget(user_id)
+
+        shared = cache.get(self.KEY_PREFIX + user_id)
+        if shared is not None:
+            user, tag = shared
+            if self._still_valid(user_id, tag, version):
+                self._remember(user, version)
+                return user
+
+        user = find_user(user_id, version)
+        if user is not None:
+            self._remember(user, version)
+        return user
+
+    def put(self, user: Dict[str, Any]) -> None:
+        """
+        Cache a formatted user, e.g. from a write response or upstream fetch.
+        """
+        version = self._list_cache.version()
+        self._remember(user, version)
+        cache.set(self.KEY_PREFIX + user['id'], (user, version), settings.USER_ENTITY_CACHE_TTL)
+
+    def discard(self, user_id: str) -> None:
+        self._forget(user_id)
+        cache.delete(self.KEY_PREFIX + user_id)
+
+    def _remember(self, user: Dict[str, Any], version: Optional[str]) -> None:
+        with self._lock:
+            self._entries[user['id']] = (user, time.time() + settings.USER_ENTITY_CACHE_TTL, version)
+            self._entries.move_to_end(user['id'])
+            while len(self._entries) > settings.USER_ENTITY_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def _forget(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+user_entity_cache = UserEntityCache(user_list_cache)
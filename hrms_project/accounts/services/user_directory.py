@@ -0,0 +1,363 @@
+import bisect
+import logging
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ('email', 'first_name', 'last_name')
+
+_WORD_SPLIT = re.compile(r'[^0-9a-z]+')
+
+
+def _normalise(value: Any) -> str:
+    return (value or '').strip().lower() if isinstance(value, str) else ''
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in _WORD_SPLIT.split(text) if word]
+
+
+class UserDirectory:
+    """
+    In-memory search index over formatted users.
+
+    Each user gets an integer document id. Substring search uses trigram
+    postings (compact ``array('I')`` lists, append-only) and prefix search
+    for one- and two-character terms uses a sorted word list.
+    Postings may hold stale entries for replaced or removed users; every
+    candidate is verified against its current fields, and the index is
+    compacted once stale entries make up a large share of it, so
+    single-user changes never trigger a full rebuild.
+    """
+
+    RESULT_CACHE_SIZE = 128
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, users: Iterable[Dict[str, Any]] = (), version: Any = None):
+        self._lock = threading.RLock()
+        self.version = version
+        self._reset()
+        for user in users:
+            self._add(user, bulk=True)
+        self._prefixes.sort()
+
+    def _reset(self) -> None:
+        self._docs: List[Optional[Dict[str, Any]]] = []
+        self._fields: List[Optional[Tuple[str, ...]]] = []
+        self._spaced: List[Optional[Tuple[str, ...]]] = []
+        self._doc_by_id: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._prefixes: List[Tuple[str, int]] = []
+        self._stale = 0
+        self._listing: Optional[List[Dict[str, Any]]] = None
+        self._results: "OrderedDict[Any, List[Dict[str, Any]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._doc_by_id)
+
+    # Maintenance
+
+    def _index(self, doc: int, user: Dict[str, Any], bulk: bool) -> None:
+        fields = tuple(_normalise(user.get(field)) for field in SEARCH_FIELDS)
+        self._docs[doc] = user
+        self._fields[doc] = fields
+        # Word boundaries become a leading space so word-prefix tests are plain substring checks.
+        self._spaced[doc] = tuple(' ' + ' '.join(_words(text)) for text in fields)
+
+        grams: Set[str] = set()
+        words: Set[str] = set()
+        for text in fields:
+            grams |= _trigrams(text)
+            if text:
+                words.add(text)
+                words.update(_words(text))
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array('I')
+            posting.append(doc)
+        if bulk:
+            # Bulk loads append and sort once at the end.
+            self._prefixes.extend((word, doc) for word in words)
+        else:
+            for word in words:
+                bisect.insort(self._prefixes, (word, doc))
+
+    def _add(self, user: Dict[str, Any], bulk: bool = False) -> None:
+        doc = self._doc_by_id.get(user['id'])
+        if doc is not None:
+            # Keep the document id (and so the listing position); old postings go stale.
+            self._stale += 1
+        else:
+            doc = len(self._docs)
+            self._docs.append(None)
+            self._fields.append(None)
+            self._spaced.append(None)
+            self._doc_by_id[user['id']] = doc
+        self._index(doc, user, bulk)
+
+    def _drop(self, user_id: str) -> bool:
+        doc = self._doc_by_id.pop(user_id, None)
+        if doc is None:
+            return False
+        self._docs[doc] = None
+        self._fields[doc] = None
+        self._spaced[doc] = None
+        self._stale += 1
+        return True
+
+    def _changed(self) -> None:
+        self._listing = None
+        self._results.clear()
+        if self._stale > max(64, len(self._docs) * self.COMPACT_RATIO):
+            self._compact()
+
+    def _compact(self) -> None:
+        live = [user for user in self._docs if user is not None]
+        self._reset()
+        for user in live:
+            self._add(user, bulk=True)
+        self._prefixes.sort()
+        logger.info(f"Compacted user directory to {len(live)} entries")
+
+    def upsert(self, user: Dict[str, Any], version: Any = None) -> None:
+        """
+        Insert or replace a single formatted user.
+        """
+        with self._lock:
+            self._add(user)
+            self.version = version
+            self._changed()
+
+    def remove(self, user_id: str, version: Any = None) -> bool:
+        """
+        Remove a single user; returns False if it was not indexed.
+        """
+        with self._lock:
+            removed = self._drop(user_id)
+            self.version = version
+            if removed:
+                self._changed()
+            return removed
+
+    def sync(self, users: Iterable[Dict[str, Any]], version: Any = None) -> int:
+        """
+        Bring the index in line with a freshly fetched user list.
+
+        Only users that were added, changed or removed are re-indexed.
+
+        Returns:
+            int: Number of users that changed.
+        """
+        with self._lock:
+            changed = 0
+            seen: Set[str] = set()
+            for user in users:
+                seen.add(user['id'])
+                if self.get(user['id']) == user:
+                    continue
+                self._add(user, bulk=True)
+                changed += 1
+            if changed:
+                self._prefixes.sort()
+            for user_id in [user_id for user_id in self._doc_by_id if user_id not in seen]:
+                self._drop(user_id)
+                changed += 1
+            self.version = version
+            if changed:
+                self._changed()
+            return changed
+
+    # Queries
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._doc_by_id.get(user_id)
+        return None if doc is None else self._docs[doc]
+
+    def all(self) -> List[Dict[str, Any]]:
+        """
+        Return every user in upstream order.
+        """
+        with self._lock:
+            if self._listing is None:
+                self._listing = [user for user in self._docs if user is not None]
+            return self._listing
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Return users matching every term of ``query``, best matches first.
+
+        Terms of three or more characters match anywhere in the email, first
+        or last name; shorter terms match the start of a word. Exact field
+        matches rank above field prefixes, word prefixes, then substrings.
+        """
+        terms = _normalise(query).split()
+        if not terms:
+            return self.all()
+
+        key = ' '.join(terms)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached
+
+            scored = []
+            score_field = self._score
+            for doc in self._candidates(terms):
+                fields = self._fields[doc]
+                if fields is None:
+                    continue
+                spaced = self._spaced[doc]
+                score = 0
+                for term in terms:
+                    term_score = max(score_field(term, fields[0], spaced[0]),
+                                     score_field(term, fields[1], spaced[1]),
+                                     score_field(term, fields[2], spaced[2]))
+                    if not term_score:
+                        break
+                    score += term_score
+                else:
+                    scored.append((-score, fields[0], doc))
+            scored.sort()
+            results = [self._docs[doc] for _, _, doc in scored]
+
+            self._results[key] = results
+            if len(self._results) > self.RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+            return results
+
+    def query(self, search: str = '', filters: Optional[Dict[str, Any]] = None,
+              sort: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return users matching ``search`` and exact-match ``filters``, ordered by ``sort``.
+
+        Args:
+            search (str): Search terms, as for :meth:`search`.
+            filters (Optional[Dict[str, Any]]): Field/value pairs that must match exactly.
+            sort (Optional[str]): Field to order by, ``-`` prefixed for descending. Defaults to
+                relevance when searching and upstream order otherwise.
+
+        Returns:
+            List[Dict[str, Any]]: The matching users; memoised until the directory changes.
+        """
+        filters = filters or {}
+        key = ('query', ' '.join(_normalise(search).split()), tuple(sorted(filters.items())), sort or '')
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached
+
+            users = self.search(search)
+            if filters:
+                users = [user for user in users
+                         if all(user.get(field) == value for field, value in filters.items())]
+            if sort:
+                field = sort.lstrip('-')
+                # Missing values sort first ascending; the id keeps the order total.
+                users = sorted(users, key=lambda user: (user.get(field) is not None, user.get(field) or '', user['id']),
+                               reverse=sort.startswith('-'))
+
+            self._results[key] = users
+            if len(self._results) > self.RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+            return users
+
+    def _candidates(self, terms: List[str]) -> Set[int]:
+        long_terms = [term for term in terms if len(term) >= 3]
+        if not long_terms:
+            return self._prefix_docs(max(terms, key=len))
+
+        postings = sorted((self._postings.get(gram, array('I'))
+                           for term in long_terms for gram in _trigrams(term)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if len(candidates) <= 64:
+                break  # few enough to verify directly
+            candidates.intersection_update(posting)
+        return candidates
+
+    def _prefix_docs(self, prefix: str) -> Set[int]:
+        prefixes = self._prefixes
+        index = bisect.bisect_left(prefixes, (prefix,))
+        docs = set()
+        while index < len(prefixes) and prefixes[index][0].startswith(prefix):
+            docs.add(prefixes[index][1])
+            index += 1
+        return docs
+
+    @staticmethod
+    def _score(term: str, text: str, words: str) -> int:
+        if not text:
+            return 0
+        if text == term:
+            return 100
+        if text.startswith(term):
+            return 60
+        if ' ' + term in words:
+            return 40
+        if len(term) >= 3 and term in text:
+            return 20
+        return 0
+
+
+_directory = UserDirectory()
+
+
+def find_user(user_id: str, version: Any) -> Optional[Dict[str, Any]]:
+    """
+    Return a formatted user from the directory if it is current at ``version``.
+
+    Never loads or syncs anything; returns None when the directory is behind.
+    """
+    if version is None or _directory.version != version:
+        return None
+    return _directory.get(user_id)
+
+
+def get_directory(version: Any, load_users: Callable[[], Tuple[List[Dict[str, Any]], Any]],
+                  format_user: Callable[[Dict[str, Any]], Dict[str, Any]],
+                  changes_since: Optional[Callable[[Any, Any], Optional[List[Tuple]]]] = None) -> UserDirectory:
+    """
+    Return the process-local directory, bringing it up to the cached user list's version.
+
+    Args:
+        version: Version stamp of the cached user list, or None if unknown.
+        load_users: Returns the current raw user list and its version; only called when the
+            directory cannot be brought forward from the change log.
+        format_user: Formats a raw user row for display and indexing.
+        changes_since: Returns the ``(from, to, upserts, removals)`` chain between two versions,
+            or None if the log does not cover it.
+
+    Returns:
+        UserDirectory: The up-to-date directory.
+    """
+    if version is not None and _directory.version == version:
+        return _directory
+
+    if version is not None and _directory.version is not None and changes_since is not None:
+        changes = changes_since(_directory.version, version)
+        if changes is not None:
+            with _directory._lock:
+                for _, to_version, upserts, removals in changes:
+                    for user in upserts:
+                        _directory.upsert(format_user(user), to_version)
+                    for user_id in removals:
+                        _directory.remove(user_id, to_version)
+                _directory.version = version
+            return _directory
+
+    users, version = load_users()
+    changed = _directory.sync((format_user(user) for user in users), version)
+    if changed:
+        logger.info(f"User directory synced to version {version} ({changed} changed)")
+    return _directory
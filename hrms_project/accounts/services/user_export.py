@@ -0,0 +1,168 @@
+import csv
+import datetime
+import io
+import re
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, Sequence
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+from ..models import SupabaseUser
+from .user_service_v1 import UserService
+
+EXPORT_FIELDS = ('id', 'email', 'first_name', 'last_name', 'is_admin', 'email_confirmed', 'created_at',
+                 'last_sign_in_at')
+# Rows per yielded chunk: large enough to keep per-chunk overhead low, small enough to stay flat in memory.
+EXPORT_CHUNK_ROWS = 500
+
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Spreadsheet apps evaluate cells starting with these as formulas; user-controlled names must stay text.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_rows(query: str = '') -> Iterator[Dict[str, Any]]:
+    """
+    Yield formatted users matching ``query``, filtered as ``list_users`` filters them.
+
+    From the local mirror rows are read with a server-side iterator; otherwise
+    they come from this process's user directory. That directory holds every
+    user in memory, and is built whole from Supabase when it is not already
+    resident, so large exports should run with ``USERS_LOCAL_MIRROR``.
+    """
+    if settings.USERS_LOCAL_MIRROR:
+        return SupabaseUser.objects.search(query).formatted().iterator(chunk_size=2000)
+    return iter(UserService().get_directory().search(query))
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _cell_text(value: Any) -> str:
+    text = _text(value)
+    if text.startswith(FORMULA_PREFIXES):
+        return f"'{text}"
+    return text
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], fields: Sequence[str] = EXPORT_FIELDS) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_cell_text(row.get(field)) for field in fields])
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+class _Sink(io.RawIOBase):
+    """Unseekable byte sink, so ZipFile streams entries with data descriptors; drained between rows."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _column(index: int) -> str:
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell(reference: str, value: Any) -> str:
+    if value is None or value == '':
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{reference}" t="b"><v>{int(value)}</v></c>'
+    text = escape(_XML_INVALID.sub('', _cell_text(value)))
+    return f'<c r="{reference}" t="inlineStr"><is><t>{text}</t></is></c>'
+
+
+XLSX_PARTS = (
+    ('[Content_Types].xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '</Types>'),
+    ('_rels/.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+     'Target="xl/workbook.xml"/>'
+     '</Relationships>'),
+    ('xl/workbook.xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+     'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+     '<sheets><sheet name="Users" sheetId="1" r:id="rId1"/></sheets>'
+     '</workbook>'),
+    ('xl/_rels/workbook.xml.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+     'Target="worksheets/sheet1.xml"/>'
+     '</Relationships>'),
+)
+
+
+def iter_xlsx(rows: Iterable[Dict[str, Any]], fields: Sequence[str] = EXPORT_FIELDS) -> Iterator[bytes]:
+    """
+    Yield a one-sheet XLSX workbook as it is built.
+
+    The worksheet is written row by row into a deflated zip entry with
+    inline strings (no shared-strings table to hold in memory), and the zip
+    bytes are handed on every ``EXPORT_CHUNK_ROWS`` rows.
+    """
+    columns = [_column(index) for index in range(len(fields))]
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, body in XLSX_PARTS:
+            archive.writestr(name, body)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            header = ''.join(_cell(f'{column}1', field) for column, field in zip(columns, fields))
+            sheet.write(f'<row r="1">{header}</row>'.encode())
+            for number, row in enumerate(rows, 2):
+                cells = ''.join(_cell(f'{column}{number}', row.get(field)) for column, field in zip(columns, fields))
+                sheet.write(f'<row r="{number}">{cells}</row>'.encode())
+                if number % EXPORT_CHUNK_ROWS == 0:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'xlsx': (iter_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
@@ -0,0 +1,204 @@
+import csv
+import json
+import logging
+import os
+import secrets
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from ..exceptions import UserAlreadyExistsError
+from .rate_limit import RateLimiter
+from .user_cache import user_list_cache
+from .user_service_v1 import UserService
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+def read_user_rows(path: str, file_format: Optional[str] = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Open ``path`` and stream ``(line number, record)`` pairs from it as CSV or JSONL.
+
+    CSV needs an ``email`` column and may have ``password``, ``first_name``,
+    ``last_name`` and ``is_admin``. JSONL records use the same keys, either
+    flat or under ``user_metadata``. The format follows the file extension
+    unless given. The file is opened before this returns, so a bad path
+    fails here rather than mid-import. A JSONL line that is not a JSON
+    object is yielded as a ``ValueError`` in place of its record.
+
+    Raises:
+        OSError: If the file cannot be opened.
+    """
+    file_format = file_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    handle = open(path, newline='', encoding='utf-8-sig')
+    return _iter_user_rows(handle, file_format)
+
+
+def _iter_user_rows(handle, file_format: str) -> Iterator[Tuple[int, Any]]:
+    with handle:
+        if file_format == 'csv':
+            reader = csv.DictReader(handle)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"malformed JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, ValueError(f"expected a JSON object, got {type(record).__name__}")
+                continue
+            yield line_number, record
+
+
+def build_user_payload(record: Dict[str, Any], confirm_email: bool = False) -> Dict[str, Any]:
+    """
+    Turn an import record into an admin ``POST /auth/v1/admin/users`` body.
+
+    Raises:
+        ValidationError: If the email address is missing or invalid.
+    """
+    metadata = record.get('user_metadata') or {}
+    email = (record.get('email') or '').strip().lower()
+    validate_email(email)
+    return {
+        'email': email,
+        # Without a password the account gets a random one and the user resets it.
+        'password': record.get('password') or secrets.token_urlsafe(18),
+        'email_confirm': confirm_email,
+        'user_metadata': {
+            'first_name': (metadata.get('first_name', record.get('first_name')) or '').strip(),
+            'last_name': (metadata.get('last_name', record.get('last_name')) or '').strip(),
+            'is_admin': _flag(metadata.get('is_admin', record.get('is_admin'))),
+        },
+    }
+
+
+class ImportCheckpoint:
+    """
+    Append-only record of emails an import has already handled.
+
+    Every handled email is written (and flushed) as one JSON line, so an
+    interrupted run loses at most the line being written and a re-run skips
+    everything recorded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        self.done.add(json.loads(line)['email'])
+                    except (ValueError, KeyError):
+                        continue  # a torn final line from an interrupted run
+        self._handle = open(path, 'a', encoding='utf-8')
+
+    def __contains__(self, email: str) -> bool:
+        return email in self.done
+
+    def record(self, email: str, user_id: Optional[str], status: str) -> None:
+        with self._lock:
+            self.done.add(email)
+            self._handle.write(json.dumps({'email': email, 'id': user_id, 'status': status}) + '\n')
+            self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class UserImporter:
+    """
+    Creates users from import records through the Supabase admin API.
+
+    Records are pulled lazily and at most ``workers * 2`` are in flight, so
+    the file is never read in whole. Calls are paced by a shared
+    rate limit. The user caches are patched once with every created user
+    when the run ends, instead of once per user.
+    """
+
+    def __init__(self, checkpoint: ImportCheckpoint, workers: int = 4, rate: float = 10.0,
+                 confirm_email: bool = False, user_service: Optional[UserService] = None):
+        self.checkpoint = checkpoint
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate)
+        self.confirm_email = confirm_email
+        self.user_service = user_service or UserService()
+        self.created = []
+        self.stats = {'created': 0, 'existing': 0, 'skipped': 0, 'failed': 0}
+        self._lock = threading.Lock()
+
+    def run(self, rows: Iterator[Tuple[int, Any]]) -> Dict[str, int]:
+        """
+        Import every row and return counts of ``created``, ``existing``, ``skipped`` and ``failed`` users.
+        """
+        pending = set()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='import-users') as pool:
+                for line_number, record in rows:
+                    if isinstance(record, ValueError):
+                        self._fail(line_number, str(record))
+                        continue
+                    try:
+                        payload = build_user_payload(record, self.confirm_email)
+                    except ValidationError:
+                        self._fail(line_number, f"invalid email {record.get('email')!r}")
+                        continue
+                    if payload['email'] in self.checkpoint:
+                        self._count('skipped')
+                        continue
+                    if len(pending) >= self.workers * 2:
+                        _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.add(pool.submit(self._create, line_number, payload))
+        finally:
+            self._flush_caches()
+        return self.stats
+
+    def _create(self, line_number: int, payload: Dict[str, Any]) -> None:
+        self.limiter.wait()
+        try:
+            user = self.user_service.admin_create_user(payload, update_cache=False)
+        except UserAlreadyExistsError:
+            self.checkpoint.record(payload['email'], None, 'existing')
+            self._count('existing')
+            return
+        except Exception as e:
+            # Anything raised here would otherwise vanish with the future.
+            self._fail(line_number, str(e))
+            return
+        self.checkpoint.record(payload['email'], user.get('id'), 'created')
+        with self._lock:
+            self.created.append(user)
+        self._count('created')
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _fail(self, line_number: int, reason: str) -> None:
+        logger.error(f"Import line {line_number} failed: {reason}")
+        self._count('failed')
+
+    def _flush_caches(self) -> None:
+        if not self.created:
+            return
+        user_list_cache.apply(upserts=self.created)
+        self.user_service.mirror_write(upserts=self.created)
+        logger.info(f"Imported {len(self.created)} users; user cache patched once")
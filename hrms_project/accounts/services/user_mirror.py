@@ -0,0 +1,166 @@
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import SupabaseUser, SyncCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# Columns compared and written by bulk_update; synced_at is set explicitly.
+MIRRORED_FIELDS = ('email', 'first_name', 'last_name', 'is_admin', 'email_confirmed', 'created_at',
+                   'updated_at', 'last_sign_in_at', 'user_metadata', 'app_metadata')
+# SyncCheckpoint holding the latest upstream updated_at a completed sync has seen.
+SYNC_CHECKPOINT = 'user_mirror'
+
+
+def _parse_datetime(value: Any):
+    return parse_datetime(value) if isinstance(value, str) and value else None
+
+
+class UserMirror:
+    """
+    Keeps the ``SupabaseUser`` table in line with Supabase auth users.
+
+    A full sync walks every page of the admin listing, writes new and changed
+    rows in batches and deletes rows that no longer exist upstream. The admin
+    API has no updated-since filter, so an incremental sync still walks the
+    listing but skips rows whose ``updated_at`` is not past the high-water
+    mark of the last completed sync without touching the database, and
+    leaves deletions to the next full sync. The mark is kept in a
+    ``SyncCheckpoint`` rather than taken from the table, since rows written
+    through after local edits would otherwise push it past upstream changes
+    not yet mirrored.
+    """
+
+    def __init__(self, user_service=None, batch_size: int = 500):
+        if user_service is None:
+            # Imported here: the user services import this module for write-through.
+            from .user_service_v1 import UserService
+            user_service = UserService()
+        self.user_service = user_service
+        self.batch_size = batch_size
+
+    @staticmethod
+    def to_model(user: Dict[str, Any]) -> SupabaseUser:
+        metadata = user.get('user_metadata') or {}
+        return SupabaseUser(
+            id=uuid.UUID(str(user['id'])),
+            email=user.get('email') or '',
+            first_name=metadata.get('first_name') or '',
+            last_name=metadata.get('last_name') or '',
+            is_admin=bool(metadata.get('is_admin', False)),
+            email_confirmed=bool(user.get('email_confirmed_at')),
+            created_at=_parse_datetime(user.get('created_at')),
+            updated_at=_parse_datetime(user.get('updated_at')),
+            last_sign_in_at=_parse_datetime(user.get('last_sign_in_at')),
+            user_metadata=metadata,
+            app_metadata=user.get('app_metadata') or {},
+        )
+
+    def sync(self, full: bool = True, per_page: Optional[int] = None) -> Dict[str, int]:
+        """
+        Mirror upstream users into the local table.
+
+        Args:
+            full (bool): Also delete local rows missing upstream and re-check every row.
+            per_page (Optional[int]): Users requested per upstream page.
+
+        Returns:
+            Dict[str, int]: Counts of ``seen``, ``created``, ``updated`` and ``deleted`` rows.
+        """
+        checkpoint, _ = SyncCheckpoint.objects.get_or_create(name=SYNC_CHECKPOINT)
+        watermark = None if full else checkpoint.high_water
+        latest = watermark
+        stats = {'seen': 0, 'created': 0, 'updated': 0, 'deleted': 0}
+        seen_ids = set()
+        batch: List[SupabaseUser] = []
+
+        for page in self.user_service.iter_user_pages(per_page=per_page):
+            for user in page:
+                stats['seen'] += 1
+                row = self.to_model(user)
+                if row.updated_at is not None and (latest is None or row.updated_at > latest):
+                    latest = row.updated_at
+                if full:
+                    seen_ids.add(row.id)
+                elif watermark is not None and (row.updated_at is None or row.updated_at <= watermark):
+                    continue
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._write(batch, stats)
+                    batch = []
+        if batch:
+            self._write(batch, stats)
+
+        if full:
+            stale = [pk for pk in SupabaseUser.objects.values_list('pk', flat=True).iterator()
+                     if pk not in seen_ids]
+            for start in range(0, len(stale), self.batch_size):
+                deleted, _ = SupabaseUser.objects.filter(pk__in=stale[start:start + self.batch_size]).delete()
+                stats['deleted'] += deleted
+
+        # Only advanced once every page has been written, so an interrupted sync is simply redone.
+        checkpoint.high_water = latest
+        checkpoint.save(update_fields=['high_water', 'updated_at'])
+        logger.info(f"User mirror {'full' if full else 'incremental'} sync: {stats}")
+        return stats
+
+    def apply(self, upserts: Iterable[Dict[str, Any]] = (), removals: Iterable[str] = ()) -> None:
+        """
+        Apply raw users returned by write calls, so the mirror does not wait for the next sync.
+        """
+        rows = [self.to_model(user) for user in upserts]
+        if rows:
+            self._write(rows, {'created': 0, 'updated': 0})
+        removals = list(removals)
+        if removals:
+            SupabaseUser.objects.filter(pk__in=removals).delete()
+
+    def _write(self, rows: List[SupabaseUser], stats: Dict[str, int]) -> None:
+        # A user repeated within a batch (the listing shifted between pages) is written once.
+        rows = list({row.id: row for row in rows}.values())
+        with transaction.atomic():
+            existing = SupabaseUser.objects.in_bulk([row.id for row in rows])
+            created, changed = [], []
+            for row in rows:
+                current = existing.get(row.id)
+                if current is None:
+                    created.append(row)
+                elif any(getattr(current, field) != getattr(row, field) for field in MIRRORED_FIELDS):
+                    changed.append(row)
+            if created:
+                created, raced = self._insert(created)
+                changed += raced
+            if changed:
+                now = timezone.now()
+                for row in changed:
+                    row.synced_at = now
+                SupabaseUser.objects.bulk_update(changed, MIRRORED_FIELDS + ('synced_at',),
+                                                 batch_size=self.batch_size)
+        stats['created'] += len(created)
+        stats['updated'] += len(changed)
+
+    def _insert(self, rows: List[SupabaseUser]) -> Tuple[List[SupabaseUser], List[SupabaseUser]]:
+        """
+        Insert new rows, returning those actually inserted and those another writer inserted first.
+        """
+        try:
+            with transaction.atomic():
+                SupabaseUser.objects.bulk_create(rows, batch_size=self.batch_size)
+            return rows, []
+        except IntegrityError:
+            pass
+        # A concurrent sync or write-through got there first; insert one by one and update the rest.
+        inserted, raced = [], []
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    row.save(force_insert=True)
+                inserted.append(row)
+            except IntegrityError:
+                raced.append(row)
+        return inserted, raced
@@ -1,11 +1,15 @@
 import os
-from typing import Dict, List, Any, Optional
-import requests
+from typing import Dict, Iterator, List, Any, Optional, Sequence
+import httpx
 import logging
-from django.core.cache import cache
+from django.conf import settings
 from dotenv import load_dotenv
 from ..exceptions import UserCreationError, UserUpdateError, UserDeletionError, UserNotFoundException
-from ..supabase_client import supabase
+from ..supabase_client import get_supabase
+from .http_client import get_http_client
+from .pagination import iter_pages, iter_rows
+from .user_cache import user_entity_cache, user_list_cache
+from .user_mirror import UserMirror
 
 load_dotenv()
 
@@ -21,43 +25,98 @@ class UserService:
             'apikey': self.service_role_key,
             'Authorization': f'Bearer {self.service_role_key}'
         }
+        self.http: httpx.Client = get_http_client()
 
     def get_all_users(self) -> List[Dict[str, Any]]:
         """
         Retrieve all users from cache or Supabase.
 
+        Every page of the admin listing is fetched, so tenants larger than
+        a single page are returned in full. Concurrent misses share a single
+        fetch and expired lists are served stale while they refresh. The raw
+        list is cached in ``user_list_cache``, shared with ``user_service_v1``,
+        and formatted on the way out.
+
         Returns:
             List[Dict[str, Any]]: A list of user dictionaries.
 
         Raises:
-            requests.RequestException: If there's an error fetching users from Supabase.
+            httpx.HTTPError: If there's an error fetching users from Supabase.
         """
-        cached_users = cache.get('all_users')
-        if cached_users is not None:
-            logger.info("Returning users from cache")
-            return cached_users
-
         try:
-            response = requests.get(f"{self.supabase_url}/auth/v1/admin/users", headers=self.headers)
-            response.raise_for_status()
-            users = response.json()
-            
-            if not isinstance(users, list):
-                users = users.get('users', [])
-            
-            formatted_users = [self.format_user(user) for user in users]
-            cache.set('all_users', formatted_users, 300)
-            
-            logger.info(f"Fetched {len(formatted_users)} users from Supabase and cached")
-            return formatted_users
-        except requests.RequestException as e:
+            return [self.format_user(user) for user in user_list_cache.get(self._load_all_users)]
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching all users: {str(e)}")
             raise
 
+    def _load_all_users(self) -> List[Dict[str, Any]]:
+        return list(iter_rows(self.iter_user_pages()))
+
+    def stream_users(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield all users one at a time.
+
+        Users are served from the cache when it is warm; otherwise they are
+        streamed page by page from Supabase without building the full list.
+
+        Yields:
+            Dict[str, Any]: Formatted user dictionaries.
+        """
+        cached_users = user_list_cache.peek()
+        if cached_users is not None:
+            return (self.format_user(user) for user in cached_users)
+        return self.iter_users()
+
+    def iter_users(self, per_page: Optional[int] = None, prefetch: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every user from Supabase, walking the admin listing page by page.
+
+        Args:
+            per_page (Optional[int]): Users requested per page. Defaults to ``SUPABASE_USERS_PER_PAGE``.
+            prefetch (Optional[int]): Pages fetched ahead concurrently. Defaults to ``SUPABASE_USERS_PREFETCH``.
+
+        Yields:
+            Dict[str, Any]: Formatted user dictionaries.
+
+        Raises:
+            httpx.HTTPError: If there's an error fetching a page from Supabase.
+        """
+        for user in iter_rows(self.iter_user_pages(per_page, prefetch)):
+            yield self.format_user(user)
+
+    def iter_user_pages(self, per_page: Optional[int] = None, prefetch: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield raw pages of users from the Supabase admin listing.
+
+        Args:
+            per_page (Optional[int]): Users requested per page. Defaults to ``SUPABASE_USERS_PER_PAGE``.
+            prefetch (Optional[int]): Pages fetched ahead concurrently. Defaults to ``SUPABASE_USERS_PREFETCH``.
+
+        Yields:
+            List[Dict[str, Any]]: The raw users of each page.
+        """
+        return iter_pages(
+            self._fetch_users_page,
+            per_page or settings.SUPABASE_USERS_PER_PAGE,
+            settings.SUPABASE_USERS_PREFETCH if prefetch is None else prefetch,
+        )
+
+    def _fetch_users_page(self, page: int, per_page: int) -> List[Dict[str, Any]]:
+        response = self.http.get(f"{self.supabase_url}/auth/v1/admin/users", headers=self.headers,
+                                 params={'page': page, 'per_page': per_page})
+        response.raise_for_status()
+        users = response.json()
+        if not isinstance(users, list):
+            users = users.get('users', [])
+        return users
+
     def get_user_by_id(self, user_id: str) -> Dict[str, Any]:
         """
         Retrieve a user by their ID.
 
+        Served from the per-user cache or the user directory when possible;
+        only a miss goes to Supabase.
+
         Args:
             user_id (str): The ID of the user to retrieve.
 
@@ -66,16 +125,20 @@ class UserService:
 
         Raises:
             UserNotFoundException: If the user is not found.
-            requests.RequestException: If there's an error fetching the user from Supabase.
+            httpx.HTTPError: If there's an error fetching the user from Supabase.
         """
+        user = user_entity_cache.get(user_id)
+        if user is not None:
+            return user
         try:
-            response = requests.get(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", headers=self.headers)
+            response = self.http.get(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", headers=self.headers)
             if response.status_code == 404:
                 raise UserNotFoundException(f"User with ID {user_id} not found.")
             response.raise_for_status()
-            user_data = response.json()
-            return self.format_user(user_data)
-        except requests.RequestException as e:
+            user = self.format_user(response.json())
+            user_entity_cache.put(user)
+            return user
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching user {user_id}: {str(e)}")
             raise
 
@@ -93,7 +156,7 @@ class UserService:
             UserCreationError: If there's an error creating the user.
         """
         try:
-            response = supabase.auth.sign_up({
+            response = get_supabase().auth.sign_up({
                 "email": user_data['email'],
                 "password": user_data['password'],
                 "options": {
@@ -108,8 +171,10 @@ class UserService:
             if response.user is None:
                 raise UserCreationError(f"Failed to create user with email {user_data['email']}")
             
-            self.invalidate_user_cache()
-            return self.format_user(response.user)
+            raw_user = response.user.model_dump(mode='json')
+            user = self.format_user(raw_user)
+            self._written(upserts=[raw_user])
+            return user
         except Exception as e:
             if "User already registered" in str(e):
                 raise UserCreationError(f"User with email {user_data['email']} already exists.")
@@ -130,14 +195,16 @@ class UserService:
             UserUpdateError: If there's an error updating the user.
         """
         try:
-            response = requests.put(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", 
-                                    headers=self.headers, json=updated_data)
+            response = self.http.put(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", 
+                                     headers=self.headers, json=updated_data)
             if response.status_code == 404:
                 raise UserUpdateError(f"User with ID {user_id} not found.")
             response.raise_for_status()
-            self.invalidate_user_cache()
-            return self.format_user(response.json())
-        except requests.RequestException as e:
+            raw_user = response.json()
+            user = self.format_user(raw_user)
+            self._written(upserts=[raw_user])
+            return user
+        except httpx.HTTPError as e:
             raise UserUpdateError(f"Error updating user {user_id}: {str(e)}")
 
     def delete_user(self, user_id: str) -> bool:
@@ -154,18 +221,29 @@ class UserService:
             UserDeletionError: If there's an error deleting the user.
         """
         try:
-            response = requests.delete(
+            response = self.http.delete(
                 f"{self.supabase_url}/auth/v1/admin/users/{user_id}",
                 headers=self.headers
             )
             if response.status_code == 404:
                 raise UserDeletionError(f"User with ID {user_id} not found.")
             response.raise_for_status()
-            self.invalidate_user_cache()
+            self._written(removals=[user_id])
             return True
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise UserDeletionError(f"Error deleting user {user_id}: {str(e)}")
 
+    def _written(self, upserts: Sequence[Dict[str, Any]] = (), removals: Sequence[str] = ()) -> None:
+        # Same write-through as user_service_v1: patch the shared raw list, the
+        # per-user cache and (if enabled) the local mirror from the write response.
+        user_list_cache.apply(upserts=upserts, removals=removals)
+        for user in upserts:
+            user_entity_cache.put(self.format_user(user))
+        for user_id in removals:
+            user_entity_cache.discard(user_id)
+        if settings.USERS_LOCAL_MIRROR:
+            UserMirror(self).apply(upserts, removals)
+
     def refresh_user_cache(self) -> None:
         """
         Refresh the user cache by fetching all users from Supabase and updating the cache.
@@ -173,7 +251,7 @@ class UserService:
         try:
             self.get_all_users()  # This method already handles caching
             logger.info("User cache refreshed")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error refreshing user cache: {str(e)}")
             raise
 
@@ -202,5 +280,5 @@ class UserService:
         """
         Invalidate the user cache.
         """
-        cache.delete('all_users')
+        user_list_cache.invalidate()
         logger.info("User cache invalidated")
\ No newline at end of file
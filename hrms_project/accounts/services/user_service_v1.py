@@ -1,13 +1,18 @@
 import os
-import requests
+import httpx
 import logging
-from django.core.cache import cache
+from django.conf import settings
 from dotenv import load_dotenv
 from ..utils.decorators import admin_required
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
-from ..exceptions import UserCreationError, UserUpdateError, UserDeletionError
-from ..supabase_client import supabase
+from ..exceptions import UserCreationError, UserAlreadyExistsError, UserUpdateError, UserDeletionError
+from ..supabase_client import get_supabase
+from .http_client import get_http_client
+from .pagination import iter_pages, iter_rows
+from .user_cache import user_entity_cache, user_list_cache
+from .user_mirror import UserMirror
+from .user_directory import get_directory
 
 
 # Load environment variables
@@ -25,42 +30,70 @@ class UserService:
             'apikey': self.service_role_key,
             'Authorization': f'Bearer {self.service_role_key}'
         }
+        self.http = get_http_client()
 
     def get_all_users(self):
-        cached_users = cache.get('all_users')
-        if cached_users is not None:
-            logger.info("Returning users from cache")
-            return cached_users
-
         try:
-            response = requests.get(f"{self.supabase_url}/auth/v1/admin/users", headers=self.headers)
-            response.raise_for_status()
-            users = response.json()
-            
-            if not isinstance(users, list):
-                users = users.get('users', [])
-            
-            cache.set('all_users', users, 300)
-            
-            logger.info(f"Fetched {len(users)} users from Supabase and cached")
-            return users
-        except requests.RequestException as e:
+            return user_list_cache.get(self._load_all_users)
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching all users: {str(e)}")
             raise
 
+    def _load_all_users(self):
+        return list(self.iter_users())
+
+    def get_directory(self):
+        """Return the search index over formatted users, synced to the cached user list."""
+        return get_directory(user_list_cache.version(), self._load_users_with_version, self.format_user,
+                             user_list_cache.changes_since)
+
+    def _load_users_with_version(self):
+        users = self.get_all_users()
+        return users, user_list_cache.version()
+
+    def stream_users(self):
+        """Yield users from the cache if warm, otherwise stream them page by page."""
+        cached_users = user_list_cache.peek()
+        if cached_users is not None:
+            return iter(cached_users)
+        return self.iter_users()
+
+    def iter_users(self, per_page=None, prefetch=None):
+        return iter_rows(self.iter_user_pages(per_page, prefetch))
+
+    def iter_user_pages(self, per_page=None, prefetch=None):
+        return iter_pages(
+            self._fetch_users_page,
+            per_page or settings.SUPABASE_USERS_PER_PAGE,
+            settings.SUPABASE_USERS_PREFETCH if prefetch is None else prefetch,
+        )
+
+    def _fetch_users_page(self, page, per_page):
+        response = self.http.get(f"{self.supabase_url}/auth/v1/admin/users", headers=self.headers,
+                                 params={'page': page, 'per_page': per_page})
+        response.raise_for_status()
+        users = response.json()
+        if not isinstance(users, list):
+            users = users.get('users', [])
+        return users
+
     def get_user_by_id(self, user_id):
+        user = user_entity_cache.get(user_id)
+        if user is not None:
+            return user
         try:
-            response = requests.get(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", headers=self.headers)
+            response = self.http.get(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", headers=self.headers)
             response.raise_for_status()
-            user_data = response.json()
-            return self.format_user(user_data)
-        except requests.RequestException as e:
+            user = self.format_user(response.json())
+            user_entity_cache.put(user)
+            return user
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching user {user_id}: {str(e)}")
             raise
 
     def create_user(self, user_data):
         try:
-            response = supabase.auth.sign_up({
+            response = get_supabase().auth.sign_up({
                 "email": user_data['email'],
                 "password": user_data['password'],
                 "options": {
@@ -75,36 +108,65 @@ class UserService:
             if response.user is None:
                 raise UserCreationError(f"Failed to create user with email {user_data['email']}")
             
-            self.invalidate_user_cache()
+            user_data = response.user.model_dump(mode='json')
+            user_list_cache.apply(upserts=[user_data])
+            user_entity_cache.put(self.format_user(user_data))
+            self.mirror_write(upserts=[user_data])
             return response.user
         except Exception as e:
             if "User already registered" in str(e):
                 raise UserCreationError(f"User with email {user_data['email']} already exists.")
             raise UserCreationError(f"Error creating user: {str(e)}")
+
+    def admin_create_user(self, user_data, update_cache=True):
+        # Creates the account through the admin API (no sign-up email or rate limit).
+        # Bulk callers pass update_cache=False and patch the caches once at the end.
+        try:
+            response = self.http.post(f"{self.supabase_url}/auth/v1/admin/users",
+                                      headers=self.headers, json=user_data)
+            if response.status_code == 422 and 'already' in response.text:
+                raise UserAlreadyExistsError(f"User with email {user_data['email']} already exists.")
+            response.raise_for_status()
+            user = response.json()
+        except httpx.HTTPError as e:
+            raise UserCreationError(f"Error creating user {user_data['email']}: {str(e)}")
+        if update_cache:
+            user_list_cache.apply(upserts=[user])
+            user_entity_cache.put(self.format_user(user))
+            self.mirror_write(upserts=[user])
+        return user
         
 
     def update_user(self, user_id, updated_data):
         try:
-            response = requests.put(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", 
-                                    headers=self.headers, json=updated_data)
+            response = self.http.put(f"{self.supabase_url}/auth/v1/admin/users/{user_id}", 
+                                     headers=self.headers, json=updated_data)
             response.raise_for_status()
-            self.invalidate_user_cache()
-            return self.format_user(response.json())
-        except requests.RequestException as e:
+            user_data = response.json()
+            user_list_cache.apply(upserts=[user_data])
+            user = self.format_user(user_data)
+            user_entity_cache.put(user)
+            self.mirror_write(upserts=[user_data])
+            return user
+        except httpx.HTTPError as e:
             raise UserUpdateError(f"Error updating user {user_id}: {str(e)}")
 
-    def delete_user(self, user_id):
+    def delete_user(self, user_id, update_cache=True):
+        # With update_cache=False the caller patches the caches (see services.user_batch).
         try:
-            response = requests.delete(
+            response = self.http.delete(
                 f"{self.supabase_url}/auth/v1/admin/users/{user_id}",
                 headers=self.headers
             )
             if response.status_code == 404:
                 raise UserDeletionError(f"User with ID {user_id} not found.")
             response.raise_for_status()
-            self.invalidate_user_cache()
+            if update_cache:
+                user_list_cache.apply(removals=[user_id])
+                user_entity_cache.discard(user_id)
+                self.mirror_write(removals=[user_id])
             return True
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise UserDeletionError(f"Error deleting user {user_id}: {str(e)}")
         
     def update_current_user(self, user_id, updated_data):
@@ -113,22 +175,35 @@ class UserService:
                 'apikey': self.service_role_key,
                 'Authorization': f'Bearer {updated_data.get("access_token")}'
             }
-            response = requests.put(f"{self.supabase_url}/auth/v1/user", 
-                                    headers=user_headers, json=updated_data)
+            response = self.http.put(f"{self.supabase_url}/auth/v1/user", 
+                                     headers=user_headers, json=updated_data)
             response.raise_for_status()
-            self.invalidate_user_cache()
+            user_data = response.json()
+            user_list_cache.apply(upserts=[user_data])
+            user_entity_cache.put(self.format_user(user_data))
+            self.mirror_write(upserts=[user_data])
             logger.info(f"Current user updated: {user_id}")
-            return response.json()
-        except requests.RequestException as e:
+            return user_data
+        except httpx.HTTPError as e:
             logger.error(f"Error updating current user {user_id}: {str(e)}")
             raise
 
+    def mirror_write(self, upserts=(), removals=()):
+        # Keep the local SupabaseUser table current between sync_users runs.
+        if settings.USERS_LOCAL_MIRROR:
+            UserMirror(self).apply(upserts, removals)
+
     def format_user(self, user):
         if isinstance(user, str):
-            user_data = self.get_user_by_id(user)
-        else:
-            user_data = user
+            # get_user_by_id already returns the formatted (and cached) user.
+            return self.get_user_by_id(user)
+        return self.format_user_data(user)
 
+    @staticmethod
+    def format_user_data(user_data):
+        """
+        Build the formatted user shape shared by the sync and async services.
+        """
         return {
             'id': user_data.get('id'),
             'email': user_data.get('email'),
@@ -141,5 +216,5 @@ class UserService:
         }
 
     def invalidate_user_cache(self):
-        cache.delete('all_users')
+        user_list_cache.invalidate()
         logger.info("User cache invalidated")
\ No newline at end of file
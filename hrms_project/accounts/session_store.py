@@ -0,0 +1,104 @@
+"""
+Cached, database-backed sessions tuned for this project.
+
+Used via ``SESSION_ENGINE = 'accounts.session_store'``. Reads are served from
+``SESSION_CACHE_ALIAS`` and fall back to the database on a miss or when the
+cache is unavailable; writes go to both.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.base import VALID_KEY_CHARS
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'accounts.session.'
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        if isinstance(self._cache, LocMemCache):
+            # A per-process cache would keep serving a session another worker
+            # has changed or flushed (e.g. on logout), so use the database only.
+            self._cache = DummyCache('', {})
+
+    def _get_new_session_key(self):
+        # save(must_create=True) already rejects a colliding key and create()
+        # retries, so skip the cache/DB lookup per candidate key.
+        return get_random_string(32, VALID_KEY_CHARS)
+
+    async def _aget_new_session_key(self):
+        return get_random_string(32, VALID_KEY_CHARS)
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            data = None
+        if data is not None:
+            return data
+
+        s = self._get_session_from_db()
+        if not s:
+            return {}
+        data = self.decode(s.session_data)
+        try:
+            self._cache.set(self.cache_key, data, self.get_expiry_age(expiry=s.expire_date))
+        except Exception:
+            logger.warning("Session cache unavailable; serving sessions from the database")
+        return data
+
+    async def aload(self):
+        try:
+            data = await self._cache.aget(await self.acache_key())
+        except Exception:
+            data = None
+        if data is not None:
+            return data
+
+        s = await self._aget_session_from_db()
+        if not s:
+            return {}
+        data = self.decode(s.session_data)
+        try:
+            await self._cache.aset(await self.acache_key(), data,
+                                   await self.aget_expiry_age(expiry=s.expire_date))
+        except Exception:
+            logger.warning("Session cache unavailable; serving sessions from the database")
+        return data
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        DBStore.delete(self, session_key)
+        try:
+            self._cache.delete(self.cache_key_prefix + session_key)
+        except Exception:
+            # A cache that cannot delete is normally failing reads too, which then fall back to the database.
+            logger.exception("Error deleting session from cache (%s)", self._cache)
+
+    @classmethod
+    def clear_expired(cls, batch_size=None):
+        """
+        Delete expired rows in batches so a large purge never holds one long write lock.
+
+        Returns the number of rows deleted. Cached copies expire on their own.
+        """
+        batch_size = batch_size or settings.SESSION_PURGE_BATCH_SIZE
+        model = cls.get_model_class()
+        deleted = 0
+        while True:
+            keys = list(model.objects.filter(expire_date__lt=timezone.now())
+                        .values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
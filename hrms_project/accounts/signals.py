@@ -0,0 +1,29 @@
+from django.core.signals import request_started
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import KYCApplication, LeaveRequest
+from .services.kyc_metrics import KYCMetrics
+from .services.leave_rollup import LeaveRollups
+from .supabase_client import health_probe
+
+
+@receiver(post_delete, sender=KYCApplication)
+def kyc_application_deleted(sender, instance: KYCApplication, **kwargs) -> None:
+    # Sent for admin deletes and Employee cascades alike, inside the deleting transaction.
+    KYCMetrics().record_deletion(instance)
+
+
+@receiver(post_delete, sender=LeaveRequest)
+def leave_request_deleted(sender, instance: LeaveRequest, **kwargs) -> None:
+    # Approved leave is counted in the report rollups; take it out when the request
+    # goes, including through an Employee cascade.
+    if instance.status == LeaveRequest.STATUS_APPROVED:
+        LeaveRollups().reverse(instance)
+
+
+@receiver(request_started)
+def start_health_probe(sender, **kwargs) -> None:
+    # Started by the first request each process serves, so workers forked
+    # after a preloaded import (gunicorn --preload) run their own probe.
+    health_probe.ensure_started()
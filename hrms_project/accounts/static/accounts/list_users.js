@@ -1,15 +1,20 @@
+const USERS_API_URL = '/accounts/users/api/users/';
+const USER_FIELDS = 'email,is_admin,first_name,last_name,created_at,last_sign_in_at,email_confirmed';
+
+function appendUserRows(tbody, users) {
+    users.forEach(user => {
+        const row = tbody.insertRow();
+        row.insertCell(0).textContent = user.email;
+        row.insertCell(1).textContent = user.is_admin ? 'Yes' : 'No';
+        row.insertCell(2).textContent = `${user.first_name} ${user.last_name}`.trim() || 'N/A';
+        row.insertCell(3).textContent = new Date(user.created_at).toLocaleDateString();
+        row.insertCell(4).textContent = user.last_sign_in_at ? new Date(user.last_sign_in_at).toLocaleDateString() : 'Never';
+        row.insertCell(5).textContent = user.email_confirmed ? 'Yes' : 'No';
+    });
+}
+
 async function listUsers() {
     try {
-        const response = await fetch('/accounts/api/proxy-supabase/', {
-            method: 'POST',
-            headers: {
-                'X-CSRFToken': getCookie('csrftoken')
-            }
-        });
-        if (!response.ok) {
-            throw new Error('Failed to fetch users');
-        }
-        const data = await response.json();
         const userListContainer = document.getElementById('user-list');
         userListContainer.innerHTML = ''; // Clear existing content
         
@@ -26,20 +31,27 @@ async function listUsers() {
             th.textContent = text;
             headerRow.appendChild(th);
         });
-        
-        // Add table body
         const tbody = table.createTBody();
-        data.users.forEach(user => {
-            const row = tbody.insertRow();
-            row.insertCell(0).textContent = user.email;
-            row.insertCell(1).textContent = user.is_admin ? 'Yes' : 'No';
-            row.insertCell(2).textContent = `${user.first_name} ${user.last_name}`.trim() || 'N/A';
-            row.insertCell(3).textContent = new Date(user.created_at).toLocaleDateString();
-            row.insertCell(4).textContent = user.last_sign_in_at ? new Date(user.last_sign_in_at).toLocaleDateString() : 'Never';
-            row.insertCell(5).textContent = user.email_confirmed ? 'Yes' : 'No';
-        });
-        
         userListContainer.appendChild(table);
+
+        // Walk the cursor-paginated API; unchanged pages revalidate against the
+        // browser cache via ETag and come back as 304 without a body.
+        let cursor = null;
+        do {
+            const params = new URLSearchParams({fields: USER_FIELDS, limit: '200'});
+            if (cursor) {
+                params.set('cursor', cursor);
+            }
+            const response = await fetch(`${USERS_API_URL}?${params}`, {
+                headers: {'Accept': 'application/json'}
+            });
+            if (!response.ok) {
+                throw new Error('Failed to fetch users');
+            }
+            const data = await response.json();
+            appendUserRows(tbody, data.users);
+            cursor = data.next_cursor;
+        } while (cursor);
     } catch (error) {
         console.error('Error fetching users:', error);
         const userListContainer = document.getElementById('user-list');
@@ -1,5 +1,9 @@
 import os
+import threading
+import time
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
+from django.conf import settings
 from supabase import create_client, Client
 import logging
 
@@ -8,30 +12,133 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize Supabase client
-SUPABASE_URL: str = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY: str = os.environ.get("SUPABASE_KEY")
+_clients: Dict[int, Client] = {}
+_lock = threading.Lock()
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    logger.error("SUPABASE_URL or SUPABASE_KEY environment variables are not set")
-    raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+def _credentials():
+    supabase_url: Optional[str] = os.environ.get("SUPABASE_URL")
+    supabase_key: Optional[str] = os.environ.get("SUPABASE_KEY")
+    if not supabase_url or not supabase_key:
+        logger.error("SUPABASE_URL or SUPABASE_KEY environment variables are not set")
+        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
+    return supabase_url, supabase_key
+
+
+def get_supabase() -> Client:
+    """
+    Return the Supabase client for the current process, creating it on first use.
+
+    Nothing is built or contacted at import time, so management commands and
+    worker boot never wait on the network. The client is keyed by PID so
+    forked workers each build their own.
+    """
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(pid)
+        if client is None:
+            client = create_client(*_credentials())
+            _clients[pid] = client
+    health_probe.ensure_started()
+    return client
+
 
 def check_supabase_connection() -> bool:
     """
     Check if the connection to Supabase is working.
     Returns True if connected, False otherwise.
     """
+    # Imported here to keep this module free of service-layer imports at load time.
+    from .services.http_client import get_http_client
+
     try:
-        # Attempt to fetch a single user to test the connection
-        supabase.auth.admin.list_users(page=1, per_page=1)
+        supabase_url, supabase_key = _credentials()
+        response = get_http_client().get(f"{supabase_url}/auth/v1/health", headers={'apikey': supabase_key})
+        response.raise_for_status()
         logger.info("Successfully connected to Supabase")
         return True
     except Exception as e:
         logger.error(f"Failed to connect to Supabase: {str(e)}")
         return False
 
-# Check connection on startup
-if not check_supabase_connection():
-    logger.warning("Failed to establish initial connection to Supabase")
\ No newline at end of file
+
+class SupabaseHealthProbe:
+    """
+    Periodically checks Supabase reachability on a daemon thread.
+
+    Request handling never waits for the probe; callers read the outcome of
+    the most recent check through :meth:`status`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._status: Dict[str, Any] = {'healthy': None, 'checked_at': None, 'latency_ms': None}
+
+    @property
+    def interval(self) -> float:
+        return settings.SUPABASE_HEALTH_PROBE_INTERVAL
+
+    def ensure_started(self) -> None:
+        """
+        Start the probe thread for this process if it is enabled and not yet running.
+        """
+        if self.interval <= 0 or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked from a process that was probing: its thread and results stay behind.
+                self._status = {'healthy': None, 'checked_at': None, 'latency_ms': None}
+            self._pid = os.getpid()
+            self._stop.clear()
+            threading.Thread(target=self._run, name='supabase-health-probe', daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._pid = None
+
+    def probe(self) -> Dict[str, Any]:
+        """
+        Run one health check now and record its result.
+        """
+        started = time.monotonic()
+        healthy = check_supabase_connection()
+        status = {
+            'healthy': healthy,
+            'checked_at': time.time(),
+            'latency_ms': round((time.monotonic() - started) * 1000, 1),
+        }
+        with self._lock:
+            if self._status['healthy'] and not healthy:
+                logger.warning("Supabase health probe started failing")
+            self._status = status
+        return status
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Return the result of the last check; ``healthy`` is None until the first check completes.
+        """
+        with self._lock:
+            return dict(self._status)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+
+health_probe = SupabaseHealthProbe()
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatibility for ``from .supabase_client import supabase``.
+    if name == 'supabase':
+        return get_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,64 @@
+import datetime
+import os
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..benchmarks.fake_gotrue import FAKE_PASSWORD, FakeGoTrue
+from ..models import Employee, LeaveLedgerEntry
+
+
+def make_employee(code, department=None):
+    return Employee.objects.create(employee_code=code, first_name='Test', last_name=code, email=f'{code}@example.com',
+                                   department=department, join_date=datetime.date(2020, 1, 1))
+
+
+def accrue(employee, leave_type, days):
+    return LeaveLedgerEntry.objects.create(employee=employee, leave_type=leave_type, kind=LeaveLedgerEntry.KIND_ACCRUAL,
+                                           days=Decimal(days), entry_date=datetime.date(2024, 1, 1))
+
+
+# Services read SUPABASE_* from the environment; everything else a test needs is a setting.
+TEST_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'hrms-tests'}},
+    'RATE_LIMITS': {},
+    'SUPABASE_HEALTH_PROBE_INTERVAL': 0,
+    'SUPABASE_JWT_SECRET': '',
+    'USERS_LOCAL_MIRROR': False,
+    'SUPABASE_USERS_PER_PAGE': 10,
+    'SUPABASE_USERS_PREFETCH': 2,
+}
+
+
+@override_settings(**TEST_SETTINGS)
+class SupabaseTestCase(TestCase):
+    """
+    TestCase whose Supabase calls go to a :class:`FakeGoTrue` holding ``USERS`` users.
+
+    The fake's users and the cache are reset before every test; user 0 is an admin.
+    """
+
+    USERS = 25
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.fake = FakeGoTrue(users=cls.USERS).start()
+        cls.addClassCleanup(cls.fake.stop)
+        environ = mock.patch.dict(os.environ, {'SUPABASE_URL': cls.fake.url, 'SUPABASE_KEY': 'test-service-role-key'})
+        environ.start()
+        cls.addClassCleanup(environ.stop)
+
+    def setUp(self):
+        self.fake.reset(self.USERS)
+        cache.clear()
+
+    def login(self, index: int = 0) -> Client:
+        client = Client()
+        response = client.post(reverse('accounts:login'), {'email': f'user{index}@example.com',
+                                                           'password': FAKE_PASSWORD})
+        self.assertEqual(response.status_code, 302)
+        return client
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+from django.test import SimpleTestCase
+
+from ..benchmarks.fake_gotrue import fake_user
+from ..services.async_user_service import AsyncUserService
+from ..services.pagination import aiter_pages
+from ..services.user_service_v1 import UserService
+from .helpers import SupabaseTestCase
+
+
+class AsyncListing:
+    """Async page fetcher over ``total`` rows that records requested and cancelled pages."""
+
+    def __init__(self, total, fail_on=None, delay=0):
+        self.total = total
+        self.fail_on = fail_on
+        self.delay = delay
+        self.requested = []
+        self.cancelled = []
+
+    def __call__(self, page, per_page):
+        # Recorded when the request is issued, even if its task never gets to run.
+        self.requested.append(page)
+        return self._fetch(page, per_page)
+
+    async def _fetch(self, page, per_page):
+        try:
+            await asyncio.sleep(self.delay * page)
+        except asyncio.CancelledError:
+            self.cancelled.append(page)
+            raise
+        if page == self.fail_on:
+            raise httpx.ConnectError(f"page {page} failed")
+        return list(range((page - 1) * per_page, min(page * per_page, self.total)))
+
+
+async def _collect(pages):
+    return [page async for page in pages]
+
+
+class AiterPagesTests(SimpleTestCase):
+    def test_walks_every_page_in_order(self):
+        for prefetch in (0, 1, 3):
+            with self.subTest(prefetch=prefetch):
+                pages = asyncio.run(_collect(aiter_pages(AsyncListing(47), 10, prefetch)))
+                self.assertEqual([row for page in pages for row in page], list(range(47)))
+
+    def test_no_page_after_a_known_short_page(self):
+        async def run():
+            listing = AsyncListing(15)
+            pages = aiter_pages(listing, 10, 2)
+            self.assertEqual(len(await pages.__anext__()), 10)
+            await asyncio.sleep(0)  # page 2 finishes before the queue is next topped up
+            self.assertEqual(len(await pages.__anext__()), 5)
+            self.assertEqual(await _collect(pages), [])
+            return listing
+
+        self.assertEqual(sorted(asyncio.run(run()).requested), [1, 2, 3])
+
+    def test_cancelled_prefetches_are_awaited(self):
+        async def run():
+            listing = AsyncListing(100, delay=0.01)
+            pages = aiter_pages(listing, 10, 3)
+            await pages.__anext__()
+            await pages.aclose()
+            leftovers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            return listing, leftovers
+
+        listing, leftovers = asyncio.run(run())
+        self.assertEqual(leftovers, [])
+        self.assertEqual(sorted(listing.cancelled), [2, 3, 4])
+
+    def test_failed_page_raises(self):
+        async def run():
+            return await _collect(aiter_pages(AsyncListing(100, fail_on=2), 10, 2))
+
+        with self.assertRaises(httpx.ConnectError):
+            asyncio.run(run())
+
+
+class AsyncUserServiceTests(SupabaseTestCase):
+    USERS = 23
+
+    async def test_get_all_users_matches_the_sync_service(self):
+        users = await AsyncUserService().get_all_users()
+        self.assertEqual([user['id'] for user in users],
+                         [fake_user(index)['id'] for index in range(self.USERS)])
+
+    async def test_format_user_matches_the_sync_formatter(self):
+        raw = fake_user(0, is_admin=True)
+        self.assertEqual(AsyncUserService().format_user(raw), UserService.format_user_data(raw))
+
+    async def test_update_is_visible_to_the_sync_service(self):
+        user_id = fake_user(3)['id']
+        service = AsyncUserService()
+        await service.get_all_users()
+        await service.update_user(user_id, {'user_metadata': {'first_name': 'Async'}})
+        cached = {user['id']: user for user in await service.get_all_users()}
+        self.assertEqual(cached[user_id]['user_metadata']['first_name'], 'Async')
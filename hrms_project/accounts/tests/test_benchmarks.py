@@ -0,0 +1,64 @@
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from ..benchmarks.fake_gotrue import FAKE_PASSWORD, FakeGoTrue, fake_user
+from ..benchmarks.suite import BenchmarkSuite, compare, summarise
+from .helpers import SupabaseTestCase
+
+
+class SummaryTests(SimpleTestCase):
+    def test_summarise_reports_milliseconds_and_median_throughput(self):
+        summary = summarise([0.004, 0.001, 0.002, 0.003], ops=10)
+        self.assertEqual((summary['samples'], summary['min_ms'], summary['max_ms']), (4, 1.0, 4.0))
+        self.assertEqual((summary['median_ms'], summary['mean_ms']), (2.5, 2.5))
+        self.assertEqual(summary['ops_per_sec'], 4000.0)
+        self.assertEqual(summarise([0.002])['stdev_ms'], 0.0)
+
+    def test_compare_pairs_results_by_name_and_size(self):
+        current = {'results': [{'name': 'login_view', 'users': 100, 'median_ms': 3.0},
+                               {'name': 'login_view', 'users': 1000, 'median_ms': 5.0},
+                               {'name': 'format_user', 'users': 100, 'median_ms': 1.0}]}
+        baseline = {'results': [{'name': 'login_view', 'users': 100, 'median_ms': 2.0},
+                                {'name': 'format_user', 'users': 100, 'median_ms': 0.0}]}
+        self.assertEqual(compare(current, baseline), [
+            {'name': 'login_view', 'users': 100, 'baseline_ms': 2.0, 'median_ms': 3.0, 'change_pct': 50.0}])
+
+    def test_measure_skips_warmup_and_runs_setup_untimed(self):
+        calls = []
+        suite = BenchmarkSuite(repeat=3, warmup=2, progress=calls.append)
+        result = suite.measure('noop', 10, lambda: calls.append('sample'), setup=lambda: calls.append('setup'))
+        self.assertEqual(result['samples'], 3)
+        self.assertEqual(calls[:-1], ['setup', 'sample'] * 5)
+        self.assertEqual(calls[-1], result)
+        self.assertEqual(suite.results, [result])
+
+
+class FakeGoTrueTests(SimpleTestCase):
+    def test_pages_users_and_checks_passwords(self):
+        fake = FakeGoTrue(users=5)
+        status, payload = fake.handle('GET', '/auth/v1/admin/users', {'page': ['2'], 'per_page': ['2']}, {})
+        self.assertEqual((status, [user['email'] for user in payload['users']]),
+                         (200, ['user2@example.com', 'user3@example.com']))
+        self.assertEqual(fake.handle('GET', f"/auth/v1/admin/users/{fake_user(4)['id']}", {}, {})[0], 200)
+
+        login = {'email': 'USER1@example.com', 'password': FAKE_PASSWORD}
+        status, token = fake.handle('POST', '/auth/v1/token', {'grant_type': ['password']}, login)
+        self.assertEqual((status, token['user']['id']), (200, fake_user(1)['id']))
+        status, _ = fake.handle('POST', '/auth/v1/token', {'grant_type': ['password']}, dict(login, password='x'))
+        self.assertEqual(status, 400)
+
+
+class BenchmarkRunTests(SupabaseTestCase):
+    def test_every_benchmark_runs_against_the_fake(self):
+        suite = BenchmarkSuite([self.USERS], repeat=1, warmup=0)
+        suite.admin = self.login()
+        for bench in suite.benchmarks.values():
+            bench(self.USERS)
+        self.assertEqual([result['name'] for result in suite.results], list(suite.benchmarks))
+        self.assertTrue(all(result['samples'] == 1 for result in suite.results))
+
+    def test_command_rejects_bad_arguments(self):
+        with self.assertRaises(CommandError):
+            call_command('run_benchmarks', sizes='10,many')
+        with self.assertRaises(CommandError):
+            call_command('run_benchmarks', only=['nope'])
@@ -0,0 +1,32 @@
+import os
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from ..checks import check_shared_cache
+
+
+def cache_settings(backend):
+    return {'default': {'BACKEND': f'django.core.cache.backends.{backend}'}}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES=cache_settings('redis.RedisCache'))
+    def test_redis_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    def test_other_backends_warn(self):
+        for backend, wording in (('locmem.LocMemCache', 'single process'),
+                                 ('filebased.FileBasedCache', 'not atomic'),
+                                 ('db.DatabaseCache', 'not atomic')):
+            with self.subTest(backend=backend), override_settings(CACHES=cache_settings(backend)):
+                [warning] = check_shared_cache(None)
+                self.assertEqual(warning.id, 'accounts.W001')
+                self.assertIn(wording, warning.msg)
+
+    def test_default_backend_is_shared_between_workers(self):
+        if os.getenv('CACHE_BACKEND') or os.getenv('REDIS_URL'):
+            self.skipTest("cache backend chosen by the environment")
+        self.assertEqual(settings.CACHE_BACKEND, 'file')
+        self.assertIn(settings.CACHES['default']['BACKEND'], (
+            'django.core.cache.backends.filebased.FileBasedCache',))
@@ -0,0 +1,97 @@
+import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..forms.employee_forms import EmployeeForm
+from ..models import Department, Employee
+from ..views import employee_views
+from .helpers import SupabaseTestCase, make_employee
+
+
+class EmployeeListTests(SupabaseTestCase):
+    USERS = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.sales = Department.objects.create(name='Sales')
+        start = datetime.date(2020, 1, 1)
+        # Pairs share a join date so the id tie-break is exercised across page boundaries.
+        Employee.objects.bulk_create(
+            Employee(employee_code=f'E{index:03}', first_name='Emp', last_name=str(index),
+                     email=f'e{index}@example.com', join_date=start + datetime.timedelta(days=index // 2),
+                     department=cls.sales if index % 3 == 0 else None,
+                     status=Employee.STATUS_ON_LEAVE if index % 5 == 0 else Employee.STATUS_ACTIVE)
+            for index in range(23))
+
+    def walk(self, client, **params):
+        codes, cursor = [], None
+        while True:
+            query = dict(params, **({'cursor': cursor} if cursor else {}))
+            response = client.get(reverse('accounts:list_employees'), query)
+            codes += [employee.employee_code for employee in response.context['employees']]
+            cursor = response.context['next_cursor']
+            if not cursor:
+                return codes
+
+    def test_cursor_pages_cover_every_employee_once_in_order(self):
+        client = self.login()
+        employee_views.EMPLOYEE_PAGE_SIZE, size = 5, employee_views.EMPLOYEE_PAGE_SIZE
+        self.addCleanup(setattr, employee_views, 'EMPLOYEE_PAGE_SIZE', size)
+        expected = list(Employee.objects.order_by('-join_date', '-id').values_list('employee_code', flat=True))
+        self.assertEqual(self.walk(client), expected)
+        self.assertEqual(self.walk(client, department=self.sales.pk),
+                         [code for code in expected if int(code[1:]) % 3 == 0])
+        self.assertEqual(len(self.walk(client, status=Employee.STATUS_ON_LEAVE)), 5)
+
+    def test_page_runs_no_count_query(self):
+        client = self.login()
+        with CaptureQueriesContext(connection) as queries:
+            client.get(reverse('accounts:list_employees'))
+        employee_queries = [query['sql'] for query in queries.captured_queries
+                            if 'FROM "accounts_employee"' in query['sql']]
+        self.assertEqual(len(employee_queries), 1)
+        self.assertNotIn('COUNT(', employee_queries[0])
+        self.assertNotIn('OFFSET', employee_queries[0])
+
+    def test_bad_cursor_falls_back_to_the_first_page(self):
+        response = self.login().get(reverse('accounts:list_employees'), {'cursor': 'garbage'})
+        self.assertTrue(response.context['is_first_page'])
+        self.assertEqual(len(response.context['employees']), 23)
+
+
+class EmployeeFormTests(SupabaseTestCase):
+    USERS = 1
+
+    def data(self, **changes):
+        return dict({'employee_code': 'NEW1', 'first_name': 'New', 'last_name': 'Hire', 'email': 'new@example.com',
+                     'status': Employee.STATUS_ACTIVE, 'join_date': '2024-02-01'}, **changes)
+
+    def test_manager_is_entered_by_code(self):
+        boss = make_employee('BOSS')
+        form = EmployeeForm(self.data(manager='BOSS'))
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save().manager, boss)
+
+        form = EmployeeForm(self.data(employee_code='NEW2', manager='NOPE'))
+        self.assertEqual(form.errors['manager'], ['No employee has this code.'])
+
+    def test_employee_cannot_manage_themselves(self):
+        employee = make_employee('SELF')
+        form = EmployeeForm(self.data(employee_code='SELF', manager='SELF'), instance=employee)
+        self.assertIn('own manager', form.errors['manager'][0])
+
+    def test_edit_form_shows_the_manager_code_without_listing_employees(self):
+        boss = make_employee('BOSS')
+        report = make_employee('REPORT')
+        report.manager = boss
+        report.save()
+        html = str(EmployeeForm(instance=report)['manager'])
+        self.assertIn('value="BOSS"', html)
+        self.assertNotIn('<option', html)
+
+    def test_add_view_creates_the_employee(self):
+        response = self.login().post(reverse('accounts:add_employee'), self.data())
+        self.assertRedirects(response, reverse('accounts:list_employees'))
+        self.assertTrue(Employee.objects.filter(employee_code='NEW1').exists())
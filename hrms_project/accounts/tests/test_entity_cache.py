@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ..benchmarks.fake_gotrue import fake_user
+from ..services.user_cache import UserEntityCache, UserListCache
+from ..services.user_service_v1 import UserService
+from .helpers import TEST_SETTINGS, SupabaseTestCase
+
+
+def formatted(index, **changes):
+    return dict(UserService.format_user_data(fake_user(index)), **changes)
+
+
+@override_settings(**TEST_SETTINGS, USER_ENTITY_CACHE_TTL=60, USER_ENTITY_CACHE_SIZE=2)
+class UserEntityCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.list_cache = UserListCache('entity-test')
+        self.list_cache.store([fake_user(index) for index in range(4)])
+        self.entities = UserEntityCache(self.list_cache)
+
+    def test_put_then_get(self):
+        self.entities.put(formatted(1))
+        self.assertEqual(self.entities.get(formatted(1)['id']), formatted(1))
+
+    def test_local_entries_are_lru_bounded_and_backed_by_the_shared_cache(self):
+        for index in range(3):
+            self.entities.put(formatted(index))
+        self.assertEqual(list(self.entities._entries), [formatted(1)['id'], formatted(2)['id']])
+        # Evicted locally, still served from the shared cache.
+        self.assertEqual(self.entities.get(formatted(0)['id']), formatted(0))
+
+    def test_expired_local_entry_is_not_served(self):
+        self.entities.put(formatted(1))
+        cache.clear()
+        self.list_cache.store([fake_user(index) for index in range(4)])
+        with mock.patch('accounts.services.user_cache.time.time', return_value=10 ** 12):
+            self.assertIsNone(self.entities.get(formatted(1)['id']))
+
+    def test_untouched_users_survive_list_patches(self):
+        self.entities.put(formatted(1))
+        self.entities.put(formatted(2))
+        self.list_cache.apply(upserts=[dict(fake_user(2), email='new@example.com')])
+        self.assertEqual(self.entities.get(formatted(1)['id']), formatted(1))
+        self.assertIsNone(self.entities.get(formatted(2)['id']))
+
+    def test_a_refill_drops_entries_tagged_with_older_versions(self):
+        self.entities.put(formatted(1))
+        self.list_cache.store([fake_user(index) for index in range(5)])
+        self.assertIsNone(self.entities.get(formatted(1)['id']))
+
+    def test_discard(self):
+        self.entities.put(formatted(1))
+        self.entities.discard(formatted(1)['id'])
+        self.assertIsNone(self.entities.get(formatted(1)['id']))
+
+
+class UserLookupTests(SupabaseTestCase):
+    USERS = 5
+
+    # No prefetch threads, so every listing request has been counted before the snapshot.
+    @override_settings(SUPABASE_USERS_PREFETCH=0)
+    def test_repeat_lookups_skip_upstream(self):
+        service = UserService()
+        user_id = fake_user(3)['id']
+        first = service.get_user_by_id(user_id)
+        requests = self.fake.requests
+        self.assertEqual(service.get_user_by_id(user_id), first)
+        self.assertEqual(self.fake.requests, requests)
+
+    # No prefetch threads, so every listing request has been counted before the snapshot.
+    @override_settings(SUPABASE_USERS_PREFETCH=0)
+    def test_directory_answers_lookups_once_synced(self):
+        service = UserService()
+        service.get_directory()
+        requests = self.fake.requests
+        self.assertEqual(service.get_user_by_id(fake_user(4)['id'])['email'], 'user4@example.com')
+        self.assertEqual(self.fake.requests, requests)
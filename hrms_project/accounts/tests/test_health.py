@@ -0,0 +1,60 @@
+import threading
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+
+from ..supabase_client import SupabaseHealthProbe, health_probe
+from .helpers import SupabaseTestCase
+
+
+class HealthProbeTests(SupabaseTestCase):
+    USERS = 1
+
+    def _probe(self):
+        probe = SupabaseHealthProbe()
+        self.addCleanup(probe.stop)
+        return probe
+
+    def test_probe_records_a_healthy_upstream(self):
+        status = self._probe().probe()
+        self.assertIs(status['healthy'], True)
+        self.assertIsNotNone(status['latency_ms'])
+
+    def test_probe_records_an_unreachable_upstream(self):
+        with mock.patch.dict('os.environ', {'SUPABASE_URL': 'http://127.0.0.1:9'}), \
+                self.assertLogs('accounts', 'ERROR'):
+            self.assertIs(self._probe().probe()['healthy'], False)
+
+    def test_disabled_probe_never_starts(self):
+        probe = self._probe()
+        probe.ensure_started()
+        self.assertIsNone(probe._pid)
+
+    @override_settings(SUPABASE_HEALTH_PROBE_INTERVAL=60)
+    def test_forked_process_starts_its_own_probe(self):
+        probe = self._probe()
+        with mock.patch.object(threading, 'Thread') as thread:
+            probe.ensure_started()
+            probe.ensure_started()
+            self.assertEqual(thread.call_count, 1)
+            probe._status = {'healthy': True, 'checked_at': 1.0, 'latency_ms': 1.0}
+
+            with mock.patch('os.getpid', return_value=-1):
+                probe.ensure_started()
+            self.assertEqual(thread.call_count, 2)
+        self.assertIsNone(probe.status()['healthy'])
+
+    def test_each_request_makes_sure_the_probe_runs(self):
+        with mock.patch.object(health_probe, 'ensure_started') as ensure_started:
+            response = self.client.get(reverse('accounts:supabase_health'))
+        ensure_started.assert_called_once_with()
+        self.assertEqual(response.status_code, 200)
+
+    def test_health_view_reports_a_failing_probe(self):
+        with mock.patch.object(health_probe, 'status',
+                               return_value={'healthy': False, 'checked_at': 1.0, 'latency_ms': 2.0}), \
+                self.assertLogs('django.request', 'ERROR'):
+            response = self.client.get(reverse('accounts:supabase_health'))
+        self.assertEqual(response.status_code, 503)
+        self.assertIs(response.json()['healthy'], False)
@@ -0,0 +1,59 @@
+import asyncio
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+
+from ..services import http_client
+from ..services.auth_service import AuthService
+from .helpers import SupabaseTestCase
+
+
+async def _current_client():
+    return http_client.get_async_http_client()
+
+
+class HttpClientTests(SimpleTestCase):
+    def test_sync_client_is_shared_within_a_process(self):
+        self.assertIs(http_client.get_http_client(), http_client.get_http_client())
+
+    def test_forked_process_gets_its_own_client(self):
+        parent = http_client.get_http_client()
+        with mock.patch.object(http_client.os, 'getpid', return_value=-1):
+            child = http_client.get_http_client()
+            self.addCleanup(http_client.close_http_clients)
+        self.assertIsNot(child, parent)
+
+    @override_settings(SUPABASE_HTTP_CONNECT_TIMEOUT=1.5, SUPABASE_HTTP_READ_TIMEOUT=7,
+                       SUPABASE_HTTP_MAX_CONNECTIONS=3)
+    def test_timeouts_and_limits_come_from_settings(self):
+        timeout = http_client.build_timeout()
+        self.assertEqual((timeout.connect, timeout.read, timeout.write), (1.5, 7, 7))
+        self.assertEqual(http_client.build_limits().max_connections, 3)
+
+    def test_async_client_is_shared_within_a_loop(self):
+        async def twice():
+            return http_client.get_async_http_client(), http_client.get_async_http_client()
+
+        first, second = asyncio.run(twice())
+        self.assertIs(first, second)
+
+    def test_async_client_is_closed_with_its_loop(self):
+        for run in (asyncio.run, async_to_sync):
+            with self.subTest(run=getattr(run, '__name__', 'async_to_sync')):
+                first = run(_current_client)() if run is async_to_sync else run(_current_client())
+                self.assertTrue(first.is_closed)
+                second = asyncio.run(_current_client())
+                self.assertIsNot(second, first)
+
+
+class PooledConnectionTests(SupabaseTestCase):
+    USERS = 3
+
+    def test_auth_calls_reuse_pooled_connections(self):
+        AuthService.login('user1@example.com', 'password123')
+        pool = http_client.get_http_client()._transport._pool
+        connections = len(pool.connections)
+        for _ in range(5):
+            AuthService.login('user1@example.com', 'password123')
+        self.assertEqual(len(pool.connections), connections)
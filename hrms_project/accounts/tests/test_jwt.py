@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from ..exceptions import InvalidTokenError, TokenExpiredError
+from ..middleware import SupabaseJWTMiddleware
+from ..services.jwt_verifier import TokenVerifier
+from .helpers import TEST_SETTINGS
+
+SECRET = 'test-jwt-secret'
+
+
+def _segment(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+
+def make_token(secret=SECRET, alg='HS256', **claims):
+    claims.setdefault('exp', time.time() + 3600)
+    claims.setdefault('aud', 'authenticated')
+    signing_input = f"{_segment({'alg': alg, 'typ': 'JWT'})}.{_segment(claims)}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).decode().rstrip('=')}"
+
+
+class TokenVerifierTests(TestCase):
+    def setUp(self):
+        self.verifier = TokenVerifier(SECRET, audience='authenticated', cache_size=2)
+
+    def test_valid_token_returns_claims(self):
+        self.assertEqual(self.verifier.verify(make_token(sub='user-1'))['sub'], 'user-1')
+
+    def test_rejections(self):
+        cases = {
+            'signature': make_token(secret='other'),
+            'algorithm': make_token(alg='none'),
+            'audience': make_token(aud='service'),
+            'not yet valid': make_token(nbf=time.time() + 3600),
+            'expiry': make_token(exp='never'),
+            'malformed': 'not-a-token',
+        }
+        for reason, token in cases.items():
+            with self.subTest(reason=reason), self.assertRaises(InvalidTokenError):
+                self.verifier.verify(token)
+
+    def test_expired_token(self):
+        with self.assertRaises(TokenExpiredError):
+            self.verifier.verify(make_token(exp=time.time() - 60))
+        # Within the leeway it is still accepted.
+        TokenVerifier(SECRET, leeway=120).verify(make_token(exp=time.time() - 60))
+
+    def test_cached_claims_still_expire(self):
+        token = make_token(exp=time.time() + 10)
+        self.verifier.verify(token)
+        with mock.patch('accounts.services.jwt_verifier.time.time', return_value=time.time() + 20), \
+                self.assertRaises(TokenExpiredError):
+            self.verifier.verify(token)
+
+    def test_cache_is_bounded(self):
+        for index in range(3):
+            self.verifier.verify(make_token(sub=str(index)))
+        self.assertEqual(len(self.verifier._verified), 2)
+
+
+@override_settings(**dict(TEST_SETTINGS, SUPABASE_JWT_SECRET=SECRET, SUPABASE_JWT_REFRESH_MARGIN=300))
+class SupabaseJWTMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.middleware = SupabaseJWTMiddleware(lambda request: HttpResponse())
+
+    def request(self, session_tokens=None, **headers):
+        request = RequestFactory().get('/', **headers)
+        request.session = SessionStore()
+        request.session.update(session_tokens or {})
+        request.session.create()
+        return request
+
+    def test_bearer_token(self):
+        request = self.request(HTTP_AUTHORIZATION=f'Bearer {make_token(sub="api")}')
+        self.middleware(request)
+        self.assertEqual(request.supabase_claims['sub'], 'api')
+
+        request = self.request(HTTP_AUTHORIZATION='Bearer forged')
+        self.middleware(request)
+        self.assertIsNone(request.supabase_claims)
+
+    def test_session_token_near_expiry_is_refreshed(self):
+        fresh = make_token(sub='session', exp=time.time() + 3600)
+        request = self.request({'access_token': make_token(sub='session', exp=time.time() + 60),
+                                'refresh_token': 'refresh-1'})
+        with mock.patch('accounts.middleware.AuthService.refresh',
+                        return_value={'access_token': fresh, 'refresh_token': 'refresh-2'}) as refresh:
+            self.middleware(request)
+        refresh.assert_called_once_with('refresh-1')
+        self.assertEqual(request.session['access_token'], fresh)
+        self.assertEqual(request.session['refresh_token'], 'refresh-2')
+
+    def test_only_one_concurrent_refresh_per_session(self):
+        tokens = {'access_token': make_token(exp=time.time() + 60), 'refresh_token': 'refresh-1'}
+        request = self.request(tokens)
+        cache.add(f"auth:v1:refreshing:{request.session.session_key}", 1, 10)
+        with mock.patch('accounts.middleware.AuthService.refresh') as refresh:
+            self.middleware(request)
+        refresh.assert_not_called()
+        self.assertIsNotNone(request.supabase_claims)
+
+    @override_settings(SUPABASE_JWT_SECRET='')
+    def test_disabled_without_a_secret(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            SupabaseJWTMiddleware(lambda request: HttpResponse())
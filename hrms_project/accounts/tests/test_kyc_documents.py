@@ -0,0 +1,86 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from ..exceptions import KYCUploadConflictError, KYCUploadError
+from ..models import KYCApplication, KYCDocument
+from ..services.kyc_documents import KYCDocumentProcessor, KYCUploads, absolute_path, open_thumbnail
+from .helpers import make_employee
+
+
+class KYCUploadTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings = override_settings(KYC_UPLOAD_ROOT=root, KYC_UPLOAD_CHUNK_BYTES=4, KYC_STORAGE_BUCKET='kyc')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.application = KYCApplication.objects.create(employee=make_employee('E1'), document_type='passport')
+        self.uploads = KYCUploads()
+        self.document = self.uploads.start(self.application, 'scan.png', 'image/png', 10)
+
+    def append(self, document, offset, content):
+        return self.uploads.append(document, offset, io.BytesIO(content), len(content))
+
+    def content(self):
+        with open(absolute_path(self.document.file_path), 'rb') as upload:
+            return upload.read()
+
+    @mock.patch('accounts.services.kyc_documents.document_processor')
+    def test_duplicate_and_out_of_order_chunks_are_refused(self, processor):
+        stale = KYCDocument.objects.get(pk=self.document.pk)
+        document = self.append(self.document, 0, b'abcd')
+        self.assertEqual(document.received_bytes, 4)
+
+        # A retry that read the document before the first write landed loses the locked offset check.
+        with self.assertRaises(KYCUploadConflictError):
+            self.append(stale, 0, b'XXXX')
+        with self.assertRaises(KYCUploadConflictError):
+            self.append(document, 8, b'ij')
+        self.assertEqual(self.content(), b'abcd')
+
+        document = self.append(document, 4, b'efgh')
+        document = self.append(document, 8, b'ij')
+        self.assertEqual((document.received_bytes, document.status), (10, KYCDocument.STATUS_QUEUED))
+        self.assertEqual(self.content(), b'abcdefghij')
+        processor.submit.assert_called_once_with(document)
+        with self.assertRaises(KYCUploadConflictError):
+            self.append(document, 8, b'ij')
+
+    def test_cut_short_chunk_leaves_the_offset(self):
+        with self.assertRaises(KYCUploadError):
+            self.uploads.append(self.document, 0, io.BytesIO(b'ab'), 4)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.received_bytes, 0)
+
+    @mock.patch('accounts.supabase_client.get_supabase')
+    def test_pushed_documents_serve_thumbnails_from_storage(self, get_supabase):
+        bucket = get_supabase.return_value.storage.from_.return_value
+        bucket.download.return_value = b'jpeg'
+        thumbnail = os.path.relpath(KYCDocumentProcessor.thumbnail_path(self.document), absolute_path(''))
+        with open(absolute_path(thumbnail), 'wb') as local:
+            local.write(b'jpeg')
+
+        changes = KYCDocumentProcessor._push_to_storage(self.document.pk, thumbnail)
+        storage_path = f"kyc/{self.application.pk}/{self.document.upload_id.hex}"
+        self.assertEqual(changes, {'storage_path': storage_path})
+        uploaded = [call.args[0] for call in bucket.upload.call_args_list]
+        self.assertEqual(uploaded, [storage_path, f"{storage_path}.thumbnail.jpg"])
+        self.assertFalse(os.path.exists(absolute_path(thumbnail)))
+        self.assertFalse(os.path.exists(absolute_path(self.document.file_path)))
+
+        KYCDocument.objects.filter(pk=self.document.pk).update(thumbnail_path=thumbnail, **changes)
+        self.document.refresh_from_db()
+        self.assertEqual(open_thumbnail(self.document).read(), b'jpeg')
+        bucket.download.assert_called_once_with(f"{storage_path}.thumbnail.jpg")
+
+    @mock.patch('accounts.supabase_client.get_supabase')
+    def test_failed_push_keeps_local_copies(self, get_supabase):
+        get_supabase.return_value.storage.from_.return_value.upload.side_effect = RuntimeError('offline')
+        with self.assertLogs('accounts.services.kyc_documents', 'ERROR'):
+            self.assertEqual(KYCDocumentProcessor._push_to_storage(self.document.pk, ''), {})
+        self.assertTrue(os.path.exists(absolute_path(self.document.file_path)))
@@ -0,0 +1,72 @@
+from django.test import TestCase
+
+from ..models import KYCApplication, KYCBacklogBucket, KYCMetricsDay
+from ..services.kyc_metrics import KYCMetrics
+from ..services.kyc_queue import KYCQueue
+from ..utils.sketch import QuantileSketch
+from .helpers import make_employee
+
+
+class KYCMetricsTests(TestCase):
+    def setUp(self):
+        self.employee = make_employee('E1')
+        self.other = make_employee('E2')
+        for index in range(12):
+            KYCApplication.objects.create(employee=self.employee if index < 8 else self.other,
+                                          document_type='passport')
+        self.queue = KYCQueue(lease_seconds=60)
+        self.metrics = KYCMetrics()
+
+    def state(self):
+        days = sorted(KYCMetricsDay.objects.exclude(submitted=0, approved=0, rejected=0).values_list(
+            'day', 'reviewer', 'submitted', 'approved', 'rejected', 'turnaround_sketch'))
+        backlog = sorted(KYCBacklogBucket.objects.filter(pending__gt=0).values_list('hour', 'pending'))
+        return days, backlog
+
+    def assert_matches_rebuild(self):
+        incremental = self.state()
+        self.metrics.rebuild()
+        self.assertEqual(self.state(), incremental)
+
+    def decide(self, reviewer, count, status):
+        for application in self.queue.claim(reviewer, count):
+            self.queue.decide(application.pk, reviewer, status)
+
+    def test_incremental_metrics_match_rebuild(self):
+        self.decide('alice', 3, KYCApplication.STATUS_APPROVED)
+        self.decide('bob', 2, KYCApplication.STATUS_REJECTED)
+        self.assert_matches_rebuild()
+        report = self.metrics.report(7)
+        self.assertEqual(report['backlog']['pending'], 7)
+        self.assertEqual((report['totals']['submitted'], report['totals']['decided']), (12, 5))
+        self.assertEqual(report['totals']['approval_rate'], 60.0)
+
+    def test_deletes_are_taken_out_of_metrics(self):
+        self.decide('alice', 2, KYCApplication.STATUS_APPROVED)
+        KYCApplication.objects.filter(status=KYCApplication.STATUS_PENDING).first().delete()
+        KYCApplication.objects.exclude(status=KYCApplication.STATUS_PENDING).first().delete()
+        self.assert_matches_rebuild()
+        self.other.delete()
+        self.assert_matches_rebuild()
+        self.assertEqual(self.metrics.report(7)['backlog']['pending'], 5)
+
+
+class QuantileSketchTests(TestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        sketch = QuantileSketch(0.02)
+        values = [float(value) for value in range(1, 10001)]
+        for value in values:
+            sketch.add(value)
+        for q in (0.5, 0.9, 0.99):
+            expected = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q), expected, delta=expected * 0.02)
+
+    def test_merge_and_json_round_trip(self):
+        left, right, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for value in range(1, 500):
+            (left if value % 2 else right).add(value)
+            both.add(value)
+        merged = QuantileSketch.merged([QuantileSketch.from_json(left.to_json()), right])
+        self.assertEqual(merged.buckets, both.buckets)
+        self.assertEqual(merged.quantile(0.9), both.quantile(0.9))
+        self.assertIsNone(QuantileSketch().quantile(0.5))
@@ -0,0 +1,49 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ..exceptions import KYCError, KYCLeaseError
+from ..models import KYCApplication
+from ..services.kyc_queue import KYCQueue
+from .helpers import make_employee
+
+
+class KYCQueueTests(TestCase):
+    def setUp(self):
+        self.employee = make_employee('E1')
+        self.applications = [KYCApplication.objects.create(employee=self.employee, document_type='passport')
+                             for _ in range(5)]
+        self.queue = KYCQueue(lease_seconds=60)
+
+    def test_claims_do_not_overlap(self):
+        alice = self.queue.claim('alice', 3)
+        bob = self.queue.claim('bob', 3)
+        self.assertEqual([application.id for application in alice], [a.id for a in self.applications[:3]])
+        self.assertEqual([application.id for application in bob], [a.id for a in self.applications[3:]])
+        self.assertEqual(self.queue.claim('carol', 3), [])
+
+    def test_expired_lease_returns_to_queue(self):
+        claimed = self.queue.claim('alice', 1)[0]
+        KYCApplication.objects.filter(pk=claimed.pk).update(lease_expires_at=timezone.now() - datetime.timedelta(1))
+        self.assertEqual(self.queue.claim('bob', 1)[0].pk, claimed.pk)
+        with self.assertRaises(KYCLeaseError):
+            self.queue.decide(claimed.pk, 'alice', KYCApplication.STATUS_APPROVED)
+
+    def test_decide_requires_lease_and_valid_status(self):
+        claimed = self.queue.claim('alice', 1)[0]
+        with self.assertRaises(KYCLeaseError):
+            self.queue.decide(claimed.pk, 'bob', KYCApplication.STATUS_APPROVED)
+        with self.assertRaises(KYCError):
+            self.queue.decide(claimed.pk, 'alice', 'maybe')
+        self.queue.decide(claimed.pk, 'alice', KYCApplication.STATUS_REJECTED, 'Blurred scan')
+        claimed.refresh_from_db()
+        self.assertEqual((claimed.status, claimed.reviewed_by, claimed.lease_owner), ('rejected', 'alice', ''))
+
+    def test_release_and_renew(self):
+        claimed = self.queue.claim('alice', 1)[0]
+        self.queue.renew(claimed.pk, 'alice')
+        self.queue.release(claimed.pk, 'alice')
+        with self.assertRaises(KYCLeaseError):
+            self.queue.renew(claimed.pk, 'alice')
+        self.assertEqual(self.queue.claim('bob', 1)[0].pk, claimed.pk)
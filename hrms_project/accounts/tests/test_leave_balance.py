@@ -0,0 +1,46 @@
+from django.test import TestCase
+
+from ..models import LeaveType
+from ..services.leave_balance import LeaveBalanceEngine
+from .helpers import accrue, make_employee
+
+
+class LeaveBalanceEngineTests(TestCase):
+    def setUp(self):
+        self.annual = LeaveType.objects.create(code='AL', name='Annual')
+        self.sick = LeaveType.objects.create(code='SL', name='Sick')
+        self.alice = make_employee('E1')
+        self.bob = make_employee('E2')
+        self.engine = LeaveBalanceEngine()
+
+    def test_balances_fold_the_whole_ledger_without_snapshots(self):
+        accrue(self.alice, self.annual, '20')
+        accrue(self.alice, self.annual, '-2.5')
+        accrue(self.bob, self.sick, '5')
+        balances = self.engine.balances()
+        self.assertEqual(balances[(self.alice.id, self.annual.id)], 17.5)
+        self.assertEqual(balances[(self.bob.id, self.sick.id)], 5.0)
+
+    def test_snapshot_plus_deltas_matches_full_fold(self):
+        accrue(self.alice, self.annual, '20')
+        accrue(self.bob, self.annual, '10')
+        before = self.engine.balances().to_dict()
+        self.assertEqual(self.engine.snapshot(lag_seconds=0), 2)
+        self.assertEqual(self.engine.balances().to_dict(), before)
+
+        accrue(self.alice, self.annual, '-3')
+        accrue(self.bob, self.sick, '4')
+        with_deltas = self.engine.balances().to_dict()
+        self.assertEqual(with_deltas[(self.alice.id, self.annual.id)], 17.0)
+        self.assertEqual(with_deltas[(self.bob.id, self.sick.id)], 4.0)
+
+        self.engine.snapshot(lag_seconds=0)
+        self.assertEqual(self.engine.balances().to_dict(), with_deltas)
+
+    def test_upto_entry_id_and_employee_filter(self):
+        first = accrue(self.alice, self.annual, '20')
+        accrue(self.alice, self.annual, '-5')
+        accrue(self.bob, self.annual, '8')
+        self.assertEqual(self.engine.balances(upto_entry_id=first.id)[(self.alice.id, self.annual.id)], 20.0)
+        self.assertEqual(list(self.engine.balances([self.bob.id]).index), [(self.bob.id, self.annual.id)])
+        self.assertEqual(self.engine.balance(self.bob.id, self.sick.id), 0.0)
@@ -0,0 +1,46 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib import admin
+from django.test import RequestFactory, TestCase
+
+from ..models import Department, LeaveDailyRollup, LeaveRequest, LeaveType
+from ..services.leave_service import LeaveService
+from .helpers import accrue, make_employee
+
+
+class DecidedLeaveRequestTests(TestCase):
+    def setUp(self):
+        self.annual = LeaveType.objects.create(code='AL', name='Annual')
+        self.engineering = Department.objects.create(name='Engineering')
+        self.alice = make_employee('E1', self.engineering)
+        accrue(self.alice, self.annual, '30')
+        self.service = LeaveService()
+
+    def request(self, start=datetime.date(2024, 3, 1), end=datetime.date(2024, 3, 2)):
+        return LeaveRequest.objects.create(employee=self.alice, leave_type=self.annual, start_date=start, end_date=end)
+
+    def test_admin_locks_core_fields_once_decided(self):
+        model_admin = admin.site._registry[LeaveRequest]
+        http_request = RequestFactory().get('/')
+        pending = self.request()
+        self.assertNotIn('days', model_admin.get_readonly_fields(http_request, pending))
+        self.assertNotIn('employee', model_admin.get_readonly_fields(http_request))
+
+        approved = self.service.approve(pending.id, 'admin@example.com')
+        readonly = model_admin.get_readonly_fields(http_request, approved)
+        for field in ('employee', 'leave_type', 'start_date', 'end_date', 'days', 'status'):
+            self.assertIn(field, readonly)
+
+    def test_deleting_an_employee_reverses_their_approved_leave(self):
+        bob = make_employee('E2', self.engineering)
+        accrue(bob, self.annual, '30')
+        self.service.approve(self.request().id, 'admin@example.com')
+        bobs = LeaveRequest.objects.create(employee=bob, leave_type=self.annual, start_date=datetime.date(2024, 3, 2),
+                                           end_date=datetime.date(2024, 3, 2))
+        self.service.approve(bobs.id, 'admin@example.com')
+
+        # The ledger protects an approved request on its own; it goes with its employee.
+        self.alice.delete()
+        cells = LeaveDailyRollup.objects.exclude(employees=0).values_list('day', 'days', 'employees')
+        self.assertEqual(list(cells), [(datetime.date(2024, 3, 2), Decimal('1.00'), 1)])
@@ -0,0 +1,90 @@
+import datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from ..exceptions import InsufficientLeaveBalanceError, LeaveRequestError
+from ..models import Department, LeaveDailyRollup, LeaveRequest, LeaveType
+from ..services.leave_rollup import LeaveRollups, daily_shares
+from ..services.leave_service import LeaveService
+from .helpers import accrue, make_employee
+
+
+class LeaveRollupTests(TestCase):
+    def setUp(self):
+        self.annual = LeaveType.objects.create(code='AL', name='Annual')
+        self.engineering = Department.objects.create(name='Engineering')
+        self.sales = Department.objects.create(name='Sales')
+        self.alice = make_employee('E1', self.engineering)
+        self.bob = make_employee('E2')
+        for employee in (self.alice, self.bob):
+            accrue(employee, self.annual, '30')
+        self.service = LeaveService()
+
+    def request(self, employee, start, end, days=None):
+        return LeaveRequest.objects.create(employee=employee, leave_type=self.annual, start_date=start, end_date=end,
+                                           days=days)
+
+    def state(self):
+        # Cells cancelled back to zero are kept by incremental maintenance but not written by rebuild.
+        return sorted(LeaveDailyRollup.objects.exclude(employees=0)
+                      .values_list('day', 'department_key', 'leave_type_id', 'days', 'employees'))
+
+    def assert_matches_rebuild(self):
+        incremental = self.state()
+        LeaveRollups().rebuild()
+        self.assertEqual(self.state(), incremental)
+
+    def test_daily_shares_put_remainder_on_last_day(self):
+        leave_request = self.request(self.alice, datetime.date(2024, 3, 1), datetime.date(2024, 3, 3), Decimal('2.0'))
+        shares = daily_shares(leave_request)
+        self.assertEqual([share for _, share in shares], [Decimal('0.66'), Decimal('0.66'), Decimal('0.68')])
+        self.assertEqual(sum(share for _, share in shares), Decimal('2.0'))
+
+    def test_approvals_and_cancellations_match_rebuild(self):
+        first = self.request(self.alice, datetime.date(2024, 3, 1), datetime.date(2024, 3, 2), Decimal('1.0'))
+        second = self.request(self.bob, datetime.date(2024, 3, 2), datetime.date(2024, 3, 4))
+        third = self.request(self.bob, datetime.date(2024, 3, 2), datetime.date(2024, 3, 2))
+        for leave_request in (first, second, third):
+            self.service.approve(leave_request.id, 'admin@example.com')
+        self.assert_matches_rebuild()
+        cell = LeaveDailyRollup.objects.get(day=datetime.date(2024, 3, 2), department_key=0)
+        self.assertEqual((cell.days, cell.employees), (Decimal('2.00'), 2))
+
+        self.service.cancel(third.id, 'admin@example.com')
+        self.assert_matches_rebuild()
+
+    def test_cancel_reverses_against_department_at_approval(self):
+        leave_request = self.request(self.alice, datetime.date(2024, 3, 1), datetime.date(2024, 3, 2), Decimal('1.0'))
+        self.service.approve(leave_request.id, 'admin@example.com')
+        self.alice.department = self.sales
+        self.alice.save()
+        self.assert_matches_rebuild()
+
+        self.service.cancel(leave_request.id, 'admin@example.com')
+        self.assertEqual(self.state(), [])
+        self.assertFalse(LeaveDailyRollup.objects.filter(department=self.sales).exists())
+        self.assert_matches_rebuild()
+
+    def test_approval_beyond_balance_is_refused(self):
+        leave_request = self.request(self.bob, datetime.date(2024, 3, 1), datetime.date(2024, 4, 30))
+        with self.assertRaises(InsufficientLeaveBalanceError):
+            self.service.approve(leave_request.id, 'admin@example.com')
+        self.assertEqual(LeaveDailyRollup.objects.count(), 0)
+
+
+    def test_request_ending_before_it_starts_is_refused(self):
+        leave_request = LeaveRequest(employee=self.alice, leave_type=self.annual, start_date=datetime.date(2024, 3, 2),
+                                     end_date=datetime.date(2024, 3, 1), days=Decimal('1.0'))
+        with self.assertRaises(ValidationError) as caught:
+            leave_request.full_clean()
+        self.assertIn('end_date', caught.exception.message_dict)
+        with self.assertRaises(ValueError):
+            daily_shares(leave_request)
+
+        leave_request.save()
+        with self.assertRaises(LeaveRequestError):
+            self.service.approve(leave_request.id, 'admin@example.com')
+        self.assertEqual(LeaveDailyRollup.objects.count(), 0)
+        self.assertEqual(LeaveRequest.objects.get(pk=leave_request.pk).status, LeaveRequest.STATUS_PENDING)
@@ -0,0 +1,64 @@
+import os
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+
+from .. import supabase_client
+from ..benchmarks.fake_gotrue import FakeGoTrue
+from ..benchmarks.load import LoadTest, RouteStats, percentile
+from .helpers import TEST_SETTINGS
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        ordered = [float(value) for value in range(1, 11)]
+        self.assertEqual(percentile(ordered, 0.5), 5.0)
+        self.assertEqual(percentile(ordered, 0.9), 9.0)
+        self.assertEqual(percentile(ordered, 0.99), 10.0)
+        self.assertEqual(percentile(ordered, 0.0), 1.0)
+        self.assertEqual(percentile([3.0], 0.95), 3.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_route_stats_summary(self):
+        stats = RouteStats()
+        for latency, status, ok in ((0.01, '200', True), (0.03, '200', True), (0.02, '500', False),
+                                    (0.04, 'ConnectError', False)):
+            stats.record(latency, status, ok)
+        summary = stats.summary(2.0)
+        self.assertEqual((summary['requests'], summary['errors'], summary['error_rate']), (4, 2, 0.5))
+        self.assertEqual((summary['throughput_rps'], summary['p50_ms'], summary['max_ms']), (2.0, 20.0, 40.0))
+        self.assertEqual(summary['statuses'], {'200': 2, '500': 1, 'ConnectError': 1})
+        self.assertEqual(RouteStats().summary(1.0)['p99_ms'], 0.0)
+
+    def test_rejects_unknown_scenarios_and_empty_runs(self):
+        with self.assertRaises(ValueError):
+            LoadTest('http://testserver', {'visitor': 1}, rate=1, duration=1, users=10)
+        with self.assertRaises(ValueError):
+            LoadTest('http://testserver', {'admin': 1}, rate=0, duration=1, users=10)
+
+
+@override_settings(**TEST_SETTINGS)
+class LoadTestRunTests(LiveServerTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeGoTrue(users=20).start()
+        cls.addClassCleanup(cls.fake.stop)
+        environ = mock.patch.dict(os.environ, {'SUPABASE_URL': cls.fake.url, 'SUPABASE_KEY': 'test-service-role-key'})
+        environ.start()
+        cls.addClassCleanup(environ.stop)
+        supabase_client._clients.clear()
+        cls.addClassCleanup(supabase_client._clients.clear)
+        super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_scenarios_complete_against_a_live_server(self):
+        report = LoadTest(self.live_server_url, {'admin': 1, 'employee': 1}, rate=20, duration=0.3, users=20,
+                          seed=1).run()
+        self.assertEqual(report['arrivals'], 6)
+        self.assertEqual(report['total']['errors'], 0, report['routes'])
+        completed = sum(count for outcome, count in report['outcomes'].items() if outcome.endswith(':completed'))
+        self.assertEqual(completed, 6)
+        self.assertIn('POST login', report['routes'])
@@ -0,0 +1,127 @@
+import json
+import threading
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from ..services.pagination import iter_pages, iter_rows
+from ..services.user_service_v1 import UserService
+from .helpers import SupabaseTestCase
+
+
+class FakeListing:
+    """Page fetcher over ``total`` numbered rows that records which pages were requested."""
+
+    def __init__(self, total, fail_on=None):
+        self.total = total
+        self.fail_on = fail_on
+        self.requested = []
+        self.finished = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, page, per_page):
+        with self._lock:
+            self.requested.append(page)
+        if page == self.fail_on:
+            raise httpx.ConnectError(f"page {page} failed")
+        rows = list(range((page - 1) * per_page, min(page * per_page, self.total)))
+        with self._lock:
+            self.finished += 1
+        return rows
+
+
+class IterPagesTests(SimpleTestCase):
+    def test_walks_every_page_in_order(self):
+        for prefetch in (0, 1, 3):
+            with self.subTest(prefetch=prefetch):
+                listing = FakeListing(47)
+                pages = list(iter_pages(listing, 10, prefetch))
+                self.assertEqual([len(page) for page in pages], [10, 10, 10, 10, 7])
+                self.assertEqual(list(iter_rows(iter(pages))), list(range(47)))
+
+    def test_exact_multiple_ends_on_empty_page(self):
+        listing = FakeListing(30)
+        self.assertEqual(sum(len(page) for page in iter_pages(listing, 10, 0)), 30)
+        self.assertEqual(listing.requested, [1, 2, 3, 4])
+
+    def test_requests_stay_within_prefetch_of_the_end(self):
+        listing = FakeListing(45)
+        list(iter_pages(listing, 10, 2))
+        self.assertEqual(sorted(set(listing.requested)), sorted(listing.requested))
+        self.assertLessEqual(max(listing.requested), 5 + 2)
+
+    def test_no_page_after_a_known_short_page(self):
+        listing = FakeListing(15)
+        consumed = iter_pages(listing, 10, 2)
+        self.assertEqual(len(next(consumed)), 10)
+        # Let pages 1-3 finish, so page 2 is known to be short when the queue is next topped up.
+        for _ in range(200):
+            if listing.finished == 3:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(len(next(consumed)), 5)
+        threading.Event().wait(0.05)  # time for a wrongly queued page 4 to start
+        self.assertEqual(list(consumed), [])
+        self.assertEqual(sorted(listing.requested), [1, 2, 3])
+
+    def test_failed_page_raises(self):
+        listing = FakeListing(100, fail_on=3)
+        pages = iter_pages(listing, 10, 2)
+        self.assertEqual(len(next(pages)), 10)
+        self.assertEqual(len(next(pages)), 10)
+        with self.assertRaises(httpx.ConnectError):
+            next(pages)
+
+    def test_rejects_empty_pages(self):
+        with self.assertRaises(ValueError):
+            next(iter_pages(FakeListing(1), 0))
+
+
+class UserListingTests(SupabaseTestCase):
+    USERS = 47
+
+    def test_get_all_users_returns_every_page(self):
+        users = UserService().get_all_users()
+        self.assertEqual(len(users), 47)
+        self.assertEqual(len({user['id'] for user in users}), 47)
+
+    def test_proxy_streams_every_user(self):
+        response = self.login().post(reverse('accounts:proxy_supabase'))
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(payload['users']), 47)
+        self.assertNotIn('error', payload)
+
+    def test_proxy_failure_after_first_page_is_reported_in_the_body(self):
+        client = self.login()
+        fetch = UserService._fetch_users_page
+
+        def failing(service, page, per_page):
+            if page == 3:
+                raise httpx.ConnectError("upstream went away")
+            return fetch(service, page, per_page)
+
+        with self._patch_fetch(failing), self.assertLogs('accounts', 'ERROR'):
+            response = client.post(reverse('accounts:proxy_supabase'))
+            body = b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(body)
+        self.assertEqual(len(payload['users']), 20)
+        self.assertIn('upstream went away', payload['error'])
+
+    def test_proxy_failure_on_first_page_is_a_500(self):
+        client = self.login()
+
+        def failing(service, page, per_page):
+            raise httpx.ConnectError("upstream went away")
+
+        with self._patch_fetch(failing), self.assertLogs('accounts', 'ERROR'), \
+                self.assertLogs('django.request', 'ERROR'):
+            response = client.post(reverse('accounts:proxy_supabase'))
+        self.assertEqual(response.status_code, 500)
+
+    @staticmethod
+    def _patch_fetch(replacement):
+        return mock.patch.object(UserService, '_fetch_users_page', replacement)
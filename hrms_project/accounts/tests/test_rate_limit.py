@@ -0,0 +1,105 @@
+import hashlib
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from ..services import rate_limit
+from ..services.rate_limit import AdmissionLimiter, SharedWindow, TokenBucket, parse_rate
+from ..utils.decorators import login_email
+from .helpers import TEST_SETTINGS, SupabaseTestCase
+
+
+def reset_limiters(test):
+    rate_limit._limiters.clear()
+    test.addCleanup(rate_limit._limiters.clear)
+
+
+@override_settings(**TEST_SETTINGS)
+class LimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/60'), (10, 60.0))
+        self.assertEqual(parse_rate('5/m'), (5, 60.0))
+        self.assertEqual(parse_rate('3'), (3, 1.0))
+
+    def test_bucket_peek_take_and_refund(self):
+        bucket = TokenBucket(2, 60)
+        self.assertEqual(bucket.peek('k'), 0)
+        self.assertEqual((bucket.take('k'), bucket.take('k')), (0, 0))
+        self.assertGreater(bucket.peek('k'), 0)
+        self.assertGreater(bucket.take('k'), 0)
+        bucket.refund('k')
+        self.assertEqual(bucket.take('k'), 0)
+
+    def test_shared_window_counts_only_takes(self):
+        window = SharedWindow('test', 2, 60)
+        for _ in range(3):
+            self.assertEqual(window.peek('k'), 0)
+        self.assertEqual((window.take('k'), window.take('k')), (0, 0))
+        self.assertGreater(window.peek('k'), 0)
+        window.refund('k')
+        self.assertEqual(window.take('k'), 0)
+
+    def test_shared_rejection_returns_the_local_token(self):
+        limiter = AdmissionLimiter('test', '2/60')
+        limiter.shared.take('k')
+        limiter.shared.take('k')  # another worker used the window up
+        self.assertGreater(limiter.admit('k'), 0)
+        self.assertEqual(limiter.local.peek('k'), 0)
+        self.assertEqual(limiter.counters, {'admitted': 0, 'rejected_local': 0, 'rejected_shared': 1})
+
+    def test_cache_outage_falls_back_to_the_local_bucket(self):
+        limiter = AdmissionLimiter('test', '1/60')
+        with mock.patch.object(rate_limit.cache, 'incr', side_effect=ConnectionError), \
+                mock.patch.object(rate_limit.cache, 'add', side_effect=ConnectionError), \
+                self.assertLogs('accounts', 'WARNING'):
+            self.assertEqual(limiter.admit('k'), 0)
+        self.assertGreater(limiter.admit('k'), 0)
+
+    def test_login_email_key_is_a_normalised_hash(self):
+        request = RequestFactory().post('/', {'email': ' Ann@Example.com '})
+        self.assertEqual(login_email(request), hashlib.sha256(b'ann@example.com').hexdigest())
+        self.assertIsNone(login_email(RequestFactory().post('/', {'email': ' '})))
+
+
+class LoginRateLimitTests(SupabaseTestCase):
+    USERS = 2
+
+    def setUp(self):
+        super().setUp()
+        reset_limiters(self)
+
+    def post_login(self, email, ip):
+        # Wrong passwords are logged by the view; keep the test output quiet.
+        with mock.patch('accounts.views.auth_views.logger'):
+            return self.client.post(reverse('accounts:login'), {'email': email, 'password': 'wrong'},
+                                    REMOTE_ADDR=ip)
+
+    @override_settings(RATE_LIMITS={'login_ip': '3/60', 'login_email': '1/60', 'login_global': '100/60'})
+    def test_rejected_requests_spend_no_tokens(self):
+        self.assertNotEqual(self.post_login('user1@example.com', '10.0.0.1').status_code, 429)
+        for _ in range(5):
+            response = self.post_login('user1@example.com', '10.0.0.1')
+            self.assertEqual(response.status_code, 429)
+            self.assertTrue(response['Retry-After'])
+
+        # The email rule turned those away, so the address still has its other two tokens.
+        self.assertNotEqual(self.post_login('user0@example.com', '10.0.0.1').status_code, 429)
+        self.assertNotEqual(self.post_login('other@example.com', '10.0.0.1').status_code, 429)
+        self.assertEqual(self.post_login('third@example.com', '10.0.0.1').status_code, 429)
+        self.assertEqual(rate_limit.get_limiter('login_global').counters['admitted'], 3)
+
+    @override_settings(RATE_LIMITS={'login_ip': '10/60', 'login_email': '10/60', 'login_global': '1/60'})
+    def test_a_lost_race_hands_back_earlier_tokens(self):
+        ip_limiter = rate_limit.get_limiter('login_ip')
+        global_limiter = rate_limit.get_limiter('login_global')
+        # Every check passes, then another worker takes the last global slot before this one spends it.
+        with mock.patch.object(global_limiter, 'check', return_value=0.0):
+            global_limiter.admit('all')
+            self.assertEqual(self.post_login('user1@example.com', '10.0.0.2').status_code, 429)
+        self.assertEqual(ip_limiter.counters['admitted'], 0)
+        self.assertEqual(rate_limit.get_limiter('login_email').counters['admitted'], 0)
@@ -0,0 +1,84 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache.backends.dummy import DummyCache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..benchmarks.fake_gotrue import fake_user
+from ..session_store import SessionStore
+from ..utils.session import get_session_user, login_session
+from .helpers import SupabaseTestCase
+
+SHARED_CACHE = tempfile.mkdtemp(prefix='hrms-session-cache-')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                       'LOCATION': SHARED_CACHE}})
+class SessionStoreTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.addClassCleanup(shutil.rmtree, SHARED_CACHE, ignore_errors=True)
+
+    def setUp(self):
+        session = SessionStore()
+        session['user'] = {'id': '1', 'email': 'a@example.com'}
+        session.create()
+        self.addCleanup(session.delete)
+        self.key = session.session_key
+
+    def test_reads_hit_the_shared_cache_without_a_query(self):
+        SessionStore(self.key).load()
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.key).load()['user']['email'], 'a@example.com')
+
+    def test_unreachable_cache_falls_back_to_the_database(self):
+        store = SessionStore(self.key)
+        with mock.patch.object(store._cache, 'get', side_effect=ConnectionError), \
+                mock.patch.object(store._cache, 'set', side_effect=ConnectionError), \
+                self.assertLogs('accounts', 'WARNING'):
+            self.assertEqual(store.load()['user']['id'], '1')
+
+    def test_delete_removes_the_cached_copy(self):
+        SessionStore(self.key).load()
+        SessionStore(self.key).delete()
+        self.assertEqual(SessionStore(self.key).load(), {})
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_is_not_used(self):
+        self.assertIsInstance(SessionStore(self.key)._cache, DummyCache)
+
+
+class PurgeSessionsTests(TestCase):
+    def test_expired_sessions_are_purged_in_batches(self):
+        past = timezone.now() - timedelta(days=1)
+        for index in range(5):
+            Session.objects.create(session_key=f'expired{index}', session_data='', expire_date=past)
+        Session.objects.create(session_key='live', session_data='', expire_date=timezone.now() + timedelta(days=1))
+
+        out = StringIO()
+        call_command('purge_sessions', '--batch-size', '2', stdout=out)
+        self.assertIn('Purged 5 expired sessions', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+
+class SessionPayloadTests(SupabaseTestCase):
+    USERS = 2
+
+    def test_login_stores_only_the_compact_user(self):
+        client = self.login()
+        self.assertEqual(client.session['user'], {'id': fake_user(0)['id'], 'email': 'user0@example.com',
+                                                  'first_name': 'First0', 'is_admin': True})
+        self.assertTrue(client.session['access_token'])
+
+    def test_sessions_holding_the_full_user_are_read_compactly(self):
+        session = {}
+        login_session(session, dict(fake_user(1), access_token='token'))
+        legacy = {'user': fake_user(1)}
+        self.assertEqual(get_session_user(legacy), session['user'])
@@ -0,0 +1,62 @@
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+
+from ..benchmarks.fake_gotrue import fake_user
+from ..services.user_cache import user_entity_cache, user_list_cache
+from ..services.user_service_v1 import UserService
+from .helpers import SupabaseTestCase
+
+
+class BatchUsersTests(SupabaseTestCase):
+    USERS = 8
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.login()
+        UserService().get_all_users()
+
+    def post(self, payload):
+        return self.client.post(reverse('accounts:batch_users'), json.dumps(payload),
+                                content_type='application/json')
+
+    def cached(self):
+        return {user['id']: user for user in user_list_cache.peek()}
+
+    def test_delete_reports_each_item_and_patches_the_cache_once(self):
+        ids = [fake_user(index)['id'] for index in (2, 3)] + ['00000000-0000-0000-0000-0000000000ff']
+        version = user_list_cache.version()
+        payload = self.post({'operation': 'delete', 'ids': ids + ids[:1]}).json()
+
+        self.assertEqual((payload['succeeded'], payload['failed']), (2, 1))
+        self.assertEqual([result['success'] for result in payload['results']], [True, True, False])
+        self.assertIn('not found', payload['results'][2]['message'])
+        self.assertFalse(set(ids) & set(self.cached()))
+        self.assertEqual(len(user_list_cache.changes_since(version, user_list_cache.version())), 1)
+
+    def test_admin_changes_and_toggle(self):
+        ids = [fake_user(index)['id'] for index in (0, 4)]
+        self.assertTrue(self.post({'operation': 'toggle_admin', 'ids': ids}).json()['success'])
+        flags = [self.cached()[user_id]['user_metadata']['is_admin'] for user_id in ids]
+        self.assertEqual(flags, [False, True])
+        self.assertTrue(user_entity_cache.get(ids[1])['is_admin'])
+
+        self.post({'operation': 'unset_admin', 'ids': ids[1:]})
+        self.assertFalse(self.cached()[ids[1]]['user_metadata']['is_admin'])
+
+    def test_update_metadata_keeps_only_allowed_keys(self):
+        user_id = fake_user(5)['id']
+        self.post({'operation': 'update_metadata', 'ids': [user_id],
+                   'user_metadata': {'first_name': 'Batch', 'role': 'owner'}})
+        metadata = self.cached()[user_id]['user_metadata']
+        self.assertEqual(metadata['first_name'], 'Batch')
+        self.assertNotIn('role', metadata)
+
+    @override_settings(USER_BATCH_MAX_ITEMS=2)
+    def test_bad_requests_are_rejected(self):
+        for payload in ({'operation': 'explode', 'ids': []}, {'operation': 'delete', 'ids': 'all'},
+                        {'operation': 'delete', 'ids': ['a', 'b', 'c']},
+                        {'operation': 'update_metadata', 'ids': ['a'], 'user_metadata': {'role': 'x'}}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ..services.user_cache import UserListCache
+from .helpers import TEST_SETTINGS
+
+
+def user(user_id, name='x'):
+    return {'id': user_id, 'name': name}
+
+
+class BlockingLoader:
+    """Loader that returns ``users`` only once released, recording how often it ran."""
+
+    def __init__(self, users):
+        self.users = users
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return [dict(row) for row in self.users]
+
+
+@override_settings(**TEST_SETTINGS, USER_CACHE_WAIT_TIMEOUT=0.2)
+class UserListCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = UserListCache('test-users')
+
+    def test_miss_loads_once_then_hits(self):
+        loader = BlockingLoader([user('1')])
+        loader.release.set()
+        self.assertEqual(self.cache.get(loader), [user('1')])
+        self.assertEqual(self.cache.get(loader), [user('1')])
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_concurrent_misses_share_one_load(self):
+        loader = BlockingLoader([user('1')])
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get(loader))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        loader.started.wait(5)
+        loader.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, [[user('1')]] * 5)
+        self.assertEqual(loader.calls, 1)
+
+    def test_apply_patches_and_logs_the_change(self):
+        before = self.cache.store([user('1'), user('2')])
+        after = self.cache.apply(upserts=[user('2', 'y'), user('3')], removals=['1'])
+        self.assertEqual(self.cache.peek(), [user('2', 'y'), user('3')])
+        self.assertEqual(self.cache.changes_since(before, after),
+                         [(before, after, [user('2', 'y'), user('3')], ['1'])])
+        self.assertIsNone(self.cache.changes_since('unknown', after))
+
+    def test_same_content_gets_the_same_version(self):
+        self.assertEqual(self.cache.store([user('1')]), UserListCache('other').store([user('1')]))
+        self.assertNotEqual(self.cache.store([user('1')]), self.cache.store([user('2')]))
+
+    def test_refill_racing_a_write_does_not_store_the_pre_write_list(self):
+        loader = BlockingLoader([user('1', 'old')])
+        reader = threading.Thread(target=self.cache.get, args=(loader,))
+        reader.start()
+        loader.started.wait(5)
+
+        # The write cannot take the lock held by the refill, so it times out and invalidates.
+        with self.assertLogs('accounts', 'WARNING'):
+            self.assertIsNone(self.cache.apply(upserts=[user('1', 'new')]))
+        loader.release.set()
+        reader.join(5)
+
+        self.assertIsNone(self.cache.peek())
+        loader.users = [user('1', 'new')]
+        self.assertEqual(self.cache.get(loader), [user('1', 'new')])
+
+    def test_unlocked_refill_racing_a_patch_does_not_overwrite_it(self):
+        self.cache.store([user('1', 'old')])
+        loader = BlockingLoader([user('1', 'old')])
+        # The fallback load used when waiting for another worker's refill times out holds no lock.
+        reader = threading.Thread(target=self.cache._load, args=(loader,))
+        reader.start()
+        loader.started.wait(5)
+        self.cache.apply(upserts=[user('1', 'new')])
+        loader.release.set()
+        reader.join(5)
+        self.assertEqual(self.cache.peek(), [user('1', 'new')])
+
+    def test_async_refill_racing_a_write_does_not_store_the_pre_write_list(self):
+        async def run():
+            gate = asyncio.Event()
+
+            async def aloader():
+                await gate.wait()
+                return [user('1', 'old')]
+
+            refill = asyncio.ensure_future(self.cache.aget(lambda: [], aloader))
+            await asyncio.sleep(0.05)
+            await asyncio.to_thread(self.cache._bump_generation)
+            gate.set()
+            return await refill
+
+        self.assertEqual(asyncio.run(run()), [user('1', 'old')])
+        self.assertIsNone(self.cache.peek())
+
+    def test_stale_hit_refreshes_in_the_background(self):
+        self.cache.store([user('1', 'old')])
+        cache.set(self.cache.FRESH_KEY, time.time() - 1)
+        loader = BlockingLoader([user('1', 'new')])
+        loader.release.set()
+        self.assertEqual(self.cache.get(loader), [user('1', 'old')])
+        for _ in range(100):
+            if self.cache.stats()['refreshes']:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.cache.peek(), [user('1', 'new')])
@@ -0,0 +1,92 @@
+from django.urls import reverse
+from django.test import SimpleTestCase
+
+from ..benchmarks.fake_gotrue import fake_user
+from ..services.user_directory import UserDirectory
+from ..services.user_service_v1 import UserService
+from .helpers import SupabaseTestCase
+
+
+def person(user_id, email, first_name='', last_name='', **extra):
+    return {'id': user_id, 'email': email, 'first_name': first_name, 'last_name': last_name, **extra}
+
+
+class UserDirectoryTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = UserDirectory([
+            person('1', 'ann.lee@example.com', 'Ann', 'Lee'),
+            person('2', 'joanna@example.com', 'Joanna', 'Smith'),
+            person('3', 'bob@corp.test', 'Bob', 'Annesley'),
+            person('4', 'ann@example.com', 'Ann', 'Marie-Jones'),
+        ], version='v1')
+
+    def ids(self, users):
+        return [user['id'] for user in users]
+
+    def test_empty_query_lists_everyone_in_upstream_order(self):
+        self.assertEqual(self.ids(self.directory.search('  ')), ['1', '2', '3', '4'])
+
+    def test_substring_matches_are_ranked(self):
+        # Exact first name, then surname prefix, then a plain substring of "joanna".
+        self.assertEqual(self.ids(self.directory.search('ann')), ['1', '4', '3', '2'])
+
+    def test_short_terms_match_word_prefixes_only(self):
+        self.assertEqual(self.ids(self.directory.search('jo')), ['2', '4'])
+        self.assertEqual(self.directory.search('nn'), [])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.ids(self.directory.search('ann jones')), ['4'])
+        self.assertEqual(self.directory.search('ann nobody'), [])
+
+    def test_upsert_and_remove_are_searchable_immediately(self):
+        self.directory.search('smith')
+        self.directory.upsert(person('2', 'joanna@example.com', 'Joanna', 'Brown'), 'v2')
+        self.assertEqual(self.directory.search('smith'), [])
+        self.assertEqual(self.ids(self.directory.search('brown')), ['2'])
+        self.assertEqual(self.ids(self.directory.all()), ['1', '2', '3', '4'])
+
+        self.assertTrue(self.directory.remove('3', 'v3'))
+        self.assertFalse(self.directory.remove('3', 'v3'))
+        self.assertEqual(self.directory.search('bob'), [])
+        self.assertEqual(self.directory.version, 'v3')
+
+    def test_sync_reindexes_only_changes(self):
+        users = [self.directory.get(user_id) for user_id in ('1', '2', '4')]
+        users.append(person('5', 'new@example.com', 'New', 'Person'))
+        self.assertEqual(self.directory.sync(users, 'v2'), 2)
+        self.assertEqual(self.ids(self.directory.all()), ['1', '2', '4', '5'])
+        self.assertEqual(self.directory.sync(users, 'v3'), 0)
+
+    def test_compaction_keeps_results(self):
+        directory = UserDirectory([person(str(i), f'user{i}@example.com') for i in range(10)])
+        for round_ in range(30):
+            for i in range(10):
+                directory.upsert(person(str(i), f'user{i}.r{round_}@example.com'))
+        self.assertLess(directory._stale, 100)
+        self.assertEqual(self.ids(directory.search('r29')), [str(i) for i in range(10)])
+        self.assertEqual(directory.search('r28'), [])
+
+    def test_query_filters_and_sorts(self):
+        directory = UserDirectory([person('1', 'c@x.io', is_admin=True), person('2', 'a@x.io', is_admin=False),
+                                   person('3', 'b@x.io', is_admin=True)])
+        self.assertEqual(self.ids(directory.query(filters={'is_admin': True}, sort='-email')), ['1', '3'])
+        self.assertEqual(self.ids(directory.query(sort='email')), ['2', '3', '1'])
+
+
+class ListUsersViewTests(SupabaseTestCase):
+    USERS = 30
+
+    def test_search_pages_through_matches(self):
+        client = self.login()
+        response = client.get(reverse('accounts:list_users'), {'q': 'user1'})
+        self.assertEqual(response.status_code, 200)
+        # user1 and user10-user19
+        self.assertEqual(response.context['users'].paginator.count, 11)
+        self.assertIn('user1@example.com', [user['email'] for user in response.context['users'].paginator.object_list])
+
+    def test_directory_follows_writes(self):
+        client = self.login()
+        client.get(reverse('accounts:list_users'))
+        UserService().update_user(fake_user(7)['id'], {'user_metadata': {'first_name': 'Zebedee'}})
+        response = client.get(reverse('accounts:list_users'), {'q': 'zebedee'})
+        self.assertEqual([user['id'] for user in response.context['users']], [fake_user(7)['id']])
@@ -0,0 +1,39 @@
+import csv
+import io
+import zipfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..services.user_export import iter_csv, iter_xlsx
+
+FIELDS = ('email', 'first_name', 'is_admin')
+HOSTILE = ['=HYPERLINK("http://example.com")', '+1', '-2+3', '@SUM(A1)', '\tTab', '\rReturn']
+
+
+class UserExportTests(SimpleTestCase):
+    def rows(self, names):
+        return [{'email': f'user{index}@example.com', 'first_name': name, 'is_admin': index == 0}
+                for index, name in enumerate(names)]
+
+    def read_csv(self, chunks):
+        return list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+
+    def test_csv_escapes_formula_cells(self):
+        lines = self.read_csv(iter_csv(self.rows(HOSTILE + ['Ada', 'O-Neil']), FIELDS))
+        self.assertEqual(lines[0], list(FIELDS))
+        self.assertEqual([line[1] for line in lines[1:]], [f"'{name}" for name in HOSTILE] + ['Ada', 'O-Neil'])
+        self.assertEqual(lines[1][2], 'True')
+
+    def test_xlsx_escapes_formula_cells(self):
+        workbook = zipfile.ZipFile(io.BytesIO(b''.join(iter_xlsx(self.rows(['=1+1', 'Ada']), FIELDS))))
+        sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn("<t>'=1+1</t>", sheet)
+        self.assertIn('<t>Ada</t>', sheet)
+        self.assertIn('<c r="C2" t="b"><v>1</v></c>', sheet)
+
+    @mock.patch('accounts.services.user_export.EXPORT_CHUNK_ROWS', 2)
+    def test_csv_is_yielded_in_chunks(self):
+        chunks = list(iter_csv(self.rows(['A', 'B', 'C', 'D', 'E']), FIELDS))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(self.read_csv(chunks)), 6)
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+
+from ..services.user_cache import user_list_cache
+from ..services.user_import import build_user_payload
+from ..services.user_service_v1 import UserService
+from .helpers import SupabaseTestCase
+
+
+class ImportUsersTests(SupabaseTestCase):
+    USERS = 3
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+
+    def write(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+        return path
+
+    def run_import(self, path, *args):
+        out = StringIO()
+        call_command('import_users', path, '--rate', '0', *args, stdout=out)
+        return out.getvalue()
+
+    def test_csv_import_creates_users_and_skips_them_on_rerun(self):
+        path = self.write('users.csv', 'email,first_name,last_name,is_admin\n'
+                                       'Ann@Example.com,Ann,Lee,yes\n'
+                                       'bob@example.com,Bob,Ray,\n'
+                                       'not-an-email,X,Y,\n')
+        with self.assertLogs('accounts', 'ERROR'):
+            output = self.run_import(path)
+        self.assertIn('2 created, 0 already existed, 0 skipped (checkpoint), 1 failed', output)
+        emails = {user['email']: user for user in UserService().get_all_users()}
+        self.assertTrue(emails['ann@example.com']['user_metadata']['is_admin'])
+
+        with self.assertLogs('accounts', 'ERROR'):
+            self.assertIn('0 created, 0 already existed, 2 skipped (checkpoint), 1 failed', self.run_import(path))
+
+    def test_jsonl_counts_existing_and_malformed_lines(self):
+        path = self.write('users.jsonl', '\n'.join([
+            json.dumps({'email': 'user1@example.com'}),
+            json.dumps({'email': 'new@example.com', 'user_metadata': {'first_name': 'New'}}),
+            '{not json',
+            '[1, 2]',
+            '',
+        ]))
+        with self.assertLogs('accounts', 'ERROR') as logs:
+            output = self.run_import(path, '--workers', '2')
+        self.assertIn('1 created, 1 already existed, 0 skipped (checkpoint), 2 failed', output)
+        self.assertTrue(any('line 3' in line for line in logs.output))
+
+    def test_created_users_are_patched_into_a_warm_cache(self):
+        UserService().get_all_users()
+        version = user_list_cache.version()
+        path = self.write('users.jsonl', json.dumps({'email': 'warm@example.com'}) + '\n')
+        self.run_import(path)
+        self.assertIn('warm@example.com', [user['email'] for user in user_list_cache.peek()])
+        self.assertEqual(len(user_list_cache.changes_since(version, user_list_cache.version())), 1)
+
+    def test_missing_file_leaves_no_checkpoint(self):
+        path = os.path.join(self.dir, 'missing.csv')
+        with self.assertRaises(CommandError):
+            self.run_import(path)
+        self.assertFalse(os.path.exists(path + '.checkpoint'))
+
+    def test_payload_defaults(self):
+        payload = build_user_payload({'email': ' X@Y.io ', 'is_admin': 'no'}, confirm_email=True)
+        self.assertEqual(payload['email'], 'x@y.io')
+        self.assertTrue(payload['email_confirm'])
+        self.assertGreaterEqual(len(payload['password']), 16)
+        self.assertFalse(payload['user_metadata']['is_admin'])
@@ -0,0 +1,72 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from ..benchmarks.fake_gotrue import fake_user
+from ..models import SupabaseUser
+from ..services.user_mirror import UserMirror
+from ..services.user_service_v1 import UserService
+from .helpers import SupabaseTestCase
+
+
+class UserMirrorTests(SupabaseTestCase):
+    USERS = 23
+
+    def test_full_sync_creates_then_leaves_rows_alone(self):
+        stats = UserMirror(batch_size=7).sync()
+        self.assertEqual(stats, {'seen': 23, 'created': 23, 'updated': 0, 'deleted': 0})
+        self.assertEqual(UserMirror().sync(), {'seen': 23, 'created': 0, 'updated': 0, 'deleted': 0})
+        self.assertEqual(SupabaseUser.objects.get(email='user0@example.com').is_admin, True)
+
+    def test_full_sync_updates_and_deletes(self):
+        UserMirror().sync()
+        service = UserService()
+        service.update_user(fake_user(2)['id'], {'user_metadata': {'last_name': 'Renamed'}})
+        service.delete_user(fake_user(3)['id'])
+        self.assertEqual(UserMirror().sync(), {'seen': 22, 'created': 0, 'updated': 1, 'deleted': 1})
+        self.assertEqual(SupabaseUser.objects.get(pk=fake_user(2)['id']).last_name, 'Renamed')
+
+    def test_incremental_sync_writes_only_newer_rows_and_keeps_deletions(self):
+        UserMirror().sync()
+        service = UserService()
+        service.update_user(fake_user(4)['id'], {'user_metadata': {'first_name': 'Newer'}})
+        service.delete_user(fake_user(5)['id'])
+        stats = UserMirror().sync(full=False)
+        self.assertEqual((stats['updated'], stats['deleted']), (1, 0))
+        self.assertTrue(SupabaseUser.objects.filter(pk=fake_user(5)['id']).exists())
+
+    def test_rows_inserted_concurrently_are_not_counted_as_created(self):
+        mirror = UserMirror()
+        mirror.apply(upserts=[fake_user(1)])
+        rows = [mirror.to_model(fake_user(index)) for index in (1, 2)]
+        rows[0].last_name = 'Changed'
+        # Simulate the row appearing between the existence check and the insert.
+        with mock.patch.object(SupabaseUser.objects, 'in_bulk', return_value={}):
+            stats = {'created': 0, 'updated': 0}
+            mirror._write(rows, stats)
+        self.assertEqual(stats, {'created': 1, 'updated': 1})
+        self.assertEqual(SupabaseUser.objects.get(pk=fake_user(1)['id']).last_name, 'Changed')
+        self.assertEqual(SupabaseUser.objects.count(), 2)
+
+    def test_user_repeated_in_a_batch_is_written_once(self):
+        mirror = UserMirror()
+        stats = {'created': 0, 'updated': 0}
+        mirror._write([mirror.to_model(fake_user(1)), mirror.to_model(fake_user(1))], stats)
+        self.assertEqual(stats, {'created': 1, 'updated': 0})
+
+    def test_command_reports_counts(self):
+        out = StringIO()
+        call_command('sync_users', '--per-page', '5', stdout=out)
+        self.assertIn('23 seen, 23 created, 0 updated, 0 deleted', out.getvalue())
+
+    @override_settings(USERS_LOCAL_MIRROR=True)
+    def test_writes_go_through_to_the_mirror_and_list_view(self):
+        UserMirror().sync()
+        UserService().update_user(fake_user(6)['id'], {'user_metadata': {'first_name': 'Mirrored'}})
+        self.assertEqual(SupabaseUser.objects.get(pk=fake_user(6)['id']).first_name, 'Mirrored')
+
+        response = self.login().get(reverse('accounts:list_users'), {'q': 'MIRR'})
+        self.assertEqual([str(user['id']) for user in response.context['users']], [fake_user(6)['id']])
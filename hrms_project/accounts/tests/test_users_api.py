@@ -0,0 +1,63 @@
+from django.urls import reverse
+
+from ..benchmarks.fake_gotrue import fake_user
+from ..services.user_cache import user_list_cache
+from ..services.user_service_v1 import UserService
+from .helpers import SupabaseTestCase
+
+
+class UsersApiTests(SupabaseTestCase):
+    USERS = 12
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.login()
+        self.url = reverse('accounts:users_api')
+
+    def test_cursor_walks_every_user_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 5, 'fields': 'id,email'}
+            if cursor:
+                params['cursor'] = cursor
+            payload = self.client.get(self.url, params).json()
+            self.assertEqual(payload['count'], 12)
+            self.assertTrue(all(set(user) == {'id', 'email'} for user in payload['users']))
+            seen += [user['id'] for user in payload['users']]
+            cursor = payload['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, [fake_user(index)['id'] for index in range(12)])
+
+    def test_filters_and_sort(self):
+        payload = self.client.get(self.url, {'is_admin': 'true'}).json()
+        self.assertEqual([user['email'] for user in payload['users']], ['user0@example.com'])
+        payload = self.client.get(self.url, {'sort': '-email', 'limit': 2}).json()
+        self.assertEqual([user['email'] for user in payload['users']], ['user9@example.com', 'user8@example.com'])
+
+    def test_bad_parameters_are_rejected(self):
+        for params in ({'fields': 'password'}, {'sort': 'id'}, {'is_admin': 'maybe'},
+                       {'limit': 'ten'}, {'cursor': '!!'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_unchanged_page_revalidates_with_headers(self):
+        first = self.client.get(self.url, {'limit': 3})
+        etag = first['ETag']
+        second = self.client.get(self.url, {'limit': 3}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], etag)
+        self.assertEqual(second['Cache-Control'], 'private, no-cache')
+
+    def test_etag_survives_a_refill_of_unchanged_data(self):
+        # A worker with its own cache refills from the same upstream list and lands on the same version.
+        etag = self.client.get(self.url)['ETag']
+        user_list_cache.invalidate()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        UserService().update_user(fake_user(4)['id'], {'user_metadata': {'first_name': 'Changed'}})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
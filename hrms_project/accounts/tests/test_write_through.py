@@ -0,0 +1,66 @@
+from django.test import override_settings
+
+from ..benchmarks.fake_gotrue import fake_user
+from ..services import user_service
+from ..services.user_cache import user_entity_cache, user_list_cache
+from ..services.user_service_v1 import UserService
+from .helpers import SupabaseTestCase
+
+
+class WriteThroughTests(SupabaseTestCase):
+    USERS = 15
+
+    # No prefetch threads, so every listing request has been counted before the snapshot.
+    @override_settings(SUPABASE_USERS_PREFETCH=0)
+    def test_update_patches_the_cached_list_without_a_refetch(self):
+        service = UserService()
+        service.get_all_users()
+        requests = self.fake.requests
+        version = user_list_cache.version()
+
+        user_id = fake_user(5)['id']
+        service.update_user(user_id, {'user_metadata': {'first_name': 'Patched'}})
+        users = {user['id']: user for user in service.get_all_users()}
+
+        self.assertEqual(self.fake.requests, requests + 1)  # just the PUT
+        self.assertEqual(users[user_id]['user_metadata']['first_name'], 'Patched')
+        self.assertEqual(len(users), 15)
+        self.assertEqual([change[2][0]['id'] for change in
+                          user_list_cache.changes_since(version, user_list_cache.version())], [user_id])
+
+    def test_delete_drops_the_user_from_list_and_entity_cache(self):
+        service = UserService()
+        service.get_all_users()
+        user_id = fake_user(6)['id']
+        self.assertEqual(service.get_user_by_id(user_id)['id'], user_id)
+
+        service.delete_user(user_id)
+        self.assertNotIn(user_id, [user['id'] for user in service.get_all_users()])
+        self.assertIsNone(user_entity_cache.get(user_id))
+
+    def test_entity_cache_drops_users_changed_elsewhere(self):
+        service = UserService()
+        service.get_all_users()
+        user_id = fake_user(7)['id']
+        other_id = fake_user(8)['id']
+        service.get_user_by_id(user_id)
+        service.get_user_by_id(other_id)
+
+        # Another worker's write only reaches this one through the shared list's change log.
+        user_list_cache.apply(upserts=[dict(fake_user(7), email='moved@example.com')])
+        self.assertIsNone(user_entity_cache.get(user_id))
+        self.assertEqual(user_entity_cache.get(other_id)['id'], other_id)
+
+    def test_typed_service_shares_the_raw_list_and_version(self):
+        typed = user_service.UserService()
+        formatted = typed.get_all_users()
+        self.assertEqual(formatted[3], UserService.format_user_data(user_list_cache.peek()[3]))
+
+        user_id = fake_user(9)['id']
+        version = user_list_cache.version()
+        updated = typed.update_user(user_id, {'user_metadata': {'first_name': 'Typed'}})
+        self.assertEqual(updated['first_name'], 'Typed')
+        self.assertNotEqual(user_list_cache.version(), version)
+        raw = {user['id']: user for user in UserService().get_all_users()}
+        self.assertEqual(raw[user_id]['user_metadata']['first_name'], 'Typed')
+        self.assertEqual(user_entity_cache.get(user_id)['first_name'], 'Typed')
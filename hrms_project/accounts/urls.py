@@ -1,12 +1,17 @@
+from django.conf import settings
 from django.urls import path, include
-from .views import auth_views, dashboard_views, user_views, employee_views, leave_views, kyc_views
+from .views import auth_views, dashboard_views, user_views, async_user_views, employee_views, leave_views, kyc_views, health_views
 
 app_name = 'accounts'
 
+# Under an ASGI server the Supabase-bound user views can run as coroutines.
+user_io_views = async_user_views if settings.ASYNC_USER_VIEWS else user_views
+
 urlpatterns = [
     # Authentication URLs (Flattening)
     path('login/', auth_views.login_view, name='login'),
     path('logout/', auth_views.logout_view, name='logout'),
+    path('health/', health_views.supabase_health, name='supabase_health'),
 
     # Dashboard URLs
     path('dashboard/', include([
@@ -18,10 +23,15 @@ urlpatterns = [
     # User management URLs
     path('users/', include([
         path('create/', user_views.create_user_view, name='create_user'),
-        path('list/', user_views.list_users, name='list_users'),
-        path('update/<str:user_id>/', user_views.update_user, name='update_user'),
-        path('delete/<str:user_id>/', user_views.delete_user, name='delete_user'),
-        path('api/proxy-supabase/', user_views.proxy_supabase, name='proxy_supabase'),
+        path('list/', user_io_views.list_users, name='list_users'),
+        path('update/<str:user_id>/', user_io_views.update_user, name='update_user'),
+        path('delete/<str:user_id>/', user_io_views.delete_user, name='delete_user'),
+        path('api/proxy-supabase/', user_io_views.proxy_supabase, name='proxy_supabase'),
+        path('api/users/', user_views.users_api, name='users_api'),
+        path('api/export/', user_views.export_users, name='export_users'),
+        path('api/batch/', user_views.batch_users, name='batch_users'),
+        path('api/cache-stats/', user_views.user_cache_stats, name='user_cache_stats'),
+        path('api/rate-limit-stats/', user_views.rate_limit_stats, name='rate_limit_stats'),
     ])),
     
     # Employee URLs
@@ -40,5 +50,9 @@ urlpatterns = [
     path('kyc/', include([
         path('pending/', kyc_views.pending_kyc, name='pending_kyc'),
         path('reports/', kyc_views.kyc_reports, name='kyc_reports'),
+        path('applications/<int:application_id>/uploads/', kyc_views.kyc_upload_start, name='kyc_upload_start'),
+        path('uploads/<uuid:upload_id>/', kyc_views.kyc_upload, name='kyc_upload'),
+        path('documents/<int:document_id>/thumbnail/', kyc_views.kyc_document_thumbnail,
+             name='kyc_document_thumbnail'),
     ])),
 ]
@@ -1,23 +1,149 @@
+import hashlib
 import logging
+import math
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect
 from django.contrib import messages
 from functools import wraps
+from ..services.rate_limit import get_limiter
+from .session import aget_session_user, get_session_user
 
 logger = logging.getLogger(__name__)
 
+def _claims_admin(claims):
+    return bool(claims and (claims.get('user_metadata') or {}).get('is_admin', False))
+
 def admin_required(view_func):
     """
     Decorator to ensure that only admin users can access the view.
     If the user is not an admin, they are redirected to the home page with an error message.
+    Works with both sync and async views.
+
+    When ``SupabaseJWTMiddleware`` is active the decision comes from the
+    verified token claims; otherwise from the session payload.
     """
+    def deny(request, user):
+        logger.warning(f"Non-admin user {user} attempted to access admin-only view")
+        messages.error(request, "You don't have permission to access this page.")
+        return redirect('accounts:home')
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if hasattr(request, 'supabase_claims'):
+                is_admin = _claims_admin(request.supabase_claims)
+            else:
+                is_admin = ((await aget_session_user(request.session)) or {}).get('is_admin', False)
+            user = await request.auser()
+            if user.is_authenticated and is_admin:
+                return await view_func(request, *args, **kwargs)
+            return deny(request, user)
+        return async_wrapper
+
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        user_data = request.session.get('user', {})
-        is_admin = user_data.get('user_metadata', {}).get('is_admin', False)
+        if hasattr(request, 'supabase_claims'):
+            is_admin = _claims_admin(request.supabase_claims)
+        else:
+            is_admin = (get_session_user(request.session) or {}).get('is_admin', False)
         if request.user.is_authenticated and is_admin:
             return view_func(request, *args, **kwargs)
         else:
-            logger.warning(f"Non-admin user {request.user} attempted to access admin-only view")
-            messages.error(request, "You don't have permission to access this page.")
-            return redirect('accounts:home')
-    return wrapper
\ No newline at end of file
+            return deny(request, request.user)
+    return wrapper
+
+
+def client_ip(request):
+    """Rate limit key: the client address from ``RATE_LIMIT_IP_HEADER`` (first hop if a list)."""
+    value = request.META.get(settings.RATE_LIMIT_IP_HEADER) or request.META.get('REMOTE_ADDR') or ''
+    return value.split(',')[0].strip() or None
+
+def login_email(request):
+    """
+    Rate limit key: the email being signed in to, so one account can't be guessed at from many addresses.
+
+    The normalised address is hashed, so cache keys never carry raw email addresses.
+    """
+    email = (request.POST.get('email') or '').strip().lower()
+    return hashlib.sha256(email.encode('utf-8')).hexdigest() if email else None
+
+def everyone(request):
+    """Rate limit key shared by every request: caps the total rate sent upstream."""
+    return 'all'
+
+def _admission_delay(request, rules):
+    checks = []
+    for name, key_func in rules:
+        limiter = get_limiter(name)
+        key = key_func(request) if limiter else None
+        if key is not None:
+            checks.append((name, limiter, key))
+
+    # Every rule is checked before any is spent, so a request one rule turns away
+    # costs no tokens under the others.
+    for name, limiter, key in checks:
+        retry_after = limiter.check(key)
+        if retry_after:
+            logger.warning(f"Rate limit {name} rejected {request.method} {request.path}")
+            return retry_after
+
+    admitted = []
+    for name, limiter, key in checks:
+        retry_after = limiter.admit(key)
+        if retry_after:
+            # Lost a race for the last token since the check; hand back what was taken.
+            for earlier, earlier_key in admitted:
+                earlier.refund(earlier_key)
+            logger.warning(f"Rate limit {name} rejected {request.method} {request.path}")
+            return retry_after
+        admitted.append((limiter, key))
+    return 0
+
+def _too_many_requests(request, retry_after):
+    seconds = max(1, math.ceil(retry_after))
+    message = f"Too many requests. Try again in {seconds} seconds."
+    if request.content_type == 'application/json' or 'application/json' in request.headers.get('Accept', ''):
+        response = JsonResponse({'success': False, 'error': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain')
+    response['Retry-After'] = str(seconds)
+    return response
+
+def rate_limited(*rules, methods=None):
+    """
+    Decorator rejecting requests over any of ``rules`` with a 429 and ``Retry-After``.
+
+    Each rule is a ``(name, key_func)`` pair: ``name`` selects a limit from
+    ``settings.RATE_LIMITS`` and ``key_func(request)`` the bucket, or None to
+    skip the rule. Place it outermost so rejected requests cost no session or
+    Supabase work. ``methods`` restricts limiting to those HTTP methods.
+    Works with both sync and async views.
+    """
+    def decorator(view_func):
+        def limited(request):
+            return methods is None or request.method in methods
+
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if limited(request):
+                    retry_after = await sync_to_async(_admission_delay)(request, rules)
+                    if retry_after:
+                        return _too_many_requests(request, retry_after)
+                return await view_func(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if limited(request):
+                retry_after = _admission_delay(request, rules)
+                if retry_after:
+                    return _too_many_requests(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# Limits for the user-admin endpoints.
+ADMIN_RATE_LIMITS = (('admin_ip', client_ip), ('admin_global', everyone))
@@ -0,0 +1,76 @@
+"""
+Document checks run in worker processes.
+
+Nothing here imports Django, so pool workers start without settings or
+database connections; results go back to the parent as plain dictionaries.
+"""
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+READ_BLOCK = 1024 * 1024
+
+# Leading bytes of each accepted format, and the content types that may declare it.
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'%PDF-', 'pdf'),
+)
+FORMAT_CONTENT_TYPES = {
+    'jpeg': ('image/jpeg', 'image/jpg', 'image/pjpeg'),
+    'png': ('image/png',),
+    'pdf': ('application/pdf',),
+}
+
+
+def detect_format(head: bytes) -> Optional[str]:
+    for signature, name in SIGNATURES:
+        if head.startswith(signature):
+            return name
+    return None
+
+
+def _digest(path: str) -> Tuple[str, bytes, bytes]:
+    """Return the SHA-256 of the file with its first and last kilobyte, reading it once in blocks."""
+    sha256 = hashlib.sha256()
+    head = tail = b''
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(READ_BLOCK), b''):
+            if not head:
+                head = block[:1024]
+            sha256.update(block)
+            tail = (tail + block)[-1024:]
+    return sha256.hexdigest(), head, tail
+
+
+def inspect_document(path: str, content_type: str, thumbnail_path: str,
+                     thumbnail_size: Tuple[int, int] = (256, 256)) -> Dict[str, Any]:
+    """
+    Checksum, validate and (for images) thumbnail one uploaded document.
+
+    Returns a dictionary with ``sha256``, ``format``, ``width``, ``height``,
+    ``thumbnail`` (path or None) and ``error`` (None when the document is valid).
+    """
+    sha256, head, tail = _digest(path)
+    result = {'sha256': sha256, 'format': detect_format(head), 'width': None, 'height': None,
+              'thumbnail': None, 'error': None}
+    if result['format'] is None:
+        result['error'] = 'Unsupported file format; upload a JPEG, PNG or PDF.'
+    elif content_type not in FORMAT_CONTENT_TYPES[result['format']]:
+        result['error'] = f"Declared type {content_type} does not match the {result['format'].upper()} contents."
+    elif result['format'] == 'pdf':
+        if b'%%EOF' not in tail:
+            result['error'] = 'The PDF is truncated or damaged.'
+    else:
+        # Imported here: only image documents need Pillow.
+        from PIL import Image
+        try:
+            with Image.open(path) as image:
+                image.verify()
+            with Image.open(path) as image:
+                result['width'], result['height'] = image.size
+                image.thumbnail(thumbnail_size)
+                image.convert('RGB').save(thumbnail_path, 'JPEG', quality=80)
+            result['thumbnail'] = thumbnail_path
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+            result['error'] = f"The image could not be read: {e}"
+    return result
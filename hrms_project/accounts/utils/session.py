@@ -0,0 +1,48 @@
+"""
+Compact session payload for the signed-in Supabase user.
+
+Only what views and templates read is stored under ``session['user']``:
+``id``, ``email``, ``first_name`` and ``is_admin``. The access and refresh
+tokens are kept separately under ``session['access_token']`` and
+``session['refresh_token']`` for authorisation, refresh and sign-out.
+"""
+
+SESSION_USER_KEY = 'user'
+SESSION_TOKEN_KEY = 'access_token'
+SESSION_REFRESH_KEY = 'refresh_token'
+
+
+def compact_user(user_data):
+    metadata = user_data.get('user_metadata') or {}
+    return {
+        'id': user_data.get('id'),
+        'email': user_data.get('email'),
+        'first_name': metadata.get('first_name', ''),
+        'is_admin': bool(metadata.get('is_admin', False)),
+    }
+
+
+def _normalise(user):
+    # Sessions created before the compact schema still hold the full user dict.
+    if user and 'user_metadata' in user:
+        return compact_user(user)
+    return user
+
+
+def login_session(session, user_data):
+    session[SESSION_USER_KEY] = compact_user(user_data)
+    store_tokens(session, user_data)
+
+
+def store_tokens(session, tokens):
+    session[SESSION_TOKEN_KEY] = tokens['access_token']
+    if tokens.get('refresh_token'):
+        session[SESSION_REFRESH_KEY] = tokens['refresh_token']
+
+
+def get_session_user(session):
+    return _normalise(session.get(SESSION_USER_KEY))
+
+
+async def aget_session_user(session):
+    return _normalise(await session.aget(SESSION_USER_KEY))
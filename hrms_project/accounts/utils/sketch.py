@@ -0,0 +1,66 @@
+"""
+Mergeable quantile sketch with bounded relative error (the DDSketch bucketing).
+
+Values fall into logarithmic buckets ``ceil(log_gamma(value))``, so any
+quantile is returned within ``relative_accuracy`` of the true value and the
+number of buckets grows with the log of the value range, not the number of
+values. Two sketches merge by adding their bucket counts, which is what
+lets daily, per-reviewer sketches be combined into any report window.
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = 0.02, buckets: Optional[Dict[int, int]] = None):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = dict(buckets or {})
+        self.count = sum(self.buckets.values())
+
+    def _index(self, value: float) -> int:
+        # Everything up to one unit shares bucket 0.
+        return max(0, math.ceil(math.log(value) / self._log_gamma)) if value > 1 else 0
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1) if index else 1.0
+
+    def add(self, value: float, count: int = 1) -> None:
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        if self.buckets[index] <= 0:
+            del self.buckets[index]
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the ``q`` quantile (0..1), or None for an empty sketch."""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.buckets))
+
+    def to_json(self) -> Dict[str, int]:
+        # JSON object keys are strings.
+        return {str(index): count for index, count in self.buckets.items()}
+
+    @classmethod
+    def from_json(cls, data: Optional[Dict[str, int]], relative_accuracy: float = 0.02) -> 'QuantileSketch':
+        return cls(relative_accuracy, {int(index): count for index, count in (data or {}).items()})
+
+    @classmethod
+    def merged(cls, sketches: Iterable['QuantileSketch'], relative_accuracy: float = 0.02) -> 'QuantileSketch':
+        total = cls(relative_accuracy)
+        for sketch in sketches:
+            total.merge(sketch)
+        return total
@@ -3,4 +3,5 @@ from .dashboard_views import *
 from .user_views import *
 from .employee_views import *
 from .leave_views import *
-from .kyc_views import *
\ No newline at end of file
+from .kyc_views import *
+from .health_views import *
\ No newline at end of file
@@ -0,0 +1,139 @@
+import json
+from typing import Dict, Any, AsyncIterator
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST, require_http_methods
+from django.views.decorators.csrf import csrf_exempt
+from django.core.validators import validate_email
+from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.contrib import messages
+from ..models import SupabaseUser
+from ..services.async_user_service import AsyncUserService
+from ..utils.decorators import ADMIN_RATE_LIMITS, admin_required, rate_limited
+from ..exceptions import UserUpdateError, UserDeletionError, UserNotFoundException
+from .user_views import STREAM_CHUNK_SIZE, _paginate_users, _stream_error
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Template rendering may touch the session (messages, CSRF token), which is
+# synchronous-only, so it is pushed to a thread.
+arender = sync_to_async(render)
+
+async def _stream_users_json(first: Dict[str, Any], users: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    yield '{"users": [' + json.dumps(first, cls=DjangoJSONEncoder)
+    chunk = []
+    try:
+        async for user in users:
+            chunk.append(json.dumps(user, cls=DjangoJSONEncoder))
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield ',' + ','.join(chunk)
+                chunk = []
+    except Exception as e:
+        # As in the sync view: past the first page, failures end the body with an error member.
+        yield (',' + ','.join(chunk) if chunk else '') + _stream_error(e)
+        return
+    if chunk:
+        yield ',' + ','.join(chunk)
+    yield ']}'
+
+@rate_limited(*ADMIN_RATE_LIMITS)
+@login_required
+@csrf_exempt
+@require_POST
+async def proxy_supabase(request: HttpRequest) -> HttpResponse:
+    try:
+        user_service = AsyncUserService()
+        users = user_service.stream_users()
+        # Pull the first user eagerly so failures on the first page still surface as a 500.
+        first = await anext(users, None)
+        if first is None:
+            return JsonResponse({'users': []})
+        return StreamingHttpResponse(_stream_users_json(first, users), content_type='application/json')
+    except Exception as e:
+        logger.error(f"Failed to fetch users in proxy_supabase: {str(e)}")
+        return JsonResponse({'error': f'Failed to fetch users: {str(e)}'}, status=500)
+
+@rate_limited(*ADMIN_RATE_LIMITS)
+@login_required
+@admin_required
+async def list_users(request: HttpRequest) -> HttpResponse:
+    query: str = request.GET.get('q', '')
+    page: str = request.GET.get('page', '1')
+    user_service = AsyncUserService()
+
+    try:
+        if settings.USERS_LOCAL_MIRROR:
+            # Counting and slicing the queryset hit the database, so paging runs in a thread.
+            users_page = await sync_to_async(_paginate_users)(SupabaseUser.objects.search(query).formatted(), page)
+        else:
+            directory = await user_service.get_directory()
+            users_page = _paginate_users(directory.search(query), page)
+
+        return await arender(request, 'accounts/list_users.html', {'users': users_page, 'query': query})
+    except Exception as e:
+        logger.error(f"Error in list_users view: {str(e)}")
+        messages.error(request, "An error occurred while fetching users.")
+        return redirect('accounts:home')
+
+@rate_limited(*ADMIN_RATE_LIMITS)
+@login_required
+@admin_required
+async def update_user(request: HttpRequest, user_id: str) -> HttpResponse:
+    user_service = AsyncUserService()
+    try:
+        user = await user_service.get_user_by_id(user_id)
+    except UserNotFoundException as e:
+        messages.error(request, str(e))
+        return redirect('accounts:list_users')
+
+    if request.method == 'POST':
+        email: str = request.POST.get('email', '')
+        first_name: str = request.POST.get('first_name', '')
+        last_name: str = request.POST.get('last_name', '')
+        is_admin: bool = request.POST.get('is_admin') == 'on'
+
+        # Input validation
+        try:
+            validate_email(email)
+        except ValidationError:
+            messages.error(request, "Invalid email address.")
+            return await arender(request, 'accounts/update_user.html', {'user': user})
+
+        if not first_name or not last_name:
+            messages.error(request, "First name and last name are required.")
+            return await arender(request, 'accounts/update_user.html', {'user': user})
+
+        updated_data: Dict[str, Any] = {
+            'email': email,
+            'user_metadata': {
+                'first_name': first_name,
+                'last_name': last_name,
+                'is_admin': is_admin
+            }
+        }
+        try:
+            await user_service.update_user(user_id, updated_data)
+            messages.success(request, "User updated successfully.")
+            return redirect('accounts:list_users')
+        except UserUpdateError as e:
+            messages.error(request, f"Failed to update user: {str(e)}")
+
+    return await arender(request, 'accounts/update_user.html', {'user': user})
+
+@rate_limited(*ADMIN_RATE_LIMITS)
+@login_required
+@admin_required
+@require_http_methods(["DELETE"])
+async def delete_user(request: HttpRequest, user_id: str) -> JsonResponse:
+    user_service = AsyncUserService()
+    try:
+        await user_service.delete_user(user_id)
+        return JsonResponse({"success": True, "message": "User deleted successfully"})
+    except UserDeletionError as e:
+        logger.error(f"Error deleting user {user_id}: {str(e)}")
+        return JsonResponse({"success": False, "message": str(e)}, status=500)
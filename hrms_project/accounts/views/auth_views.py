@@ -6,10 +6,14 @@ from django.contrib.auth import login as auth_login, logout as auth_logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from ..services.auth_service import AuthService
+from ..utils.decorators import client_ip, everyone, login_email, rate_limited
+from ..utils.session import SESSION_TOKEN_KEY, login_session
 from ..exceptions import AuthenticationError
 
 logger = logging.getLogger(__name__)
 
+@rate_limited(('login_ip', client_ip), ('login_email', login_email), ('login_global', everyone),
+              methods=('POST',))
 def login_view(request):
         # Clear any existing messages
     storage = get_messages(request)
@@ -25,12 +29,11 @@ def login_view(request):
         
         try:
             user_data = AuthService.login(email, password)
-            request.session['user'] = user_data
-            request.session['is_admin'] = user_data.get('user_metadata', {}).get('is_admin', False)
-            request.session['access_token'] = user_data['access_token']
             messages.success(request, f"Welcome back, {email}!")
             django_user, created = User.objects.get_or_create(username=email)
             auth_login(request, django_user)
+            # Set after auth_login, which flushes the session when a different user signs in.
+            login_session(request.session, user_data)
             return redirect('accounts:home')
         except AuthenticationError as e:
             logger.error(f"Login error for user {email}: {str(e)}")
@@ -41,7 +44,7 @@ def login_view(request):
 @login_required
 def logout_view(request):
     try:
-        AuthService.logout()
+        AuthService.logout(request.session.get(SESSION_TOKEN_KEY))
         auth_logout(request)
         messages.success(request, "You have been logged out successfully.")
     except Exception as e:
@@ -1,13 +1,14 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from ..utils.session import get_session_user
 
 @login_required
 def home_view(request):
-    user_data = request.session.get('user')
+    user_data = get_session_user(request.session)
 
     if user_data:
-        if user_data['user_metadata'].get('is_admin'):
+        if user_data['is_admin']:
             return redirect('accounts:admin_dashboard')
         else:
             return redirect('accounts:user_dashboard')
@@ -18,9 +19,9 @@ def home_view(request):
     
 @login_required
 def admin_dashboard(request):
-    user_data = request.session.get('user')
+    user_data = get_session_user(request.session)
 
-    if user_data and user_data['user_metadata'].get('is_admin'):
+    if user_data and user_data['is_admin']:
         return render(request, 'accounts/admin_dashboard.html', {'user_data': user_data})
     else:
         messages.error(request, "You do not have permission to access this page.")
@@ -28,5 +29,5 @@ def admin_dashboard(request):
 
 @login_required
 def user_dashboard(request):
-    user_data = request.session.get('user')
+    user_data = get_session_user(request.session)
     return render(request, 'accounts/user_dashboard.html', {'user_data': user_data})
\ No newline at end of file
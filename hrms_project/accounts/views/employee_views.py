@@ -1,11 +1,75 @@
-from django.shortcuts import render
+import base64
+import datetime
+import json
+import logging
+from typing import Any, Dict
+from django.shortcuts import render, redirect
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest, HttpResponse
+from ..forms.employee_forms import EmployeeForm
+from ..models import Department, Employee
+from ..utils.decorators import admin_required
+
+logger = logging.getLogger(__name__)
+
+EMPLOYEE_PAGE_SIZE = 50
+
+def _encode_cursor(employee: Employee) -> str:
+    payload = json.dumps({'join_date': employee.join_date.isoformat(), 'id': employee.pk}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(payload, dict) or not isinstance(payload.get('id'), int):
+        raise ValueError("Malformed cursor")
+    return {'join_date': datetime.date.fromisoformat(payload['join_date']), 'pk': payload['id']}
 
 @login_required
-def add_employee(request):
-    return render(request, 'accounts/add_employee.html')
+@admin_required
+def add_employee(request: HttpRequest) -> HttpResponse:
+    form = EmployeeForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        employee = form.save()
+        logger.info(f"Employee {employee.employee_code} created")
+        messages.success(request, f"Employee {employee.full_name} added successfully.")
+        return redirect('accounts:list_employees')
+    return render(request, 'accounts/add_employee.html', {'form': form})
 
 @login_required
-def list_employees(request):
-    employees = []  # Replace with actual query to fetch employees
-    return render(request, 'accounts/list_employees.html', {'employees': employees})
\ No newline at end of file
+@admin_required
+def list_employees(request: HttpRequest) -> HttpResponse:
+    """
+    Keyset-paginated employee list, newest joiners first.
+
+    ``cursor`` is the last row of the previous page, so each page is an index
+    seek instead of an OFFSET scan; ``department`` and ``status`` filter.
+    """
+    department = request.GET.get('department', '')
+    status = request.GET.get('status', '')
+    employees = Employee.objects.listing()
+    if department.isdigit():
+        employees = employees.filter(department_id=int(department))
+    if status:
+        employees = employees.filter(status=status)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            employees = employees.after(**_decode_cursor(cursor))
+        except (ValueError, TypeError, KeyError):
+            messages.error(request, "Invalid page link; showing the first page.")
+            cursor = None
+
+    # One extra row tells whether a next page exists without a COUNT query.
+    page = list(employees[:EMPLOYEE_PAGE_SIZE + 1])
+    next_cursor = _encode_cursor(page[EMPLOYEE_PAGE_SIZE - 1]) if len(page) > EMPLOYEE_PAGE_SIZE else None
+    return render(request, 'accounts/list_employees.html', {
+        'employees': page[:EMPLOYEE_PAGE_SIZE],
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+        'departments': Department.objects.only('id', 'name'),
+        'status_choices': Employee.STATUS_CHOICES,
+        'department': department,
+        'status': status,
+    })
@@ -0,0 +1,11 @@
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.http import require_GET
+from ..supabase_client import health_probe
+
+@require_GET
+def supabase_health(request: HttpRequest) -> JsonResponse:
+    """
+    Report the last background Supabase health check without contacting Supabase.
+    """
+    status = health_probe.status()
+    return JsonResponse(status, status=503 if status['healthy'] is False else 200)
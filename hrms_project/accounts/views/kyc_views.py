@@ -1,12 +1,142 @@
-from django.shortcuts import render
+import json
+import logging
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpRequest, JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_POST, require_http_methods
+from django.conf import settings
+from ..exceptions import KYCError, KYCUploadConflictError, KYCUploadError
+from ..models import KYCApplication, KYCDocument
+from ..services.kyc_documents import KYCUploads, open_thumbnail
+from ..services.kyc_metrics import KYCMetrics
+from ..services.kyc_queue import KYCQueue
+from ..utils.decorators import admin_required
+from ..utils.session import get_session_user
+
+logger = logging.getLogger(__name__)
 
 @login_required
+@admin_required
 def pending_kyc(request):
-    pending_applications = []  # Replace with actual logic to get pending KYC applications
-    return render(request, 'accounts/pending_kyc.html', {'pending_applications': pending_applications})
+    """
+    The reviewer's leased KYC applications; POST claims more, decides or releases one.
+    """
+    queue = KYCQueue()
+    reviewer = (get_session_user(request.session) or {}).get('email') or request.user.get_username()
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        application_id = request.POST.get('application_id', '')
+        try:
+            if action == 'claim':
+                claimed = queue.claim(reviewer)
+                messages.success(request, f"Claimed {len(claimed)} applications.")
+            elif not application_id.isdigit():
+                raise KYCError("No application selected.")
+            elif action in (KYCApplication.STATUS_APPROVED, KYCApplication.STATUS_REJECTED):
+                queue.decide(int(application_id), reviewer, action, request.POST.get('notes', ''))
+                messages.success(request, f"Application {application_id} {action}.")
+            elif action == 'renew':
+                queue.renew(int(application_id), reviewer)
+            elif action == 'release':
+                queue.release(int(application_id), reviewer)
+            else:
+                raise KYCError(f"Unknown action {action!r}")
+        except KYCError as e:
+            messages.error(request, str(e))
+        return redirect('accounts:pending_kyc')
+
+    pending_applications = queue.leased(reviewer)
+    documents = KYCDocument.objects.filter(application__in=pending_applications).only(
+        'id', 'application_id', 'original_name', 'status', 'detected_format', 'sha256', 'thumbnail_path',
+        'processing_error')
+    by_application = {}
+    for document in documents:
+        by_application.setdefault(document.application_id, []).append(document)
+    for application in pending_applications:
+        application.document_list = by_application.get(application.id, [])
+    return render(request, 'accounts/pending_kyc.html', {
+        'pending_applications': pending_applications,
+        'available_count': KYCApplication.objects.available(timezone.now()).count(),
+    })
+
+def _can_access(request: HttpRequest, application: KYCApplication) -> bool:
+    """Admins, and the employee the application belongs to."""
+    user = get_session_user(request.session) or {}
+    if user.get('is_admin'):
+        return True
+    return bool(user.get('id')) and str(application.employee.user_id) == str(user['id'])
+
+def _upload_state(document: KYCDocument) -> dict:
+    return {
+        'upload_id': str(document.upload_id),
+        'offset': document.received_bytes,
+        'size': document.size,
+        'status': document.status,
+        'chunk_size': settings.KYC_UPLOAD_CHUNK_BYTES,
+    }
+
+@login_required
+@require_POST
+def kyc_upload_start(request: HttpRequest, application_id: int) -> JsonResponse:
+    """
+    Begin a chunked upload: JSON ``{"name", "content_type", "size"}`` in, upload id and offset out.
+    """
+    application = get_object_or_404(KYCApplication.objects.select_related('employee'), pk=application_id)
+    if not _can_access(request, application):
+        return JsonResponse({'error': 'Not allowed'}, status=403)
+    try:
+        payload = json.loads(request.body)
+        document = KYCUploads().start(application, str(payload['name']), str(payload['content_type']),
+                                      int(payload['size']))
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Expected JSON with name, content_type and size'}, status=400)
+    except KYCUploadError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(_upload_state(document), status=201)
+
+@login_required
+@require_http_methods(["GET", "PUT"])
+def kyc_upload(request: HttpRequest, upload_id: str) -> JsonResponse:
+    """
+    GET reports the offset to resume from. PUT appends the request body at the ``Upload-Offset`` header;
+    the body is streamed to disk, never read into memory whole.
+    """
+    document = get_object_or_404(KYCDocument.objects.select_related('application__employee'), upload_id=upload_id)
+    if not _can_access(request, document.application):
+        return JsonResponse({'error': 'Not allowed'}, status=403)
+    if request.method == 'PUT':
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return JsonResponse({'error': 'Upload-Offset and Content-Length headers are required'}, status=400)
+        try:
+            document = KYCUploads().append(document, offset, request, length)
+        except KYCUploadConflictError as e:
+            document.refresh_from_db()
+            return JsonResponse({'error': str(e), **_upload_state(document)}, status=409)
+        except KYCUploadError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(_upload_state(document))
+
+@login_required
+def kyc_document_thumbnail(request: HttpRequest, document_id: int) -> FileResponse:
+    document = get_object_or_404(KYCDocument.objects.select_related('application__employee'), pk=document_id)
+    if not _can_access(request, document.application):
+        raise Http404("No thumbnail")
+    thumbnail = open_thumbnail(document)
+    if thumbnail is None:
+        raise Http404("No thumbnail")
+    return FileResponse(thumbnail, content_type='image/jpeg')
 
 @login_required
+@admin_required
 def kyc_reports(request):
-    kyc_report_data = []  # Replace with actual logic to get KYC report data
-    return render(request, 'accounts/kyc_reports.html', {'kyc_report_data': kyc_report_data})
\ No newline at end of file
+    """
+    Turnaround percentiles, approval rates and backlog age per day and reviewer, from precomputed metrics.
+    """
+    days = request.GET.get('days', '30')
+    days = min(int(days), 366) if days.isdigit() and int(days) > 0 else 30
+    return render(request, 'accounts/kyc_reports.html', {'kyc_report_data': KYCMetrics().report(days)})
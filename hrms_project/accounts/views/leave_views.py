@@ -1,12 +1,85 @@
-from django.shortcuts import render
+import csv
+import datetime
+import logging
+from django.http import StreamingHttpResponse
+from django.shortcuts import render, redirect
+from django.utils import timezone
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from ..exceptions import LeaveRequestError
+from ..services.leave_rollup import LeaveRollups
+from ..services.leave_service import LeaveService
+from ..utils.decorators import admin_required
+from ..utils.session import get_session_user
+
+logger = logging.getLogger(__name__)
 
 @login_required
+@admin_required
 def approve_leaves(request):
-    leave_requests = []  # Replace with actual query to fetch leave requests
+    leave_service = LeaveService()
+    if request.method == 'POST':
+        decided_by = (get_session_user(request.session) or {}).get('email', '')
+        request_id = request.POST.get('approve') or request.POST.get('reject')
+        try:
+            if not (request_id or '').isdigit():
+                raise LeaveRequestError("No leave request selected.")
+            if request.POST.get('approve'):
+                leave_service.approve(int(request_id), decided_by)
+                messages.success(request, "Leave request approved.")
+            else:
+                leave_service.reject(int(request_id), decided_by)
+                messages.success(request, "Leave request rejected.")
+        except LeaveRequestError as e:
+            messages.error(request, str(e))
+        return redirect('accounts:approve_leaves')
+
+    leave_requests = leave_service.pending_requests()
+    balances = leave_service.balances_for(leave_requests)
+    for leave in leave_requests:
+        leave.balance = balances.get((leave.employee_id, leave.leave_type_id), 0.0)
     return render(request, 'accounts/approve_leaves.html', {'leave_requests': leave_requests})
 
+class _Echo:
+    """File-like object whose write returns the line, so csv.writer can feed a generator."""
+    def write(self, value):
+        return value
+
+def _stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+def _report_range(request):
+    today = timezone.localdate()
+    try:
+        start = datetime.date.fromisoformat(request.GET.get('start', ''))
+    except ValueError:
+        start = today.replace(day=1)
+    try:
+        end = datetime.date.fromisoformat(request.GET.get('end', ''))
+    except ValueError:
+        end = today
+    return start, max(start, end)
+
 @login_required
+@admin_required
 def leave_reports(request):
-    reports = []  # Replace with actual logic to generate reports
-    return render(request, 'accounts/leave_reports.html', {'reports': reports})
\ No newline at end of file
+    """
+    Leave taken per department and leave type, read from the daily rollups.
+
+    ``format=csv`` streams the day-level rows for the range instead.
+    """
+    rollups = LeaveRollups()
+    start, end = _report_range(request)
+    if request.GET.get('format') == 'csv':
+        rows = rollups.iter_daily(start, end)
+        response = StreamingHttpResponse(
+            _stream_csv(['day', 'department', 'leave_type', 'days', 'employees'], rows),
+            content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="leave-report-{start}-{end}.csv"'
+        return response
+
+    reports = rollups.summary(start, end)
+    return render(request, 'accounts/leave_reports.html', {'reports': reports, 'start': start, 'end': end})
@@ -1,32 +1,256 @@
-from typing import Dict, Any
+import base64
+import hashlib
+import json
+from itertools import chain
+from typing import Dict, Any, Iterator, List, Optional
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse, JsonResponse
-from django.views.decorators.http import require_POST, require_http_methods
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.text import compress_sequence
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
+from django.conf import settings
 from django.contrib import messages
+from ..models import SupabaseUser
 from ..services.user_service_v1 import UserService
-from ..utils.decorators import admin_required
+from ..services.user_batch import UserBatch
+from ..services.rate_limit import rate_limit_stats as limiter_stats
+from ..services.user_cache import user_list_cache
+from ..services.user_export import EXPORT_FORMATS, export_rows
+from ..utils.decorators import ADMIN_RATE_LIMITS, admin_required, rate_limited
 from ..exceptions import UserCreationError, UserUpdateError, UserDeletionError, UserNotFoundException
 import logging
 
 logger = logging.getLogger(__name__)
 
+STREAM_CHUNK_SIZE = 500
+
+API_FIELDS = ('id', 'email', 'is_admin', 'first_name', 'last_name', 'created_at', 'last_sign_in_at', 'email_confirmed')
+API_SORT_FIELDS = ('email', 'first_name', 'last_name', 'created_at', 'last_sign_in_at')
+API_FILTER_FIELDS = ('is_admin', 'email_confirmed')
+API_DEFAULT_LIMIT = 50
+API_MAX_LIMIT = 500
+
+def _stream_error(e: Exception) -> str:
+    """Close a streamed ``{"users": [...`` document with an ``error`` member."""
+    logger.error(f"Failed to fetch users while streaming: {str(e)}")
+    return '], "error": ' + json.dumps(f'Failed to fetch users: {str(e)}') + '}'
+
+def _stream_users_json(users: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Serialise users as a ``{"users": [...]}`` document, a chunk of rows at a time.
+
+    The 200 status is sent before later pages are fetched, so a failure
+    mid-stream ends the document with an ``error`` member rather than
+    truncating it; clients must treat a body with ``error`` as incomplete.
+    """
+    yield '{"users": ['
+    separator = ''
+    chunk: List[str] = []
+    try:
+        for user in users:
+            chunk.append(json.dumps(user, cls=DjangoJSONEncoder))
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield separator + ','.join(chunk)
+                separator, chunk = ',', []
+    except Exception as e:
+        yield (separator + ','.join(chunk) if chunk else '') + _stream_error(e)
+        return
+    yield (separator + ','.join(chunk) if chunk else '') + ']}'
+
+def _encode_cursor(after: str, offset: int) -> str:
+    payload = json.dumps({'after': after, 'offset': offset}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(payload, dict) or not isinstance(payload.get('offset'), int) or payload['offset'] < 0:
+        raise ValueError("Malformed cursor")
+    return payload
+
+def _cursor_start(users: List[Dict[str, Any]], cursor: Optional[Dict[str, Any]]) -> int:
+    """Position just after the cursor's last user, re-seeking by id if the list shifted."""
+    if cursor is None:
+        return 0
+    offset, after = cursor['offset'], cursor.get('after')
+    if 0 < offset <= len(users) and users[offset - 1]['id'] == after:
+        return offset
+    for index, user in enumerate(users):
+        if user['id'] == after:
+            return index + 1
+    return min(offset, len(users))
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in ('1', 'true', 'yes'):
+        return True
+    if lowered in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"Invalid boolean value: {value}")
+
+@rate_limited(*ADMIN_RATE_LIMITS)
+@login_required
+@admin_required
+@require_GET
+def users_api(request: HttpRequest) -> HttpResponse:
+    """
+    Cursor-paginated JSON listing of users.
+
+    Query parameters: ``q`` (search), ``is_admin``/``email_confirmed`` (filters),
+    ``sort`` (field, ``-`` prefixed for descending), ``fields`` (comma-separated
+    projection), ``limit`` and ``cursor``. Responses carry a strong ETag derived
+    from the content-based directory version, so unchanged pages revalidate as
+    304 on any worker.
+    """
+    params = request.GET
+    try:
+        fields = [field for field in params.get('fields', '').split(',') if field] or list(API_FIELDS)
+        unknown = [field for field in fields if field not in API_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        sort = params.get('sort') or None
+        if sort and sort.lstrip('-') not in API_SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort.lstrip('-')}")
+        filters = {field: _parse_bool(params[field]) for field in API_FILTER_FIELDS if params.get(field)}
+        limit = min(max(int(params.get('limit', API_DEFAULT_LIMIT)), 1), API_MAX_LIMIT)
+        cursor = _decode_cursor(params['cursor']) if params.get('cursor') else None
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        directory = UserService().get_directory()
+    except Exception as e:
+        logger.error(f"Failed to load users in users_api: {str(e)}")
+        return JsonResponse({'error': f'Failed to fetch users: {str(e)}'}, status=500)
+
+    etag = None
+    if directory.version is not None:
+        fingerprint = json.dumps([directory.version, sorted(params.lists())], separators=(',', ':'))
+        etag = '"%s"' % hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            not_modified['Cache-Control'] = 'private, no-cache'
+            return not_modified
+
+    users = directory.query(params.get('q', ''), filters, sort)
+    start = _cursor_start(users, cursor)
+    page = users[start:start + limit]
+    end = start + len(page)
+    response = JsonResponse({
+        'users': [{field: user.get(field) for field in fields} for user in page],
+        'count': len(users),
+        'next_cursor': _encode_cursor(page[-1]['id'], end) if page and end < len(users) else None,
+    })
+    if etag:
+        response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+@rate_limited(*ADMIN_RATE_LIMITS)
+@login_required
+@admin_required
+@require_POST
+def batch_users(request: HttpRequest) -> JsonResponse:
+    """
+    Apply one operation to many users: ``{"operation": ..., "ids": [...], "user_metadata": {...}}``.
+
+    Operations are ``delete``, ``set_admin``, ``unset_admin``, ``toggle_admin`` and
+    ``update_metadata``. Items run concurrently and the response reports each one.
+    """
+    try:
+        payload = json.loads(request.body)
+        operation = payload.get('operation')
+        user_ids = payload.get('ids')
+        if not isinstance(user_ids, list) or not all(isinstance(user_id, str) for user_id in user_ids):
+            raise ValueError("ids must be a list of user ids")
+        if len(user_ids) > settings.USER_BATCH_MAX_ITEMS:
+            raise ValueError(f"At most {settings.USER_BATCH_MAX_ITEMS} users per batch")
+        results = UserBatch().run(operation, user_ids, payload.get('user_metadata'))
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    succeeded = sum(result['success'] for result in results)
+    return JsonResponse({
+        'success': succeeded == len(results),
+        'operation': operation,
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results,
+    })
+
+@login_required
+@admin_required
+@require_GET
+def user_cache_stats(request: HttpRequest) -> JsonResponse:
+    """Report this worker's user cache counters and the shared cache version."""
+    return JsonResponse({'version': user_list_cache.version(), 'stats': user_list_cache.stats()})
+
+@login_required
+@admin_required
+@require_GET
+def rate_limit_stats(request: HttpRequest) -> JsonResponse:
+    """Report this worker's admitted/rejected counts for each rate limit."""
+    return JsonResponse({'limits': settings.RATE_LIMITS, 'stats': limiter_stats()})
+
+@rate_limited(*ADMIN_RATE_LIMITS)
 @login_required
 @csrf_exempt
 @require_POST
-def proxy_supabase(request: HttpRequest) -> JsonResponse:
+def proxy_supabase(request: HttpRequest) -> HttpResponse:
     try:
         user_service = UserService()
-        formatted_users = user_service.get_all_users()
-        return JsonResponse({'users': formatted_users})
+        users = user_service.stream_users()
+        # Pull the first user eagerly so failures on the first page still surface as a 500;
+        # later pages report failures in the body (see _stream_users_json).
+        first = next(users, None)
+        if first is not None:
+            users = chain([first], users)
+        return StreamingHttpResponse(_stream_users_json(users), content_type='application/json')
     except Exception as e:
         logger.error(f"Failed to fetch users in proxy_supabase: {str(e)}")
         return JsonResponse({'error': f'Failed to fetch users: {str(e)}'}, status=500)
 
+@rate_limited(*ADMIN_RATE_LIMITS)
+@login_required
+@admin_required
+@require_GET
+def export_users(request: HttpRequest) -> HttpResponse:
+    """Stream the user directory, filtered like ``list_users``, as CSV or XLSX."""
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+    writer, content_type = EXPORT_FORMATS[export_format]
+    try:
+        chunks = writer(export_rows(request.GET.get('q', '')))
+        # XLSX is already deflated; CSV is gzipped chunk by chunk when the client accepts it.
+        gzipped = export_format == 'csv' and 'gzip' in request.headers.get('Accept-Encoding', '')
+        response = StreamingHttpResponse(compress_sequence(chunks) if gzipped else chunks, content_type=content_type)
+    except Exception as e:
+        logger.error(f"Error in export_users view: {str(e)}")
+        return JsonResponse({'error': f'Failed to export users: {str(e)}'}, status=500)
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    response['Content-Disposition'] = f'attachment; filename="users.{export_format}"'
+    return response
+
+def _paginate_users(users, page: str):
+    paginator = Paginator(users, 10)
+    try:
+        return paginator.page(page)
+    except PageNotAnInteger:
+        return paginator.page(1)
+    except EmptyPage:
+        return paginator.page(paginator.num_pages)
+
+@rate_limited(*ADMIN_RATE_LIMITS)
 @login_required
 @admin_required
 def list_users(request: HttpRequest) -> HttpResponse:
@@ -35,19 +259,11 @@ def list_users(request: HttpRequest) -> HttpResponse:
     user_service = UserService()
     
     try:
-        users = user_service.get_all_users()
-        if query:
-            query = query.lower()
-            users = [user for user in users if query in user['email'].lower()]
-
-        formatted_users = [user_service.format_user(user) for user in users]
-        paginator = Paginator(formatted_users, 10)
-        try:
-            users_page = paginator.page(page)
-        except PageNotAnInteger:
-            users_page = paginator.page(1)
-        except EmptyPage:
-            users_page = paginator.page(paginator.num_pages)
+        if settings.USERS_LOCAL_MIRROR:
+            users_page = _paginate_users(SupabaseUser.objects.search(query).formatted(), page)
+        else:
+            directory = user_service.get_directory()
+            users_page = _paginate_users(directory.search(query), page)
 
         return render(request, 'accounts/list_users.html', {'users': users_page, 'query': query})
     except Exception as e:
@@ -55,6 +271,7 @@ def list_users(request: HttpRequest) -> HttpResponse:
         messages.error(request, "An error occurred while fetching users.")
         return redirect('accounts:home')
 
+@rate_limited(*ADMIN_RATE_LIMITS)
 @login_required
 @admin_required
 def create_user_view(request: HttpRequest) -> HttpResponse:
@@ -102,6 +319,7 @@ def create_user_view(request: HttpRequest) -> HttpResponse:
 
     return render(request, 'accounts/create_user.html')
 
+@rate_limited(*ADMIN_RATE_LIMITS)
 @login_required
 @admin_required
 def update_user(request: HttpRequest, user_id: str) -> HttpResponse:
@@ -146,6 +364,7 @@ def update_user(request: HttpRequest, user_id: str) -> HttpResponse:
     
     return render(request, 'accounts/update_user.html', {'user': user})
 
+@rate_limited(*ADMIN_RATE_LIMITS)
 @login_required
 @admin_required
 @require_http_methods(["DELETE"])
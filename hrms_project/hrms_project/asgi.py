@@ -3,6 +3,10 @@ ASGI config for hrms_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Set ``ASYNC_USER_VIEWS=True`` when serving through this entry point (e.g.
+``uvicorn hrms_project.asgi:application``) so the Supabase-bound user views
+run as coroutines instead of occupying a thread per in-flight request.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
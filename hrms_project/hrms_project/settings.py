@@ -16,8 +16,119 @@ sys.path.insert(0, str(ACCOUNTS_APP_DIR))
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', 'your-fallback-secret-key')
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Cache shared by every worker: 'file' by default, 'db' (run `manage.py createcachetable`) or
+# 'redis' at REDIS_URL. Only Redis makes the refill lock and rate-limit windows atomic across
+# workers (`check --deploy` warns otherwise); 'locmem' is per process, for opt-in single-process use.
+# Bump CACHE_VERSION to drop every cached entry on deploy.
+REDIS_URL = os.getenv('REDIS_URL', '')
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'redis' if REDIS_URL else 'file')
+CACHE_BACKENDS = {
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.django_cache')),
+        # Per-user entries would otherwise push the user list out at the default 300 entries.
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '20000'))},
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'hrms_cache',
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '20000'))},
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '20000'))},
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'hrms'),
+        'VERSION': int(os.getenv('CACHE_VERSION', '1')),
+        'TIMEOUT': 300,
+    }
+}
+
+# Local verification of Supabase access tokens (HS256, the project's JWT secret from
+# Settings > API). Leave SUPABASE_JWT_SECRET empty to disable SupabaseJWTMiddleware.
+SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET', '')
+SUPABASE_JWT_AUDIENCE = os.getenv('SUPABASE_JWT_AUDIENCE', 'authenticated')
+SUPABASE_JWT_LEEWAY = float(os.getenv('SUPABASE_JWT_LEEWAY', '30'))  # seconds of clock skew
+SUPABASE_JWT_REFRESH_MARGIN = float(os.getenv('SUPABASE_JWT_REFRESH_MARGIN', '300'))  # refresh this close to expiry
+SUPABASE_JWT_CACHE_SIZE = int(os.getenv('SUPABASE_JWT_CACHE_SIZE', '4096'))  # verified tokens kept per process
+
+# Supabase admin API
+SUPABASE_USERS_PER_PAGE = int(os.getenv('SUPABASE_USERS_PER_PAGE', '200'))
+SUPABASE_USERS_PREFETCH = int(os.getenv('SUPABASE_USERS_PREFETCH', '2'))  # pages fetched ahead concurrently
+
+SUPABASE_HEALTH_PROBE_INTERVAL = float(os.getenv('SUPABASE_HEALTH_PROBE_INTERVAL', '60'))  # seconds, 0 disables
+
+# Pooled HTTP transport for Supabase calls (timeouts in seconds)
+SUPABASE_HTTP2 = os.getenv('SUPABASE_HTTP2', 'False') == 'True'
+SUPABASE_HTTP_CONNECT_TIMEOUT = float(os.getenv('SUPABASE_HTTP_CONNECT_TIMEOUT', '3'))
+SUPABASE_HTTP_READ_TIMEOUT = float(os.getenv('SUPABASE_HTTP_READ_TIMEOUT', '10'))
+SUPABASE_HTTP_POOL_TIMEOUT = float(os.getenv('SUPABASE_HTTP_POOL_TIMEOUT', '5'))
+SUPABASE_HTTP_MAX_CONNECTIONS = int(os.getenv('SUPABASE_HTTP_MAX_CONNECTIONS', '20'))
+SUPABASE_HTTP_MAX_KEEPALIVE = int(os.getenv('SUPABASE_HTTP_MAX_KEEPALIVE', '10'))
+SUPABASE_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('SUPABASE_HTTP_KEEPALIVE_EXPIRY', '30'))
+
+# Full user list cache (seconds): served fresh for USER_CACHE_TTL (+/- jitter), then stale
+# for up to USER_CACHE_STALE_TTL while a single background refresh runs.
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '300'))
+USER_CACHE_STALE_TTL = int(os.getenv('USER_CACHE_STALE_TTL', '600'))
+USER_CACHE_TTL_JITTER = float(os.getenv('USER_CACHE_TTL_JITTER', '0.1'))
+USER_CACHE_LOCK_TIMEOUT = int(os.getenv('USER_CACHE_LOCK_TIMEOUT', '30'))
+USER_CACHE_WAIT_TIMEOUT = float(os.getenv('USER_CACHE_WAIT_TIMEOUT', '10'))
+# Single-user lookups (get_user_by_id): per-entry TTL and per-process LRU size
+USER_ENTITY_CACHE_TTL = int(os.getenv('USER_ENTITY_CACHE_TTL', '300'))
+USER_ENTITY_CACHE_SIZE = int(os.getenv('USER_ENTITY_CACHE_SIZE', '2048'))
+# Batch user operations (users/api/batch/): concurrent Supabase calls and max ids per request
+USER_BATCH_WORKERS = int(os.getenv('USER_BATCH_WORKERS', '8'))
+USER_BATCH_MAX_ITEMS = int(os.getenv('USER_BATCH_MAX_ITEMS', '500'))
+
+# Serve list_users from the local SupabaseUser mirror (kept current by `manage.py sync_users`
+# and by write-through from the user services) instead of the Supabase admin API
+USERS_LOCAL_MIRROR = os.getenv('USERS_LOCAL_MIRROR', 'False') == 'True'
+
+# Serve list/update/delete/proxy user views as coroutines (enable when running under ASGI)
+ASYNC_USER_VIEWS = os.getenv('ASYNC_USER_VIEWS', 'False') == 'True'
+
+# Admission control in front of Supabase auth/admin calls, as "<count>/<seconds>" (s/m/h also
+# accepted); an empty value disables that limit. Each limit is a per-process token bucket backed
+# by a counter in the shared cache, so it holds across workers.
+RATE_LIMITS = {
+    'login_ip': os.getenv('RATE_LIMIT_LOGIN_IP', '20/60'),
+    'login_email': os.getenv('RATE_LIMIT_LOGIN_EMAIL', '5/60'),
+    'login_global': os.getenv('RATE_LIMIT_LOGIN_GLOBAL', '30/1'),
+    'admin_ip': os.getenv('RATE_LIMIT_ADMIN_IP', '120/60'),
+    'admin_global': os.getenv('RATE_LIMIT_ADMIN_GLOBAL', '50/1'),
+}
+# META key holding the client address, e.g. HTTP_X_FORWARDED_FOR behind a trusted proxy
+RATE_LIMIT_IP_HEADER = os.getenv('RATE_LIMIT_IP_HEADER', 'REMOTE_ADDR')
+
+# KYC review queue: how long a claimed application stays reserved for its reviewer, and how
+# many applications one claim takes
+KYC_LEASE_SECONDS = int(os.getenv('KYC_LEASE_SECONDS', '900'))
+KYC_CLAIM_BATCH = int(os.getenv('KYC_CLAIM_BATCH', '10'))
+# KYC document uploads: where chunks are written (never served directly), size limits, the process
+# pool that checksums/validates/thumbnails them, and an optional Supabase Storage bucket that
+# finished documents are moved to
+KYC_UPLOAD_ROOT = os.getenv('KYC_UPLOAD_ROOT', str(BASE_DIR / 'kyc_uploads'))
+KYC_UPLOAD_MAX_BYTES = int(os.getenv('KYC_UPLOAD_MAX_BYTES', str(20 * 1024 * 1024)))
+KYC_UPLOAD_CHUNK_BYTES = int(os.getenv('KYC_UPLOAD_CHUNK_BYTES', str(5 * 1024 * 1024)))
+KYC_PROCESS_WORKERS = int(os.getenv('KYC_PROCESS_WORKERS', '2'))
+KYC_STORAGE_BUCKET = os.getenv('KYC_STORAGE_BUCKET', '')
+
+# Cache-first sessions with database fallback (see accounts/session_store.py); the cache is only
+# used when SESSION_CACHE_ALIAS is shared between workers. Purge expired rows with
+# `manage.py purge_sessions` (or `clearsessions`) from cron.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'accounts.session_store')
+SESSION_CACHE_ALIAS = os.getenv('SESSION_CACHE_ALIAS', 'default')
 SESSION_COOKIE_AGE = 86400  # 1 day in seconds
+SESSION_PURGE_BATCH_SIZE = int(os.getenv('SESSION_PURGE_BATCH_SIZE', '1000'))
 
 
 CSRF_COOKIE_SECURE = True  # for HTTPS connections
@@ -48,6 +159,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.middleware.SupabaseJWTMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -84,7 +196,8 @@ WSGI_APPLICATION = "hrms_project.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        # Overridable so tools such as manage.py load_test can run a server on a throwaway database.
+        "NAME": os.getenv('SQLITE_PATH', str(BASE_DIR / "db.sqlite3")),
     }
 }
 